@@ -0,0 +1,78 @@
+"""Parser throughput on a large generated script.
+
+    python benchmarks/bench_parser.py --lines 50000 --repeat 3 [--jobs 4]
+"""
+import logging
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python import Lexer, Parser
+from python.parallel import ParallelParser
+
+# One block of every common statement form; repeated until the script is long enough
+BLOCK = """DEFUN f{n}(a, b) {{
+    SET t = a * 2 + b;
+    IF (t > 10) THEN {{
+        RETURN t - 1;
+    }} ELSE {{
+        RETURN t + 1;
+    }}
+}}
+SET x{n} = f{n}(1, 2);
+SET y{n}: INT = x{n} + 3 * (4 - 1);
+x{n}++;
+WHILE (x{n} < 20) {{
+    SET x{n} = x{n} + 1;
+}}
+REPEAT 3 TIMES {{
+    PRINTLN "x is " + x{n};
+}}
+WAIT 10ms;
+MOVE MOUSE TO (x{n}, y{n});
+"""
+
+def generate_script(lines):
+    """Return a script of at least the given number of lines."""
+    block_lines = BLOCK.count("\n")
+    return "".join(BLOCK.format(n=n) for n in range(-(-lines // block_lines)))
+
+def main():
+    parser = ArgumentParser(description="Parser throughput benchmark")
+    parser.add_argument("--lines", type=int, default=50000, help="Length of the generated script")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs to take the best of")
+    parser.add_argument("--jobs", type=int, default=0, help="Also time lex+parse on a ParallelParser with this many workers")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    source = generate_script(args.lines)
+    lines = source.count("\n")
+
+    start = time.perf_counter()
+    tokens = Lexer(source).tokenize()
+    lex_time = time.perf_counter() - start
+
+    parse_time = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        Parser().parse(tokens)
+        parse_time = min(parse_time, time.perf_counter() - start)
+
+    print(f"{lines} lines, {len(tokens)} tokens")
+    print(f"{'lex':<6} {lex_time:8.3f}s {lines / lex_time:12.0f} lines/s")
+    print(f"{'parse':<6} {parse_time:8.3f}s {lines / parse_time:12.0f} lines/s (best of {args.repeat})")
+
+    if args.jobs:
+        parallel_time = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ParallelParser(args.jobs, min_chunk_size=1).parse(source)
+            parallel_time = min(parallel_time, time.perf_counter() - start)
+        print(f"{'both':<6} {lex_time + parse_time:8.3f}s {lines / (lex_time + parse_time):12.0f} lines/s (sequential)")
+        print(f"{'both':<6} {parallel_time:8.3f}s {lines / parallel_time:12.0f} lines/s ({args.jobs} jobs)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Throughput of many short scripts: one executor after another vs. a SessionPool.
+
+    python benchmarks/bench_sessions.py --scripts 1000 --workers 4
+"""
+import logging
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python import Lexer, Parser, Executor
+from python.session import Session, SessionPool, compile_source
+
+SHORT_SCRIPT = """
+DEFUN step(a, b) {
+    RETURN a * 2 + b;
+}
+SET total = 0;
+REPEAT 20 TIMES {
+    SET total = step(total, 1) - total;
+}
+MOVE MOUSE TO (total, 10);
+"""
+
+def run_back_to_back(count):
+    """Baseline: lex, parse and execute every script with a fresh interpreter."""
+    start = time.perf_counter()
+    for _ in range(count):
+        ast = Parser().parse(Lexer(SHORT_SCRIPT).tokenize())
+        Executor().execute(ast)
+    return time.perf_counter() - start
+
+def run_sessions(count):
+    """Compile once, then run one session per script on the calling thread."""
+    start = time.perf_counter()
+    compiled = compile_source(SHORT_SCRIPT, "short")
+    for _ in range(count):
+        result = Session(compiled).run()
+        if not result.ok:
+            raise RuntimeError(result.error)
+    return time.perf_counter() - start
+
+def run_pool(count, workers, kind):
+    """Compile once, then run one session per script on the pool."""
+    start = time.perf_counter()
+    compiled = compile_source(SHORT_SCRIPT, "short")
+    with SessionPool(workers=workers, kind=kind) as pool:
+        for result in pool.map([compiled] * count):
+            if not result.ok:
+                raise RuntimeError(result.error)
+    return time.perf_counter() - start
+
+def main():
+    parser = ArgumentParser(description="SessionPool throughput benchmark")
+    parser.add_argument("--scripts", type=int, default=1000, help="Number of scripts to run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Pool size")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    rows = [("back-to-back", run_back_to_back(args.scripts))]
+    rows.append(("sessions", run_sessions(args.scripts)))
+    rows.append(("thread pool", run_pool(args.scripts, args.workers, "thread")))
+    rows.append(("process pool", run_pool(args.scripts, args.workers, "process")))
+
+    print(f"{args.scripts} scripts, {args.workers} workers, {os.cpu_count()} CPUs")
+    for name, elapsed in rows:
+        print(f"{name:<14} {elapsed:8.3f}s {args.scripts / elapsed:10.1f} scripts/s")
+
+if __name__ == "__main__":
+    main()
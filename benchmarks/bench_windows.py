@@ -0,0 +1,62 @@
+"""Window hit-testing with the spatial index vs. a scan of the z-order.
+
+    python benchmarks/bench_windows.py --windows 10000 --queries 10000 --width 20000
+"""
+import os
+import random
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.utils import WindowManager
+
+def make_manager(windows, width, rng):
+    """Open windows of 100 to 800 pixels across a width x width desktop."""
+    manager = WindowManager()
+    for i in range(windows):
+        manager.create_window(f"w{i}", rng.randrange(width), rng.randrange(width),
+                              rng.randrange(100, 800), rng.randrange(100, 600))
+    return manager
+
+def scan_window_at(manager, x, y):
+    """Baseline: test every window from the top of the stack down."""
+    for window in reversed(manager.windows.values()):
+        if window.x <= x < window.x + window.width and window.y <= y < window.y + window.height:
+            return window
+    return None
+
+def timed(function, points):
+    start = time.perf_counter()
+    for x, y in points:
+        function(x, y)
+    return (time.perf_counter() - start) / len(points)
+
+def main():
+    parser = ArgumentParser(description="Benchmark window hit-testing")
+    parser.add_argument("--windows", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--width", type=int, default=20000, help="Width and height of the desktop")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    start = time.perf_counter()
+    manager = make_manager(args.windows, args.width, rng)
+    print(f"create {args.windows} windows: {time.perf_counter() - start:.3f}s")
+    points = [(rng.randrange(args.width), rng.randrange(args.width)) for _ in range(args.queries)]
+    names = [f"w{rng.randrange(args.windows)}" for _ in range(args.queries)]
+
+    scan = timed(lambda x, y: scan_window_at(manager, x, y), points)
+    indexed = timed(manager.window_at, points)
+    print(f"window_at, linear scan: {scan * 1e6:10.2f} us/query")
+    print(f"window_at, grid index:  {indexed * 1e6:10.2f} us/query ({scan / indexed:.1f}x)")
+    rect = timed(lambda x, y: manager.windows_in(x, y, 400, 300), points)
+    print(f"windows_in 400x300:     {rect * 1e6:10.2f} us/query")
+    moves = iter(names)
+    move = timed(lambda x, y: manager.move(next(moves), x, y), points)
+    print(f"move (index update):    {move * 1e6:10.2f} us/move")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
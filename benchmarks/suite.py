@@ -0,0 +1,248 @@
+"""Benchmark suite for the lexer, parser, executor and device managers.
+
+    python benchmarks/suite.py run --size 2000 --repeat 5 --out before.json
+    python benchmarks/suite.py run --size 2000 --repeat 5 --out after.json
+    python benchmarks/suite.py compare before.json after.json --threshold 10
+
+Every benchmark is timed --repeat times after one warm-up run and its best time is
+compared; compare exits with status 1 if any benchmark slowed down by more than
+--threshold percent.
+"""
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python import Lexer, Parser, Executor
+from python.utils import MouseManager, WindowManager, MemorySink, InputEventQueue, RecordingBackend
+from bench_parser import generate_script
+from workload import WorkloadGenerator
+
+# Programs for the executor benchmarks; {n} scales the work done
+LOOPS = """SET total = 0;
+SET i = 0;
+WHILE (i < {n}) {{
+    SET total = total + i * 2 % 7;
+    i++;
+}}
+REPEAT {n} TIMES {{
+    SET total = total - 1;
+}}
+"""
+
+CALLS = """DEFUN step(a, b) {{
+    IF (a > b) THEN {{
+        RETURN a - b;
+    }}
+    RETURN a + b;
+}}
+SET total = 0;
+REPEAT {n} TIMES {{
+    SET total = step(total, 3);
+}}
+"""
+
+LAMBDAS = """SET scale = LAMBDA (x) {{ RETURN x * 3; }};
+SET total = 0;
+REPEAT {n} TIMES {{
+    SET total = scale(total) % 1000 + 1;
+}}
+"""
+
+PIPELINES = """SET twice = LAMBDA (x) {{ RETURN x * 2; }};
+DEFUN inc(x) {{
+    RETURN x + 1;
+}}
+SET total = 0;
+REPEAT {n} TIMES {{
+    SET total = (total |> twice |> inc) % 1000;
+}}
+"""
+
+def compile_program(template, n):
+    return Parser().parse(Lexer(template.format(n=n)).tokenize())
+
+def bench_lexer(size):
+    source = generate_script(size)
+    return lambda: Lexer(source).tokenize(), size
+
+def bench_parser(size):
+    tokens = Lexer(generate_script(size)).tokenize()
+    return lambda: Parser().parse(tokens), size
+
+def bench_executor(template):
+    def setup(size):
+        program = compile_program(template, size)
+        return lambda: Executor(output=MemorySink()).execute(program), size
+    return setup
+
+def bench_workload(size):
+    """Lex, parse and run a generated automation script end to end."""
+    source = WorkloadGenerator(seed=size).generate(size * 100)
+    lines = source.count("\n")
+    def run():
+        program = Parser().parse(Lexer(source).tokenize())
+        Executor(output=MemorySink()).execute(program)
+    return run, lines
+
+def bench_mouse(size):
+    moves = size * 100
+    def run():
+        mouse = MouseManager()
+        for i in range(moves):
+            mouse.move(i, moves - i)
+            mouse.get_position()
+    return run, moves
+
+def bench_windows(size):
+    windows = max(1, size // 10)
+    operations = size * 10
+    def run():
+        manager = WindowManager()
+        for i in range(windows):
+            manager.create_window(f"w{i}", i, i, 100, 100)
+        for i in range(operations):
+            name = f"w{i % windows}"
+            manager.move(name, i, i)
+            manager.focus(name)
+            manager.exists(name)
+    return run, operations
+
+def bench_input(size):
+    """Synthetic input events through the queue into the recording backend."""
+    events = size * 1000
+    def run():
+        backend = RecordingBackend(events)
+        queue = InputEventQueue(backend, coalesce=False)
+        for i in range(0, events, 4):
+            queue.move(i, i)
+            queue.button_down("LEFT")
+            queue.button_up("LEFT")
+            queue.key_down("A")
+        queue.flush()
+    return run, events
+
+def bench_trajectory(size):
+    """Timed mouse moves, computed and streamed into the recording backend."""
+    moves = size
+    program = compile_program("""SET i = 0;
+WHILE (i < {n}) {{
+    MOVE MOUSE TO (i % 1920, i % 1080) TIME 1s BEZIER;
+    i++;
+}}
+""", moves)
+    def run():
+        backend = RecordingBackend(moves * RecordingBackend.sample_rate)
+        Executor(output=MemorySink(), backend=backend).execute(program)
+    return run, moves * RecordingBackend.sample_rate
+
+# Name -> setup(size) returning (function to time, operations it performs)
+BENCHMARKS = {
+    "lexer.tokenize": bench_lexer,
+    "parser.parse": bench_parser,
+    "executor.loops": bench_executor(LOOPS),
+    "executor.calls": bench_executor(CALLS),
+    "executor.lambdas": bench_executor(LAMBDAS),
+    "executor.pipelines": bench_executor(PIPELINES),
+    "end_to_end.workload": bench_workload,
+    "device.mouse": bench_mouse,
+    "device.windows": bench_windows,
+    "device.input": bench_input,
+    "device.trajectory": bench_trajectory,
+}
+
+def run_benchmark(setup, size, repeat):
+    """Time one benchmark; the first, untimed run warms caches up."""
+    function, operations = setup(size)
+    function()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - start)
+    return {
+        "operations": operations,
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "ops_per_sec": operations / min(runs),
+    }
+
+def run_suite(size, repeat, selected=None):
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        results[name] = run_benchmark(setup, size, repeat)
+        result = results[name]
+        print(f"{name:<20} {result['min']:9.4f}s {result['ops_per_sec']:14.0f} ops/s", file=sys.stderr)
+    return {
+        "meta": {
+            "size": size,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+def compare(baseline, current, threshold):
+    """Return a report of best-time changes and the names that regressed."""
+    rows = [f"{'benchmark':<20} {'baseline':>10} {'current':>10} {'change':>8}"]
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            rows.append(f"{name:<20} {'-':>10} {result['min']:>9.4f}s {'new':>8}")
+            continue
+        change = (result["min"] - before["min"]) / before["min"] * 100
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        rows.append(f"{name:<20} {before['min']:>9.4f}s {result['min']:>9.4f}s {change:>+7.1f}%{flag}")
+    return "\n".join(rows), regressions
+
+def main():
+    parser = ArgumentParser(description="CommandPro benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run the suite and write the results as JSON")
+    run.add_argument("--size", type=int, default=1000, help="Scale of the generated programs")
+    run.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    run.add_argument("--only", nargs="*", help="Run only benchmarks whose name contains one of these")
+    run.add_argument("--out", default="benchmark.json", help="Results file")
+    diff = commands.add_parser("compare", help="Compare two results files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=10.0, help="Slowdown in percent that counts as a regression")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    if args.command == "run":
+        results = run_suite(args.size, args.repeat, args.only)
+        with open(args.out, "w") as file:
+            json.dump(results, file, indent=4)
+        print(f"Results written to {args.out}", file=sys.stderr)
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    report, regressions = compare(baseline, current, args.threshold)
+    print(report)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
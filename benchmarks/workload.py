@@ -0,0 +1,189 @@
+"""Seeded generator of synthetic CommandPro automation scripts.
+
+    python benchmarks/workload.py --size 1G --seed 7 --out big.csc
+    python benchmarks/workload.py --size 200K --loop-nesting 3 --mouse 0.5 | python repl.py -f /dev/stdin
+
+Scripts are written section by section, so a file of any size is streamed out
+without being built in memory. Every script parses and runs: loops are short and
+bounded, numbers are kept small with %, and window operations are guarded by
+WINDOW ... EXISTS, so a script with no windows open just skips them.
+"""
+import io
+import random
+import re
+import sys
+from argparse import ArgumentParser
+from typing import Iterator, List
+
+class WorkloadGenerator:
+    """Emit valid CommandPro source with a controllable mix of statements.
+
+    Args:
+        seed: Seed for the random mix; the same seed and knobs give the same script
+        defun_depth: Length of the DEFUN call chain f<depth> -> ... -> f0 the script calls into
+        loop_nesting: Deepest REPEAT/WHILE nesting
+        mouse_density: Share of statements that move the mouse or wait
+        window_density: Share of statements that move or focus a window
+        lambda_density: Share of statements that call lambdas or run |> pipelines
+        typed_ratio: Share of assignments that carry a ': TYPE' annotation
+        lambdas: Number of lambdas defined up front for the pipelines to use
+        statements: Statements per section, before loops expand them
+    """
+    def __init__(self, seed: int = 0, defun_depth: int = 3, loop_nesting: int = 2,
+                 mouse_density: float = 0.3, window_density: float = 0.05,
+                 lambda_density: float = 0.15, typed_ratio: float = 0.5,
+                 lambdas: int = 4, statements: int = 12):
+        self.rng = random.Random(seed)
+        self.defun_depth = max(1, defun_depth)
+        self.loop_nesting = loop_nesting
+        self.mouse_density = mouse_density
+        self.window_density = window_density
+        self.lambda_density = lambda_density
+        self.typed_ratio = typed_ratio
+        self.lambdas = max(1, lambdas)
+        self.statements = statements
+        self.section = 0
+
+    def header(self) -> str:
+        """Functions and lambdas shared by every section."""
+        lines = ["# Generated workload", "DEFUN f0(x) {", "    RETURN (x + 1) % 1000;", "}"]
+        for level in range(1, self.defun_depth + 1):
+            lines += [
+                f"DEFUN f{level}(x) {{",
+                "    IF (x > 500) THEN {",
+                f"        RETURN f{level - 1}(x - {self.rng.randint(1, 50)});",
+                "    }",
+                f"    RETURN f{level - 1}(x + {self.rng.randint(1, 50)});",
+                "}",
+            ]
+        for index in range(self.lambdas):
+            lines.append(f"SET lam{index} = LAMBDA (x) {{ RETURN (x * {self.rng.randint(2, 5)} + {index}) % 1000; }};")
+        return "\n".join(lines) + "\n"
+
+    def sections(self) -> Iterator[str]:
+        """Yield the header, then an endless series of self-contained sections."""
+        yield self.header()
+        while True:
+            yield self.next_section()
+
+    def next_section(self) -> str:
+        n = self.section
+        self.section += 1
+        rng = self.rng
+        lines = [
+            f"# Section {n}",
+            self.assignment(f"a{n}", "INT", str(rng.randint(0, 999))),
+            self.assignment(f"b{n}", "FLOAT", f"{rng.randint(0, 99)}.5"),
+            self.assignment(f"s{n}", "STR", f'"step {n}"'),
+        ]
+        if self.window_density:
+            lines.append(f'SET w{n} = "window {rng.randint(0, 9)}";')
+        lines += self.block(n, self.statements, 0, "")
+        return "\n".join(lines) + "\n"
+
+    def block(self, n: int, count: int, depth: int, indent: str) -> List[str]:
+        lines = []
+        for _ in range(count):
+            lines += self.statement(n, depth, indent)
+        return lines
+
+    def statement(self, n: int, depth: int, indent: str) -> List[str]:
+        rng = self.rng
+        roll = rng.random()
+        if roll < self.mouse_density:
+            if rng.random() < 0.8:
+                return [f"{indent}MOVE MOUSE TO (a{n} % 1920, {rng.randint(0, 1079)});"]
+            return [f"{indent}WAIT {rng.randint(1, 50)}ms;"]
+        roll -= self.mouse_density
+        if roll < self.window_density:
+            return [
+                f"{indent}IF (WINDOW w{n} EXISTS) THEN {{",
+                f"{indent}    MOVE WINDOW w{n} TO (a{n} % 800, {rng.randint(0, 600)});",
+                f"{indent}    FOCUS WINDOW w{n};",
+                f"{indent}}}",
+            ]
+        roll -= self.window_density
+        if roll < self.lambda_density:
+            first, second = rng.randrange(self.lambdas), rng.randrange(self.lambdas)
+            if rng.random() < 0.5:
+                return [self.assignment(f"a{n}", "INT", f"lam{first}(a{n})", indent)]
+            return [self.assignment(f"a{n}", "INT", f"(a{n} |> lam{first} |> lam{second}) % 1000", indent)]
+        if depth < self.loop_nesting and rng.random() < 0.25:
+            return self.loop(n, depth, indent)
+        kind = rng.randrange(4)
+        if kind == 0:
+            return [self.assignment(f"a{n}", "INT", f"f{rng.randint(0, self.defun_depth)}(a{n})", indent)]
+        if kind == 1:
+            return [self.assignment(f"a{n}", "INT", f"(a{n} * {rng.randint(2, 9)} + {rng.randint(0, 99)}) % 1000", indent)]
+        if kind == 2:
+            return [self.assignment(f"b{n}", "FLOAT", f"b{n} / 2 + {rng.randint(0, 9)}.25", indent)]
+        return [self.assignment(f"s{n}", "STR", f'"step {n} at " + a{n}', indent)]
+
+    def loop(self, n: int, depth: int, indent: str) -> List[str]:
+        rng = self.rng
+        inner = indent + "    "
+        body = self.block(n, rng.randint(1, 3), depth + 1, inner)
+        if rng.random() < 0.5:
+            return [f"{indent}REPEAT {rng.randint(2, 3)} TIMES {{", *body, f"{indent}}}"]
+        counter = f"i{n}_{depth}"
+        return [
+            f"{indent}SET {counter} = 0;",
+            f"{indent}WHILE ({counter} < {rng.randint(2, 3)}) {{",
+            *body,
+            f"{inner}{counter}++;",
+            f"{indent}}}",
+        ]
+
+    def assignment(self, name: str, var_type: str, value: str, indent: str = "") -> str:
+        if self.rng.random() < self.typed_ratio:
+            return f"{indent}SET {name}: {var_type} = {value};"
+        return f"{indent}SET {name} = {value};"
+
+    def write(self, out, size: int) -> int:
+        """Stream sections to out until at least size characters are written; returns the count."""
+        written = 0
+        for text in self.sections():
+            out.write(text)
+            written += len(text)
+            if written >= size:
+                break
+        return written
+
+    def generate(self, size: int) -> str:
+        """Return a script of at least size characters, for sizes that fit in memory."""
+        out = io.StringIO()
+        self.write(out, size)
+        return out.getvalue()
+
+def parse_size(text: str) -> int:
+    """Parse a size such as 500000, 200K, 64M or 1G."""
+    match = re.fullmatch(r"(\d+)([KMG]?)B?", text.strip().upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(match.group(1)) * {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}[match.group(2)]
+
+def main():
+    parser = ArgumentParser(description="Generate a synthetic CommandPro automation script")
+    parser.add_argument("--size", default="1M", help="Approximate script size, e.g. 200K, 64M, 1G")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--out", help="Output file (default: stdout)")
+    parser.add_argument("--defun-depth", type=int, default=3, help="Length of the DEFUN call chain")
+    parser.add_argument("--loop-nesting", type=int, default=2, help="Deepest REPEAT/WHILE nesting")
+    parser.add_argument("--mouse", type=float, default=0.3, help="Share of MOVE MOUSE/WAIT statements")
+    parser.add_argument("--windows", type=float, default=0.05, help="Share of window operations")
+    parser.add_argument("--lambdas", type=float, default=0.15, help="Share of lambda calls and |> pipelines")
+    parser.add_argument("--typed", type=float, default=0.5, help="Share of assignments with a type annotation")
+    args = parser.parse_args()
+
+    generator = WorkloadGenerator(args.seed, args.defun_depth, args.loop_nesting, args.mouse,
+                                  args.windows, args.lambdas, args.typed)
+    size = parse_size(args.size)
+    if args.out:
+        with open(args.out, "w", buffering=1 << 20) as out:
+            written = generator.write(out, size)
+    else:
+        written = generator.write(sys.stdout, size)
+    print(f"Wrote {written} characters, {generator.section} sections", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Thin client for a `repl.py --serve` daemon.
+
+Only the standard library is imported here so each call pays for Python startup and a
+socket round trip, not for loading the interpreter.
+"""
+import json
+import socket
+import sys
+from argparse import ArgumentParser
+
+def send_request(socket_path, request):
+    """Send one request to the daemon and return the decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as response:
+            return json.loads(response.readline())
+
+def main():
+    parser = ArgumentParser(description="CommandPro daemon client")
+    parser.add_argument("socket", help="Socket path of a running `repl.py --serve` daemon")
+    parser.add_argument("-c", "--code", help="Code string to execute")
+    parser.add_argument("-f", "--file", help="File to execute")
+    parser.add_argument("-ast", "--ast_path", help="AST JSON file to execute")
+    args = parser.parse_args()
+
+    if args.code:
+        request = {"code": args.code}
+    elif args.file:
+        with open(args.file, 'r') as file:
+            request = {"code": file.read()}
+    elif args.ast_path:
+        with open(args.ast_path, 'r') as file:
+            request = {"ast": json.load(file)}
+    else:
+        parser.error("one of -c, -f or -ast is required")
+
+    response = send_request(args.socket, request)
+    sys.stdout.write(response.get("output", ""))
+    if response["status"] != "ok":
+        print(f"Error: {response['error']}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
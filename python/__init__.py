@@ -1,5 +1,7 @@
 from .lexer import Lexer
 from .parser import Parser
 from .executor import Executor
+from .session import CompilationUnit, CompiledProgram, Session, SessionPool, compile_source
+from .limits import ExecutionLimits
 from .ast_nodes import *
 from .errors import *
\ No newline at end of file
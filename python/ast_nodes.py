@@ -14,9 +14,15 @@ class Token:
         return f"Token(kind='{self.kind}', value='{escaped_value}', line={self.line})"
 
 class ASTNode:
+    line = None  # Source line the node starts on, set by the parser
+
     def to_dict(self):
         raise NotImplementedError("to_dict method not implemented.")
 
+    @classmethod
+    def from_dict(cls, data):
+        raise NotImplementedError("from_dict method not implemented.")
+
 class Program(ASTNode):
     def __init__(self, statements: List[ASTNode]):
         self.statements = statements
@@ -30,6 +36,10 @@ class Program(ASTNode):
             "statements": [stmt.to_dict() for stmt in self.statements if stmt is not None]
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls([node_from_dict(stmt) for stmt in data["statements"]])
+
 class FunctionDefinition(ASTNode):
     def __init__(self, name: Optional[str], parameters: List[str], body: List[ASTNode]):
         self.name = name
@@ -49,6 +59,12 @@ class FunctionDefinition(ASTNode):
             "closure": self.closure
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        node = cls(data["name"], data["parameters"], [node_from_dict(stmt) for stmt in data["body"]])
+        node.closure = data.get("closure", {})
+        return node
+
 class Assignment(ASTNode):
     def __init__(self, variable_name: str, value: ASTNode, var_type: str = None):
         self.variable_name = variable_name
@@ -66,6 +82,10 @@ class Assignment(ASTNode):
             "var_type": self.var_type
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["variable"], node_from_dict(data["expression"]), data.get("var_type"))
+
 class PrintStatement(ASTNode):
     def __init__(self, print_type: str, expression: ASTNode):
         self.print_type = print_type
@@ -81,6 +101,10 @@ class PrintStatement(ASTNode):
             "expression": self.expression.to_dict()
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["print_type"], node_from_dict(data["expression"]))
+
 class WaitStatement(ASTNode):
     def __init__(self, expression: ASTNode):
         self.expression = expression
@@ -94,30 +118,51 @@ class WaitStatement(ASTNode):
             "expression": self.expression.to_dict()
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(node_from_dict(data["expression"]))
+
 class MoveMouse(ASTNode):
-    def __init__(self, variable: ASTNode = None, x: ASTNode = None, y: ASTNode = None):
+    def __init__(self, variable: ASTNode = None, x: ASTNode = None, y: ASTNode = None,
+                 duration: ASTNode = None, profile: str = "LINEAR"):
         self.variable = variable
         self.x = x
         self.y = y
+        self.duration = duration  # Set for MOVE MOUSE ... TIME
+        self.profile = profile
 
     def __repr__(self):
+        timing = f", duration={self.duration}, profile='{self.profile}'" if self.duration is not None else ""
         if self.variable and (self.x is None and self.y is None):
-            return f"MoveMouse(variable={self.variable})"
+            return f"MoveMouse(variable={self.variable}{timing})"
         else:
-            return f"MoveMouse(x={self.x}, y={self.y})"
+            return f"MoveMouse(x={self.x}, y={self.y}{timing})"
 
     def to_dict(self):
         if self.variable and (self.x is None and self.y is None):
-            return {
+            data = {
                 "type": "MoveMouse",
                 "variable": self.variable.to_dict()
             }
         else:
-            return {
+            data = {
                 "type": "MoveMouse",
                 "x": self.x.to_dict(),
                 "y": self.y.to_dict()
             }
+        if self.duration is not None:
+            data["duration"] = self.duration.to_dict()
+            data["profile"] = self.profile
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        timing = {}
+        if "duration" in data:
+            timing = {"duration": node_from_dict(data["duration"]), "profile": data["profile"]}
+        if "variable" in data:
+            return cls(variable=node_from_dict(data["variable"]), **timing)
+        return cls(x=node_from_dict(data["x"]), y=node_from_dict(data["y"]), **timing)
 
 class KeyOperation(ASTNode):
     def __init__(self, operation: str, key: str):
@@ -134,19 +179,29 @@ class KeyOperation(ASTNode):
             "key": self.key
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["operation"], data["key"])
+
 class ButtonOperation(ASTNode):
-    def __init__(self, button: str):
+    def __init__(self, button: str, operation: str = "PRESS"):
         self.button = button
+        self.operation = operation
 
     def __repr__(self):
-        return f"ButtonOperation(button='{self.button}')"
+        return f"ButtonOperation(operation='{self.operation}', button='{self.button}')"
 
     def to_dict(self):
         return {
             "type": "ButtonOperation",
+            "operation": self.operation,
             "button": self.button
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["button"], data.get("operation", "PRESS"))
+
 class BinaryOperation(ASTNode):
     def __init__(self, operator: str, left: ASTNode, right: ASTNode):
         self.operator = operator
@@ -164,6 +219,29 @@ class BinaryOperation(ASTNode):
             "right": self.right.to_dict()
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["operator"], node_from_dict(data["left"]), node_from_dict(data["right"]))
+
+class UnaryOperation(ASTNode):
+    def __init__(self, operator: str, operand: ASTNode):
+        self.operator = operator
+        self.operand = operand
+
+    def __repr__(self):
+        return f"UnaryOperation(operator='{self.operator}', operand={self.operand})"
+
+    def to_dict(self):
+        return {
+            "type": "UnaryOperation",
+            "operator": self.operator,
+            "operand": self.operand.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["operator"], node_from_dict(data["operand"]))
+
 class Identifier(ASTNode):
     def __init__(self, name: str, value: Optional[ASTNode] = None):
         self.name = name
@@ -179,6 +257,10 @@ class Identifier(ASTNode):
             "value": self.value.to_dict() if self.value else None
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], node_from_dict(data["value"]) if data.get("value") else None)
+
 class Integer(ASTNode):
     def __init__(self, value: int):
         self.value = value
@@ -192,6 +274,10 @@ class Integer(ASTNode):
             "value": self.value
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["value"])
+
 class Float(ASTNode):
     def __init__(self, value: float):
         self.value = value
@@ -205,6 +291,10 @@ class Float(ASTNode):
             "value": self.value
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["value"])
+
 class Time(ASTNode):
     def __init__(self, value: float, unit: str):
         self.value = value
@@ -220,6 +310,10 @@ class Time(ASTNode):
             "unit": self.unit
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["value"], data["unit"])
+
 class String(ASTNode):
     def __init__(self, value: str):
         self.value = value
@@ -237,12 +331,20 @@ class String(ASTNode):
             "value": self.value
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["value"])
+
 class EmptyStatement(ASTNode):
     def to_dict(self):
         return {
             "type": "EmptyStatement"
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls()
+
 class FunctionCall(ASTNode):
     def __init__(self, function_name: str, arguments: List[ASTNode]):
         self.function_name = function_name
@@ -261,6 +363,10 @@ class FunctionCall(ASTNode):
             "arguments": [arg.to_dict() for arg in self.arguments]
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], [node_from_dict(arg) for arg in data["arguments"]])
+
 class Boolean(ASTNode):
     def __init__(self, value: bool):
         self.value = value
@@ -274,6 +380,10 @@ class Boolean(ASTNode):
             "value": self.value
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["value"])
+
 class WhileLoop(ASTNode):
     def __init__(self, condition: ASTNode, body: List[ASTNode]):
         self.condition = condition
@@ -289,6 +399,10 @@ class WhileLoop(ASTNode):
             "body": [stmt.to_dict() for stmt in self.body]
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(node_from_dict(data["condition"]), [node_from_dict(stmt) for stmt in data["body"]])
+
 class RepeatLoop(ASTNode):
     def __init__(self, count: ASTNode, body: List[ASTNode]):
         self.count = count
@@ -304,6 +418,10 @@ class RepeatLoop(ASTNode):
             "body": [stmt.to_dict() for stmt in self.body]
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(node_from_dict(data["count"]), [node_from_dict(stmt) for stmt in data["body"]])
+
 class ControlStatement(ASTNode):
     def __init__(self, statement_type: str, value: Optional[ASTNode] = None):
         self.statement_type = statement_type  # BREAK, CONTINUE, RETURN, YIELD
@@ -319,6 +437,10 @@ class ControlStatement(ASTNode):
             "value": self.value.to_dict() if self.value else None
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["statement_type"], node_from_dict(data["value"]) if data.get("value") else None)
+
 class IncrementDecrement(ASTNode):
     def __init__(self, variable: str, operation: str, is_prefix: bool = False):
         self.variable = variable
@@ -336,6 +458,10 @@ class IncrementDecrement(ASTNode):
             "is_prefix": self.is_prefix
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["variable"], data["operation"], data.get("is_prefix", False))
+
 class IfStatement(ASTNode):
     def __init__(self, condition: ASTNode, then_body: List[ASTNode], else_if_conditions: List[ASTNode] = None, 
                  else_if_bodies: List[List[ASTNode]] = None, else_body: List[ASTNode] = None):
@@ -358,6 +484,16 @@ class IfStatement(ASTNode):
             "else_body": [stmt.to_dict() for stmt in self.else_body]
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            node_from_dict(data["condition"]),
+            [node_from_dict(stmt) for stmt in data["then_body"]],
+            [node_from_dict(cond) for cond in data.get("else_if_conditions", [])],
+            [[node_from_dict(stmt) for stmt in body] for body in data.get("else_if_bodies", [])],
+            [node_from_dict(stmt) for stmt in data.get("else_body", [])]
+        )
+
 class MoveWindow(ASTNode):
     def __init__(self, window_name: ASTNode, x: ASTNode, y: ASTNode):
         self.window_name = window_name
@@ -375,6 +511,10 @@ class MoveWindow(ASTNode):
             "y": self.y.to_dict()
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(node_from_dict(data["window_name"]), node_from_dict(data["x"]), node_from_dict(data["y"]))
+
 class FocusWindow(ASTNode):
     def __init__(self, window_name: ASTNode):
         self.window_name = window_name
@@ -388,6 +528,10 @@ class FocusWindow(ASTNode):
             "window_name": self.window_name.to_dict()
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(node_from_dict(data["window_name"]))
+
 class WindowExists(ASTNode):
     def __init__(self, window_name: ASTNode):
         self.window_name = window_name
@@ -401,6 +545,10 @@ class WindowExists(ASTNode):
             "window_name": self.window_name.to_dict()
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(node_from_dict(data["window_name"]))
+
 class LambdaFunction(ASTNode):
     def __init__(self, parameters: List[str], body: List[ASTNode]):
         self.parameters = parameters
@@ -416,6 +564,10 @@ class LambdaFunction(ASTNode):
             "body": [stmt.to_dict() for stmt in self.body if stmt is not None]
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["parameters"], [node_from_dict(stmt) for stmt in data["body"]])
+
 class NamedArgument(ASTNode):
     def __init__(self, name: str, value: ASTNode):
         self.name = name
@@ -431,6 +583,10 @@ class NamedArgument(ASTNode):
             "value": self.value.to_dict()
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], node_from_dict(data["value"]))
+
 class FunctionComposition(ASTNode):
     def __init__(self, functions: List[ASTNode]):
         self.functions = functions
@@ -444,6 +600,10 @@ class FunctionComposition(ASTNode):
             "functions": [func.to_dict() for func in self.functions]
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls([node_from_dict(func) for func in data["functions"]])
+
 class Point(ASTNode):
     def __init__(self, x: ASTNode, y: ASTNode):
         self.x = x
@@ -458,3 +618,19 @@ class Point(ASTNode):
             "x": self.x.to_dict(),
             "y": self.y.to_dict()
         }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(node_from_dict(data["x"]), node_from_dict(data["y"]))
+
+def node_from_dict(data):
+    """Rebuild an AST node (and its children) from the output of to_dict()."""
+    if data is None:
+        return None
+    node_class = NODE_TYPES.get(data.get("type"))
+    if node_class is None:
+        raise ValueError(f"Unknown AST node type: {data.get('type')}")
+    return node_class.from_dict(data)
+
+# Map of to_dict() "type" tags to node classes, used by node_from_dict
+NODE_TYPES = {cls.__name__: cls for cls in ASTNode.__subclasses__()}
@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import sys
+import time
+from collections import ChainMap, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, TextIO
+from .executor import Executor
+from .limits import ExecutionLimits
+from .lexer import Lexer
+from .parser import Parser
+from .session import ParseCache, Session, compile_source
+from .utils import MemorySink
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+def collect_scripts(directory: str, extension: str = ".csc") -> List[str]:
+    """Return every script below directory, sorted so runs are reproducible."""
+    scripts = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        scripts.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(extension))
+    return scripts
+
+def run_script(path: str, verbose: bool = False, limits: Optional[ExecutionLimits] = None) -> Dict[str, Any]:
+    """Parse and execute one script, capturing its output. Runs inside a pool worker."""
+    result = {"script": path, "status": "ok", "stage": None, "stdout": "", "error": None,
+              "parse_time": 0.0, "exec_time": 0.0}
+    start = time.perf_counter()
+    try:
+        with open(path, 'r') as file:
+            code = file.read()
+        compiled = compile_source(code, path)
+    except Exception as e:
+        result.update(status="error", stage="parse", error=f"{type(e).__name__}: {e}")
+        result["parse_time"] = time.perf_counter() - start
+        return result
+    result["parse_time"] = time.perf_counter() - start
+
+    output = MemorySink()
+    outcome = Session(compiled, verbose, output, limits).run()
+    result["exec_time"] = outcome.elapsed
+    result["stdout"] = output.getvalue()
+    if not outcome.ok:
+        result.update(status="error", stage="execute", error=outcome.error)
+    return result
+
+def run_batch(directory: str, jobs: Optional[int] = None, fail_fast: bool = False,
+              verbose: bool = False, out: TextIO = None, limits: Optional[ExecutionLimits] = None) -> int:
+    """Run every script under directory on a process pool, streaming JSON-line results.
+
+    Results are written as each script finishes, not in directory order. With fail_fast
+    the first failure cancels every script that has not started yet.
+
+    Returns:
+        int: 0 if every script succeeded, 1 otherwise
+    """
+    out = out or sys.stdout
+    scripts = collect_scripts(directory)
+    logger.info("Running %d scripts from %s with %s workers.", len(scripts), directory, jobs or "all")
+
+    passed = failed = 0
+    start = time.perf_counter()
+    # Workers inherit the parent's logging switch so --log keeps meaning the same thing
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=logging.disable,
+                               initargs=(logging.root.manager.disable,))
+    try:
+        futures = [pool.submit(run_script, path, verbose, limits) for path in scripts]
+        for future in as_completed(futures):
+            result = future.result()
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            if result["status"] == "ok":
+                passed += 1
+                continue
+            failed += 1
+            if fail_fast:
+                logger.info("Stopping batch after failure in %s.", result["script"])
+                break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    skipped = len(scripts) - passed - failed
+    print(f"{passed} passed, {failed} failed, {skipped} skipped in {time.perf_counter() - start:.2f}s",
+          file=sys.stderr)
+    return 0 if failed == 0 else 1
+
+def check_script(path: str) -> Dict[str, Any]:
+    """Lex and parse one script with error recovery, without executing it."""
+    result = {"script": path, "status": "ok", "diagnostics": [], "statements": 0, "parse_time": 0.0}
+    start = time.perf_counter()
+    try:
+        with open(path, 'r') as file:
+            code = file.read()
+        parser = Parser()
+        program = parser.parse(Lexer(code).tokenize(), recover=True)
+        result["statements"] = len(program.statements)
+        result["diagnostics"] = parser.diagnostics
+    except Exception as e:
+        # The lexer stops at the first bad character; report that as the only diagnostic
+        result["diagnostics"] = [{"line": None, "message": f"{type(e).__name__}: {e}"}]
+    if result["diagnostics"]:
+        result["status"] = "error"
+    result["parse_time"] = time.perf_counter() - start
+    return result
+
+def run_check(directory: str, jobs: Optional[int] = None, out: TextIO = None) -> int:
+    """Validate every script under directory in parallel without executing any of them.
+
+    Writes one JSON line per script in directory order, listing every syntax error found.
+
+    Returns:
+        int: 0 if every script parsed cleanly, 1 otherwise
+    """
+    out = out or sys.stdout
+    scripts = collect_scripts(directory)
+    workers = jobs or os.cpu_count() or 1
+    logger.info("Checking %d scripts from %s with %d workers.", len(scripts), directory, workers)
+
+    failed = diagnostics = 0
+    start = time.perf_counter()
+    # Scripts are small, so hand them to workers in chunks to keep the pool busy
+    chunksize = max(1, len(scripts) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=logging.disable,
+                             initargs=(logging.root.manager.disable,)) as pool:
+        for result in pool.map(check_script, scripts, chunksize=chunksize):
+            if result["status"] != "ok":
+                failed += 1
+                diagnostics += len(result["diagnostics"])
+            out.write(json.dumps(result) + "\n")
+    out.flush()
+
+    print(f"{len(scripts)} scripts checked, {failed} with errors ({diagnostics} diagnostics) "
+          f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0 if failed == 0 else 1
+
+# Per-process state for run_jsonl workers, created once by _init_jsonl_worker
+_worker_cache = None
+_worker_executor = None
+
+def _init_jsonl_worker(log_disable: int, verbose: bool, limits: Optional[ExecutionLimits] = None):
+    global _worker_cache, _worker_executor
+    logging.disable(log_disable)
+    _worker_cache = ParseCache()
+    _worker_executor = Executor(verbose=verbose, output=MemorySink(), limits=limits)
+
+def run_request(line_number: int, line: str) -> Dict[str, Any]:
+    """Run one JSON-lines request on this worker's warm parse cache and executor.
+
+    A request is an object with either "code" or "path" (a script file), an optional
+    "id" that is echoed back and optional "params" that are preset as global variables.
+    """
+    result = {"line": line_number, "id": None, "status": "ok", "stage": None, "stdout": "",
+              "error": None, "cached": False, "elapsed": 0.0}
+    start = time.perf_counter()
+    try:
+        request = json.loads(line)
+        result["id"] = request.get("id")
+        if "code" in request:
+            code = request["code"]
+        elif "path" in request:
+            with open(request["path"], 'r') as file:
+                code = file.read()
+        else:
+            raise ValueError("Request must contain 'code' or 'path'")
+        compiled, result["cached"] = _worker_cache.get(code)
+    except Exception as e:
+        result.update(status="error", stage="parse", error=f"{type(e).__name__}: {e}")
+        result["elapsed"] = time.perf_counter() - start
+        return result
+
+    executor = _worker_executor
+    executor.reset(ChainMap({}, compiled.functions))
+    executor.output.clear()
+    try:
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            result.update(status="error", stage="request",
+                          error=f"'params' must be an object, got {type(params).__name__}")
+            result["elapsed"] = time.perf_counter() - start
+            return result
+        executor.global_scope.update(params)
+        executor.execute(compiled.program)
+    except Exception as e:
+        result.update(status="error", stage="execute", error=f"{type(e).__name__}: {e}")
+    result["stdout"] = executor.output.getvalue()
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def run_jsonl(path: str, jobs: Optional[int] = None, verbose: bool = False, out: TextIO = None,
+              limits: Optional[ExecutionLimits] = None) -> int:
+    """Stream requests from a JSON-lines file through a bounded process pool.
+
+    At most a few requests per worker are in flight at once and results are written in
+    input order, so memory stays flat however large the request file is.
+
+    Returns:
+        int: 0 if every request succeeded, 1 otherwise
+    """
+    out = out or sys.stdout
+    workers = jobs or os.cpu_count() or 1
+    window = deque()
+    failed = 0
+
+    def write_oldest():
+        nonlocal failed
+        line_number, future = window.popleft()
+        try:
+            result = future.result()
+        except Exception as e:
+            # A crashed worker fails its own line; the rest of the stream still gets written
+            result = {"line": line_number, "id": None, "status": "error", "stage": "worker", "stdout": "",
+                      "error": f"{type(e).__name__}: {e}", "cached": False, "elapsed": 0.0}
+        if result["status"] != "ok":
+            failed += 1
+        out.write(json.dumps(result) + "\n")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_jsonl_worker,
+                             initargs=(logging.root.manager.disable, verbose, limits)) as pool, \
+            open(path, 'r') as requests:
+        for line_number, line in enumerate(requests, 1):
+            if not line.strip():
+                continue
+            # Backpressure: stop reading until the oldest request has been written
+            if len(window) >= workers * 4:
+                write_oldest()
+            window.append((line_number, pool.submit(run_request, line_number, line)))
+        while window:
+            write_oldest()
+    out.flush()
+    return 0 if failed == 0 else 1
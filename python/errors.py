@@ -40,3 +40,9 @@ class ContinueException(CustomError):
     def __init__(self, message):
         super().__init__(message)
 
+
+class LimitExceededError(RuntimeError):
+    """Exception raised when a script exceeds one of its ExecutionLimits."""
+    def __init__(self, limit, message):
+        self.limit = limit  # "steps", "time", "memory" or "depth"
+        super().__init__(message)
@@ -2,34 +2,242 @@ from .ast_nodes import (
     ASTNode, Program,
     FunctionDefinition, FunctionCall, Assignment, PrintStatement,
     WaitStatement, MoveMouse, KeyOperation, ButtonOperation,
-    BinaryOperation, Identifier, Integer, Time, String, Boolean, Float,
+    BinaryOperation, UnaryOperation, Identifier, Integer, Time, String, Boolean, Float,
     WhileLoop, RepeatLoop, ControlStatement, IncrementDecrement, 
     IfStatement, MoveWindow, FocusWindow, WindowExists,
     LambdaFunction, FunctionComposition, Point, NamedArgument
 )
+import time
+import builtins
 import logging
-from typing import Any, Dict, List 
-from .errors import TypeError, RuntimeError, ContinueException, ControlFlowException, ZeroDivisionError
+from collections import ChainMap
+from typing import Any, Dict, List, Optional
+from .errors import TypeError, RuntimeError, ContinueException, ControlFlowException, ZeroDivisionError, LimitExceededError
+from .limits import ExecutionLimits, current_memory
 from .utils import WindowManager
 from .utils import MouseManager
+from .utils import OutputSink
+from .utils import InputEventQueue
+from .utils.trajectory import trajectory
 
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+class ScriptLambda:
+    """A LAMBDA value: its parameters, body and captured scope, and the executor that
+    runs it when called.
+
+    It is data rather than a closure over the executor, so a lambda restored from a
+    snapshot can be bound to the executor that restored it (see bind_value).
+    """
+    def __init__(self, executor, parameters: List[str], body: List[ASTNode], closure: Dict[str, Any]):
+        self.executor = executor
+        self.parameters = parameters
+        self.body = body
+        self.closure = closure
+
+    def __call__(self, *args):
+        # Create a new scope for the lambda function
+        lambda_scope = dict(self.closure)  # Copy the closure
+
+        # Map arguments to parameters
+        for i, param in enumerate(self.parameters):
+            if i < len(args):
+                lambda_scope[param] = args[i]
+            else:
+                raise RuntimeError(f"Missing argument for parameter '{param}'.")
+
+        # Execute the lambda function body
+        result = None
+        for stmt in self.body:
+            try:
+                result = self.executor.execute_statement(stmt, lambda_scope)
+            except ControlFlowException as cf:
+                if cf.statement_type == "RETURN":
+                    return cf.value
+                else:
+                    raise
+        return result
+
+    def bind(self, executor, memo: Dict[int, Any]) -> "ScriptLambda":
+        bound = memo[id(self)] = ScriptLambda(executor, self.parameters, self.body, {})
+        bound.closure = {name: bind_value(value, executor, memo) for name, value in self.closure.items()}
+        return bound
+
+    def __repr__(self):
+        return f"<lambda ({', '.join(self.parameters)})>"
+
+class FunctionReference:
+    """A DEFUN used as a value, e.g. SET f = add; called through the executor that holds it."""
+    def __init__(self, executor, function: FunctionDefinition, scope: Dict[str, Any]):
+        self.executor = executor
+        self.function = function
+        self.scope = scope
+
+    def __call__(self, *args):
+        call_expr = FunctionCall(self.function.name, [Integer(arg) if isinstance(arg, (int, float)) else arg for arg in args])
+        return self.executor.execute_functioncall(call_expr, self.scope)
+
+    def bind(self, executor, memo: Dict[int, Any]) -> "FunctionReference":
+        # Only a reference taken at top level can be restored, and then it reads the new globals
+        scope = executor.global_scope if self.scope is self.executor.global_scope else self.scope
+        bound = memo[id(self)] = FunctionReference(executor, self.function, scope)
+        return bound
+
+    def __repr__(self):
+        return f"<function {self.function.name}({', '.join(self.function.parameters)})>"
+
+def bind_value(value: Any, executor, memo: Dict[int, Any]) -> Any:
+    """Return value with every lambda and function reference in it run by executor.
+
+    memo maps values already bound to their copies, so shared values stay shared.
+    """
+    if isinstance(value, (ScriptLambda, FunctionReference)):
+        bound = memo.get(id(value))
+        return bound if bound is not None else value.bind(executor, memo)
+    if isinstance(value, dict) and 'value' in value:
+        # A typed variable wraps its value
+        inner = bind_value(value['value'], executor, memo)
+        return value if inner is value['value'] else {**value, 'value': inner}
+    return value
+
+class ExecutorSnapshot:
+    """Interpreter state captured by Executor.snapshot().
+
+    Script values are never changed in place (every assignment binds a new value), so
+    shallow copies of the scope and function tables are enough; windows and the mouse
+    are mutable and are copied. Lambdas and function references name the executor
+    that runs them, so restore() binds them to the restoring executor. A snapshot is
+    never modified, so it can be restored any number of times.
+    """
+    def __init__(self, global_scope: Dict[str, Any], functions: Dict[str, Any],
+                 window_manager: WindowManager, mouse_manager: MouseManager):
+        self.global_scope = global_scope
+        self.functions = functions
+        self.window_manager = window_manager
+        self.mouse_manager = mouse_manager
+
 class Executor:
-    def __init__(self, verbose=False):
+    # Mouse wheel "buttons" and the notches they scroll by
+    WHEEL = {"WHEEL_UP": 1, "SCROLL_UP": 1, "WHEEL_DOWN": -1, "SCROLL_DOWN": -1}
+
+    def __init__(self, verbose=False, functions=None, output=None, limits=None, input_queue=None, backend=None):
+        self.verbose = verbose
+        self.output = output if output is not None else OutputSink()
+        # Mouse and key events also go to a device backend through this queue, if any
+        if input_queue is None and backend is not None:
+            input_queue = InputEventQueue(backend)
+        self.input_queue = input_queue
+        self.reset(functions)
+        self.set_limits(limits)
+
+    def reset(self, functions=None):
+        """Drop all per-run state so the executor can be reused for another program.
+
+        Args:
+            functions: Optional pre-resolved function table, which may be shared
+                between executors (see session.py)
+        """
         self.global_scope = {}
-        self.functions = {}
+        self.functions = functions if functions is not None else {}
         self.call_stack = []
-        self.verbose = verbose
         self.window_manager = WindowManager()
         self.mouse_manager = MouseManager()
 
+    def snapshot(self) -> ExecutorSnapshot:
+        """Capture globals, functions, windows and mouse, e.g. after a shared prelude."""
+        return ExecutorSnapshot(dict(self.global_scope), dict(self.functions),
+                                self.window_manager.copy(), self.mouse_manager.copy())
+
+    def restore(self, snapshot: ExecutorSnapshot):
+        """Return to the state captured by snapshot, without re-running anything.
+
+        Functions defined after the restore go into a fresh map in front of the
+        snapshot's, which is shared rather than copied. Lambdas and function references
+        in the globals are rebound, so they run on this executor's output, devices,
+        limits and call stack instead of those of the executor that made them.
+        """
+        self.global_scope = {}
+        memo = {}
+        self.global_scope.update((name, bind_value(value, self, memo))
+                                 for name, value in snapshot.global_scope.items())
+        self.functions = ChainMap({}, snapshot.functions)
+        self.call_stack = []
+        self.window_manager = snapshot.window_manager.copy()
+        self.mouse_manager = snapshot.mouse_manager.copy()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: ExecutorSnapshot, verbose=False, output=None, limits=None,
+                      input_queue=None, backend=None) -> "Executor":
+        """Create an executor that starts from snapshot, e.g. one per scenario on a thread pool."""
+        executor = cls(verbose=verbose, output=output, limits=limits, input_queue=input_queue, backend=backend)
+        executor.restore(snapshot)
+        return executor
+
+    def set_limits(self, limits: Optional[ExecutionLimits]):
+        """Enforce limits on every later execute(), or stop enforcing them if None.
+
+        The checks are installed on this instance only: with no limits, statements
+        dispatch straight to the class methods and loops skip a single None test.
+        The memory limit is checked against the resident memory of the whole process,
+        so executors running on other threads count towards it too.
+        """
+        self.limits = limits if limits is not None and limits.enabled else None
+        self.steps = 0
+        self.deadline = None
+        self.memory_ceiling = None
+        for name in ("execute_statement", "execute_functioncall"):
+            self.__dict__.pop(name, None)
+        if self.limits is None:
+            self.tick = None
+            return
+        self.tick = self.check_limits
+        self.execute_statement = self.limited_execute_statement
+        if self.limits.max_depth is not None:
+            self.execute_functioncall = self.limited_execute_functioncall
+
+    def start_limits(self):
+        """Start counting a run's steps, time and memory from zero."""
+        limits = self.limits
+        self.steps = 0
+        self.deadline = time.monotonic() + limits.timeout if limits.timeout is not None else None
+        self.memory_ceiling = None
+        if limits.max_memory is not None:
+            base = current_memory()
+            if base is None:
+                logger.warning("Memory limit not enforced: resident memory cannot be read on this platform.")
+            else:
+                self.memory_ceiling = base + limits.max_memory
+
+    def check_limits(self):
+        """Count one step, raising LimitExceededError if the run is over any of its limits."""
+        self.steps += 1
+        limits = self.limits
+        if limits.max_steps is not None and self.steps > limits.max_steps:
+            raise LimitExceededError("steps", f"Step limit of {limits.max_steps} exceeded")
+        if self.steps % limits.check_interval:
+            return
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise LimitExceededError("time", f"Time limit of {limits.timeout}s exceeded after {self.steps} steps")
+        if self.memory_ceiling is not None:
+            memory = current_memory()
+            if memory is not None and memory > self.memory_ceiling:
+                raise LimitExceededError("memory", f"Memory limit of {limits.max_memory} bytes exceeded after {self.steps} steps")
+
+    def limited_execute_statement(self, stmt: ASTNode, scope: Dict[str, Any]):
+        self.check_limits()
+        return Executor.execute_statement(self, stmt, scope)
+
+    def limited_execute_functioncall(self, stmt: FunctionCall, scope: Dict[str, Any]):
+        if len(self.call_stack) >= self.limits.max_depth:
+            raise LimitExceededError("depth", f"Call depth limit of {self.limits.max_depth} exceeded in '{stmt.function_name}'")
+        return Executor.execute_functioncall(self, stmt, scope)
+
     def log_execution(self, message: str):
         """Log execution message if verbose mode is enabled."""
         if self.verbose:
-            print(message)
+            self.output.write(message + "\n")
         logger.debug(message)
 
     def execute(self, ast: Program):
@@ -39,9 +247,22 @@ class Executor:
             ast (Program): The AST program to execute
         """
         logger.info("Starting execution of AST.")
+        if self.limits is not None:
+            self.start_limits()
         
-        for stmt in ast.statements:
-            self.execute_statement(stmt, self.global_scope)
+        try:
+            for stmt in ast.statements:
+                self.execute_statement(stmt, self.global_scope)
+        except RecursionError:
+            if self.limits is None:
+                raise
+            # Runaway recursion reaches Python's own limit before any max_depth that is too high
+            raise LimitExceededError("depth", f"Call depth exceeded Python's recursion limit after {self.steps} steps") from None
+        finally:
+            # Pending output must reach the stream before any error is reported
+            self.output.flush()
+            if self.input_queue is not None:
+                self.input_queue.flush()
         
         logger.info("Execution completed successfully.")
 
@@ -120,49 +341,48 @@ class Executor:
     def execute_printstatement(self, stmt: PrintStatement, scope: Dict[str, Any]):
         value = self.evaluate_expression(stmt.expression, scope)
         if stmt.print_type == "PRINTLN":
-            print(value)
+            self.output.write(f"{value}\n")
         else:
-            print(value, end='')
+            self.output.write(f"{value}")
         self.log_execution(f"Executed PrintStatement: {value}")
 
     def execute_waitstatement(self, stmt: WaitStatement, scope: Dict[str, Any]):
         value = self.evaluate_expression(stmt.expression, scope)
-        # Implement wait logic here, e.g., time.sleep(value)
+        if self.input_queue is not None:
+            # Delivers the events before the wait; pausing is up to the backend
+            self.input_queue.wait(value)
         self.log_execution(f"Executed WaitStatement: Waiting for {value} seconds.")
 
-    def execute_movemouse(self, stmt: MoveMouse, scope: Dict[str, Any]):
-        """Execute a mouse movement statement."""
-        if stmt.variable:
-            # If we have a point variable or direct point
-            point = self.evaluate_expression(stmt.variable, scope)
-            if isinstance(point, Point):
-                # Get the actual numeric values from the point
-                x = self.evaluate_expression(point.x, scope)
-                y = self.evaluate_expression(point.y, scope)
-            else:
-                raise TypeError(f"Expected Point type, got {type(point)}")
-        else:
-            # Otherwise evaluate both x and y coordinates
-            x = self.evaluate_expression(stmt.x, scope)
-            y = self.evaluate_expression(stmt.y, scope)
-
-        # Convert to integers if needed
-        x = int(x) if isinstance(x, float) else x
-        y = int(y) if isinstance(y, float) else y
-
-        self.mouse_manager.move(x, y)
-        self.log_execution(f"Executed MoveMouse to ({x}, {y}).")
-
     def execute_keyoperation(self, stmt: KeyOperation, scope: Dict[str, Any]):
         key = stmt.key
         operation = stmt.operation
-        # Implement key operation logic here
+        queue = self.input_queue
+        if queue is not None:
+            if operation != "RELEASE":
+                queue.key_down(key)
+            if operation != "HOLD":
+                queue.key_up(key)
         self.log_execution(f"Executed KeyOperation: {operation} {key}.")
 
     def execute_buttonoperation(self, stmt: ButtonOperation, scope: Dict[str, Any]):
         button = stmt.button
-        # Implement button operation logic here
-        self.log_execution(f"Executed ButtonOperation: {button}.")
+        operation = stmt.operation
+        queue = self.input_queue
+        if button in self.WHEEL:
+            # The wheel has no down and up: every PRESS, HOLD or RELEASE turns it a notch
+            if queue is not None:
+                queue.scroll(self.WHEEL[button])
+        else:
+            if operation == "HOLD":
+                self.mouse_manager.button_down(button)
+            elif operation == "RELEASE":
+                self.mouse_manager.button_up(button)
+            if queue is not None:
+                if operation != "RELEASE":
+                    queue.button_down(button)
+                if operation != "HOLD":
+                    queue.button_up(button)
+        self.log_execution(f"Executed ButtonOperation: {operation} {button}.")
 
     def execute_functioncall(self, stmt: FunctionCall, scope: Dict[str, Any]):
         """Execute a function call with proper return value handling."""
@@ -304,10 +524,29 @@ class Executor:
         return self.execute_functioncall(expr, scope)
 
     def evaluate_binaryoperation(self, expr: BinaryOperation, scope: Dict[str, Any]) -> Any:
-        left = self.evaluate_expression(expr.left, scope)
-        right = self.evaluate_expression(expr.right, scope)
-        operator = expr.operator
-
+        # Collect the left spine of a chain like a + b + c ... and fold it bottom-up in a
+        # loop, so long generated expressions do not recurse once per operator
+        spine = [expr]
+        node = expr.left
+        while isinstance(node, BinaryOperation):
+            spine.append(node)
+            node = node.left
+        left = self.evaluate_expression(node, scope)
+
+        for node in reversed(spine):
+            operator = node.operator
+            # AND/OR short-circuit and, like Python, return the deciding operand
+            if operator in ('AND', '&&'):
+                if not left:
+                    continue
+            elif operator in ('OR', '||'):
+                if left:
+                    continue
+            right = self.evaluate_expression(node.right, scope)
+            left = self.apply_binary_operator(operator, left, right)
+        return left
+
+    def apply_binary_operator(self, operator: str, left: Any, right: Any) -> Any:
         logger.debug("Evaluating BinaryOperation: %s %s %s", left, operator, right)
 
         try:
@@ -330,6 +569,10 @@ class Executor:
                 elif right == 0:
                     raise ZeroDivisionError("Division by zero.")
                 return left // right
+            elif operator == '%':
+                if right == 0:
+                    raise ZeroDivisionError("Modulo by zero.")
+                return left % right
             elif operator == '**':
                 return left ** right
             elif operator == '==':
@@ -344,10 +587,28 @@ class Executor:
                 return left >= right
             elif operator == '<=':
                 return left <= right
-            elif operator == '&&':
-                return left and right
-            elif operator == '||':
-                return left or right
+            elif operator in ('===', 'IS'):
+                # Strict equality: same type and same value
+                return type(left) is type(right) and left == right
+            elif operator in ('!==', 'IS NOT'):
+                return not (type(left) is type(right) and left == right)
+            elif operator == 'IN':
+                return left in right
+            elif operator == 'NOT IN':
+                return left not in right
+            elif operator in ('AND', '&&', 'OR', '||'):
+                # Only reached when the left operand did not decide the result
+                return right
+            elif operator == '|':
+                return left | right
+            elif operator == '&':
+                return left & right
+            elif operator == '^':
+                return left ^ right
+            elif operator == '<<':
+                return left << right
+            elif operator == '>>':
+                return left >> right
             elif operator == '|>':
                 # Handle function composition
                 if not callable(right):
@@ -356,10 +617,26 @@ class Executor:
             else:
                 logger.error("Unsupported operator '%s'.", operator)
                 raise TypeError(f"Unsupported operator '{operator}'.")
-        except TypeError as e:
+        except (TypeError, builtins.TypeError) as e:
+            # Python's own TypeError too, e.g. from 2 - "a" or 1 IN 5
             logger.error("Type error in binary operation: %s", e)
             raise TypeError(f"Type error in binary operation: {e}")
 
+    def evaluate_unaryoperation(self, expr: UnaryOperation, scope: Dict[str, Any]) -> Any:
+        operand = self.evaluate_expression(expr.operand, scope)
+        try:
+            if expr.operator == 'NOT':
+                return not operand
+            elif expr.operator == '~':
+                return ~operand
+            elif expr.operator == '-':
+                return -operand
+        except builtins.TypeError as e:
+            logger.error("Type error in unary operation: %s", e)
+            raise TypeError(f"Type error in unary operation: {e}")
+        logger.error("Unsupported unary operator '%s'.", expr.operator)
+        raise TypeError(f"Unsupported unary operator '{expr.operator}'.")
+
     def evaluate_float(self, expr: Float, scope: Dict[str, Any]) -> float:
         """Return the float value of the expression."""
         logger.debug("Evaluating Float: %s", expr.value)
@@ -387,14 +664,7 @@ class Executor:
         # If not found as a variable, check if it's a function reference
         if expr.name in self.functions:
             # Return a callable that will execute the function when called
-            func_def = self.functions[expr.name]
-            def callable_function(*args):
-                call_expr = FunctionCall(expr.name, [Integer(arg) if isinstance(arg, (int, float)) else arg for arg in args])
-                return self.execute_functioncall(call_expr, scope)
-            
-            # Add a custom __repr__ to the callable_function
-            callable_function.__repr__ = lambda : f"<function {func_def.name}({', '.join(func_def.parameters)})>"
-            return callable_function
+            return FunctionReference(self, self.functions[expr.name], scope)
         
         # If not found anywhere, raise an error
         logger.error("Undefined identifier '%s'.", expr.name)
@@ -432,7 +702,10 @@ class Executor:
 
     def execute_whileloop(self, stmt: WhileLoop, scope: Dict[str, Any]):
         """Execute a while loop with proper control flow."""
+        tick = self.tick  # Counts each iteration while limits are set, so WHILE (TRUE) {} ends too
         while self.evaluate_expression(stmt.condition, scope):
+            if tick is not None:
+                tick()
             try:
                 for body_stmt in stmt.body:
                     try:
@@ -452,8 +725,11 @@ class Executor:
     def execute_repeatloop(self, stmt: RepeatLoop, scope: Dict[str, Any]):
         """Execute a repeat loop with proper control flow."""
         count = int(self.evaluate_expression(stmt.count, scope))
+        tick = self.tick
         
         for _ in range(count):
+            if tick is not None:
+                tick()
             try:
                 for body_stmt in stmt.body:
                     try:
@@ -565,9 +841,26 @@ class Executor:
         x = int(x) if isinstance(x, float) else x
         y = int(y) if isinstance(y, float) else y
 
+        duration = None
+        if stmt.duration is not None:
+            duration = self.evaluate_expression(stmt.duration, scope)
+            if not isinstance(duration, (int, float)) or isinstance(duration, bool) or duration < 0:
+                raise TypeError(f"MOVE MOUSE TIME expects a non-negative duration, got {duration!r}")
+
+        if self.input_queue is not None:
+            if duration:
+                self.stream_mouse_path(self.mouse_manager.get_position(), (x, y), duration, stmt.profile)
+            else:
+                self.input_queue.move(x, y)
         self.mouse_manager.move(x, y)
         self.log_execution(f"Executed MoveMouse to ({x}, {y}).")
 
+    def stream_mouse_path(self, start, end, duration: float, profile: str):
+        """Send a timed move to the backend as one trajectory at the backend's sample rate."""
+        rate = self.input_queue.backend.sample_rate
+        xs, ys = trajectory(start, end, duration, rate, profile)
+        self.input_queue.move_path(xs, ys, 1 / rate)
+
     def execute_movewindow(self, stmt: MoveWindow, scope: Dict[str, Any]):
         window_name = self.evaluate_expression(stmt.window_name, scope)
         x = self.evaluate_expression(stmt.x, scope)
@@ -639,39 +932,7 @@ class Executor:
         """Evaluate a lambda function expression."""
         # Lambda functions are evaluated when they are called, not when they are defined
         # Here we return a callable that will execute the lambda function when called
-        
-        lambda_func = {
-            'parameters': expr.parameters,
-            'body': expr.body,
-            'closure': dict(scope)  # Capture current scope for closure
-        }
-        
-        def callable_lambda(*args):
-            # Create a new scope for the lambda function
-            lambda_scope = dict(lambda_func['closure'])  # Copy the closure
-            
-            # Map arguments to parameters
-            for i, param in enumerate(lambda_func['parameters']):
-                if i < len(args):
-                    lambda_scope[param] = args[i]
-                else:
-                    raise RuntimeError(f"Missing argument for parameter '{param}'.")
-            
-            # Execute the lambda function body
-            result = None
-            for stmt in lambda_func['body']:
-                try:
-                    result = self.execute_statement(stmt, lambda_scope)
-                except ControlFlowException as cf:
-                    if cf.statement_type == "RETURN":
-                        return cf.value
-                    else:
-                        raise
-            return result
-
-        callable_lambda.__repr__ = lambda : f"<lambda ({', '.join(expr.parameters)})>"
-        
-        return callable_lambda
+        return ScriptLambda(self, expr.parameters, expr.body, dict(scope))  # Capture current scope for closure
 
 
 
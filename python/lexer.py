@@ -1,4 +1,7 @@
 import re
+import os
+import mmap
+import stat
 import logging
 from .errors import InvalidNumberError, SyntaxError
 from .ast_nodes import Token
@@ -7,7 +10,13 @@ from .ast_nodes import Token
 logger = logging.getLogger(__name__)
 
 class Lexer:
-    def __init__(self, source_code):
+    """Turns source code into a linked list of Tokens.
+
+    source_code may be a str, or a bytes-like buffer of UTF-8 such as an mmap. A buffer is
+    matched in place with a bytes pattern and only token values are decoded, so the
+    source itself is never copied into a str.
+    """
+    def __init__(self, source_code, start_line=1):
         # Core language keywords
         self.keywords = {
             "SET",
@@ -141,7 +150,12 @@ class Lexer:
         self.source_code = source_code
         self.tokens = []
         self.current_pos = 0  # Initialize current_pos
-        self.line_num = 1  # Initialize line number
+        self.line_num = start_line  # Line of the first character, for sources cut from a larger file
+        # Open parentheses and braces across fed lines, counted apart (see feed)
+        self.paren_depth = 0
+        self.brace_depth = 0
+        self.unbalanced = False  # A closing bracket had nothing to close
+        self.pending_text = ""  # Unterminated string or block comment carried by feed
 
         # Define token patterns as a dictionary for more efficient lookup
         self.token_patterns = {
@@ -153,6 +167,7 @@ class Lexer:
             "KEYWORD": r"\b(?:" + "|".join([f"({k}|{k.lower()})" for k in (self.keywords | self.io_keywords | self.input_control_keywords | self.error_keywords)]) + r")\b",
             "KEYWORD_ASSERTION": r"\b(?:" + "|".join([f"({k}|{k.lower()})" for k in self.assertion_keywords]) + r")\b",
             "KEYWORD_TARGET": r"\b(?:" + "|".join([f"({k}|{k.lower()})" for k in self.target_keywords]) + r")\b",
+            "LOGICAL_OP": r"&&|\|\||\b(?:AND|OR|NOT|and|or|not)\b",
             
             # Special keys (case-sensitive)
             "KEYBOARD_KEY": r"\b(?:" + "|".join(self.keyboard_keys) + r")\b",
@@ -165,7 +180,7 @@ class Lexer:
             "FLOAT": r"\b\d+\.\d+\b",
             "INT": r"\b\d+\b",
             "TIME": r"\b\d+(?:\.\d+)?[smh]\b|\b\d+ms\b", 
-            "STR": r'(["\'])(?:\\.|[^\\\1])*?\1',
+            "STR": r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'',
             "BOOL": r"\b(?:TRUE|FALSE|true|false)\b",
 
             # Increment/decrement operators
@@ -176,10 +191,10 @@ class Lexer:
             "ID": r"\b[a-zA-Z_][a-zA-Z0-9_]*\b",
 
             # Operators (order matters - longer patterns first)
-            "COMP_OP": r"===|!==|==|!=|<=|>=|<|>|\|>",
+            "COMP_OP": r"===|!==|==|!=|<=|>=|<(?!<)|>(?!>)|\|>",  # << and >> are shifts
             "OP_ASSIGN": r"\+=|-=|\*=|/=|%=|&=|\^=|<<=|>>=|=",
             "BITWISE_OP": r"\||&|\^|~|<<|>>",
-            "OP": r"\*\*|//|[+\-*/]",  # Added ** and // as single operators
+            "OP": r"\*\*|//|[+\-*/%]",  # Added ** and // as single operators
             "TERMINATOR": r";",
 
             # Parentheses
@@ -198,7 +213,7 @@ class Lexer:
 
             # Newlines and whitespace
             "NEWLINE": r"\n",
-            "SKIP": r"[ \t]+",
+            "SKIP": r"[ \t\r]+",  # \r of CRLF line ends, which a text-mode read would drop
             "MISMATCH": r"."
         }
 
@@ -214,64 +229,18 @@ class Lexer:
         logger.info("Starting tokenization process.")
         previous_token = None
 
-        for match in re.finditer(self.token_regex, self.source_code):
-            kind = match.lastgroup
-            value = match.group() 
-
-            # Start of Selection
-            logger.debug(
-                "Matched token: %s with value '%s' at line %d.",
-                kind,
-                value.encode('unicode_escape').decode(),
-                self.line_num
-            )
-
-            if kind == "NEWLINE":
-                self.line_num += 1
-                logger.debug("Encountered NEWLINE. Incremented line number to %d.", self.line_num)
-                continue
-            elif kind in ["COMMENT", "SKIP"]:
-                logger.debug("Skipping token of kind '%s'.", kind)
-                continue
-
-            if kind == "FLOAT":
-                try:
-                    value = float(value)
-                except ValueError:
-                    logger.error("Invalid FLOAT value '%s' at line %d.", value, self.line_num)
-                    raise InvalidNumberError(f"Invalid FLOAT value '{value}' at line {self.line_num}")
-            elif kind == "INT":
-                value = int(value)
-            elif kind == "TIME":
-                value = self.process_time_with_unit(value)
-                kind = "TIME"
-            elif kind == "BOOL":
-                value = value.upper() == "TRUE"  # Convert to Python boolean, case-insensitive
-            elif kind == "MISMATCH":
-                error_msg = f"Unexpected character at line {self.line_num}: {value}"
-                logger.error(error_msg)
-                raise SyntaxError(error_msg)
-
-            # Convert keyword values to uppercase for consistency
-            if kind in ["KEYWORD", "TYPE_KEYWORD", "KEYWORD_ASSERTION", "KEYWORD_TARGET", "LOOP"]:
-                value = value.upper()
-
-            # Handle KEYBOARD_KEY based on previous token
-            if kind == "KEYBOARD_KEY":
-                if previous_token and previous_token.kind == "TYPE_KEYWORD" and previous_token.value == "KEY":
-                    logger.debug("Valid KEYBOARD_KEY '%s' found.", value)
-                    pass  # Valid KEYBOARD_KEY
-                else:
-                    logger.debug("Invalid KEYBOARD_KEY context for '%s'. Treating as ID.", value)
-                    kind = "ID"  # Treat as ID if not valid in context
-
-            # Create Token with line number
-            current_token = Token(kind, value, self.line_num, previous_token)
-            if previous_token:
-                previous_token.next_token = current_token
-            self.tokens.append(current_token)
-            logger.debug("Appended token: %s, line: %d", current_token, self.line_num)
-            previous_token = current_token
+        if isinstance(self.source_code, str):
+            for match in re.finditer(self.token_regex, self.source_code):
+                current_token = self.make_token(match.lastgroup, match.group(), previous_token)
+                if current_token is not None:
+                    previous_token = current_token
+        else:
+            # Every pattern is ASCII, so the bytes pattern matches the same tokens
+            for match in re.finditer(self.token_regex.encode(), self.source_code):
+                value = match.group().decode("utf-8", "replace")  # A stray byte is a MISMATCH anyway
+                current_token = self.make_token(match.lastgroup, value, previous_token)
+                if current_token is not None:
+                    previous_token = current_token
 
         # Add EOF token with current line number
         eof_token = Token("EOF", None, self.line_num, previous_token)
@@ -283,6 +252,154 @@ class Lexer:
         logger.info("Tokenization process completed successfully.")
         return self.connect_tokens()
 
+    def make_token(self, kind, value, previous_token):
+        """Turn one regex match into a Token appended to self.tokens.
+
+        Returns None for matches that do not produce a token (whitespace, newlines and
+        comments), after updating the line count.
+        """
+        # Start of Selection
+        logger.debug(
+            "Matched token: %s with value '%s' at line %d.",
+            kind,
+            value.encode('unicode_escape').decode(),
+            self.line_num
+        )
+
+        if kind == "NEWLINE":
+            self.line_num += 1
+            logger.debug("Encountered NEWLINE. Incremented line number to %d.", self.line_num)
+            return None
+        elif kind in ["COMMENT", "SKIP"]:
+            logger.debug("Skipping token of kind '%s'.", kind)
+            self.line_num += value.count("\n")  # Block comments may span lines
+            return None
+
+        line = self.line_num
+        if kind == "FLOAT":
+            try:
+                value = float(value)
+            except ValueError:
+                logger.error("Invalid FLOAT value '%s' at line %d.", value, self.line_num)
+                raise InvalidNumberError(f"Invalid FLOAT value '{value}' at line {self.line_num}")
+        elif kind == "INT":
+            value = int(value)
+        elif kind == "TIME":
+            value = self.process_time_with_unit(value)
+            kind = "TIME"
+        elif kind == "STR":
+            self.line_num += value.count("\n")  # String literals may span lines
+        elif kind == "BOOL":
+            value = value.upper() == "TRUE"  # Convert to Python boolean, case-insensitive
+        elif kind == "MISMATCH":
+            error_msg = f"Unexpected character at line {self.line_num}: {value}"
+            logger.error(error_msg)
+            raise SyntaxError(error_msg)
+
+        # Convert keyword values to uppercase for consistency
+        if kind in ["KEYWORD", "TYPE_KEYWORD", "KEYWORD_ASSERTION", "KEYWORD_TARGET", "LOOP"]:
+            value = value.upper()
+        elif kind == "LOGICAL_OP":
+            value = {"&&": "AND", "||": "OR"}.get(value, value.upper())
+
+        # Handle KEYBOARD_KEY based on previous token
+        if kind == "KEYBOARD_KEY":
+            if previous_token and previous_token.kind == "TYPE_KEYWORD" and previous_token.value == "KEY":
+                logger.debug("Valid KEYBOARD_KEY '%s' found.", value)
+                pass  # Valid KEYBOARD_KEY
+            else:
+                logger.debug("Invalid KEYBOARD_KEY context for '%s'. Treating as ID.", value)
+                kind = "ID"  # Treat as ID if not valid in context
+
+        # Create Token with line number
+        current_token = Token(kind, value, line, previous_token)
+        if previous_token:
+            previous_token.next_token = current_token
+        self.tokens.append(current_token)
+        logger.debug("Appended token: %s, line: %d", current_token, line)
+        return current_token
+
+    def feed(self, line):
+        """Lex one more line of interactive input.
+
+        Lexer state is carried from line to line: bracket depths, the last token, and any
+        string literal or #* block comment that is still open. An open literal or comment
+        is held back and lexed together with the following line(s); everything else is
+        lexed exactly once.
+
+        Returns:
+            List[Token]: The tokens completed by this line, also kept in self.tokens
+        """
+        text = self.pending_text + line + "\n"
+        self.pending_text = ""
+        previous_token = self.tokens[-1] if self.tokens else None
+        first_new = len(self.tokens)
+
+        for match in re.finditer(self.token_regex, text):
+            kind = match.lastgroup
+            value = match.group()
+            unterminated_comment = kind == "COMMENT" and value.startswith("#*") and not value.endswith("*#")
+            unterminated_string = kind == "MISMATCH" and value in "\"'"
+            if unterminated_comment or unterminated_string:
+                # Hold the rest of the text back until the literal or comment is closed
+                self.pending_text = text[match.start():]
+                break
+
+            current_token = self.make_token(kind, value, previous_token)
+            if current_token is None:
+                continue
+            if kind == "L_PAREN":
+                self.paren_depth += 1
+            elif kind == "L_BRACE":
+                self.brace_depth += 1
+            elif kind == "R_PAREN":
+                self.paren_depth -= 1
+                self.unbalanced |= self.paren_depth < 0
+            elif kind == "R_BRACE":
+                self.brace_depth -= 1
+                self.unbalanced |= self.brace_depth < 0
+            previous_token = current_token
+
+        return self.tokens[first_new:]
+
+    @property
+    def depth(self):
+        """Parentheses and braces still open across fed lines."""
+        return self.paren_depth + self.brace_depth
+
+    @property
+    def in_literal(self):
+        """True while a string literal or block comment is open across lines."""
+        return bool(self.pending_text)
+
+    def at_statement_end(self):
+        """True when the fed tokens form complete top-level statements."""
+        return (
+            bool(self.tokens)
+            and not self.pending_text
+            and self.paren_depth == 0
+            and self.brace_depth == 0
+            and self.tokens[-1].kind in ("TERMINATOR", "R_BRACE")
+        )
+
+    def take_tokens(self):
+        """Hand the fed tokens to the parser, terminated by EOF, and start afresh."""
+        tokens = self.tokens
+        eof_token = Token("EOF", None, self.line_num, tokens[-1] if tokens else None)
+        if tokens:
+            tokens[-1].next_token = eof_token
+        tokens.append(eof_token)
+        self.reset_feed()
+        return tokens
+
+    def reset_feed(self):
+        """Drop everything fed so far, e.g. after a syntax error in interactive input."""
+        self.tokens = []
+        self.pending_text = ""
+        self.paren_depth = 0
+        self.brace_depth = 0
+        self.unbalanced = False
+
     def process_time_with_unit(self, match_str):
         logger.debug("Processing TIME token '%s'.", match_str)
         time_match = re.match(r'(\d+(?:\.\d+)?)(ms|s|m|h)', match_str)
@@ -344,4 +461,19 @@ class Lexer:
             return token
         else:
             logger.debug("No more tokens. Returning EOF.")
-            return Token("EOF", None, self.line_num)
\ No newline at end of file
+            return Token("EOF", None, self.line_num)
+
+def tokenize_file(path, start_line=1):
+    """Tokenize a file straight from a read-only memory map of it.
+
+    The file's pages stay in the page cache instead of being read into a str, which
+    matters for multi-hundred-MB generated scripts.
+    """
+    with open(path, 'rb') as file:
+        info = os.fstat(file.fileno())
+        if not stat.S_ISREG(info.st_mode):
+            return Lexer(file.read(), start_line).tokenize()  # Pipes and devices cannot be mapped
+        if info.st_size == 0:
+            return Lexer("", start_line).tokenize()  # Nor can an empty file
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            return Lexer(source, start_line).tokenize()
@@ -0,0 +1,61 @@
+import os
+import logging
+from typing import Optional
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+class ExecutionLimits:
+    """Resource limits for one run of an Executor.
+
+    Any limit left as None is not enforced, and an executor with no limits set runs
+    exactly as fast as one without this feature. The step count and call depth are
+    checked on every statement and loop iteration; the clock and memory, which cost
+    more to read, every check_interval steps.
+
+    max_memory is a ceiling on the whole process, not an account of what one run
+    allocated: it is the resident memory when the run starts plus max_memory. Runs
+    sharing a process, like the threads of an InterpreterServer or SessionPool, each
+    see the others' memory too, so one run's growth can stop another. Run scripts in
+    separate processes, as run_batch does, to limit each one on its own.
+
+    Args:
+        max_steps: Statements and loop iterations a run may execute
+        timeout: Wall-clock seconds a run may take
+        max_memory: Bytes the process's resident memory may grow by while a run lasts
+        max_depth: Nested function calls a run may make
+        check_interval: Steps between checks of the clock and memory
+    """
+    def __init__(self, max_steps: Optional[int] = None, timeout: Optional[float] = None,
+                 max_memory: Optional[int] = None, max_depth: Optional[int] = None,
+                 check_interval: int = 128):
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.max_depth = max_depth
+        self.check_interval = max(1, check_interval)
+
+    @property
+    def enabled(self) -> bool:
+        return any(limit is not None for limit in (self.max_steps, self.timeout, self.max_memory, self.max_depth))
+
+    def __repr__(self):
+        return (f"ExecutionLimits(max_steps={self.max_steps}, timeout={self.timeout}, "
+                f"max_memory={self.max_memory}, max_depth={self.max_depth})")
+
+_page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def current_memory() -> Optional[int]:
+    """Resident memory of this process in bytes, or None where it cannot be read cheaply."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _page_size
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Only the peak is available here; ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
@@ -0,0 +1,120 @@
+import gc
+import logging
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List
+from .ast_nodes import ASTNode, Token
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+class StageMemory:
+    """What one pipeline stage allocated and kept."""
+    def __init__(self, name: str, peak: int, retained: int, sites: List[tracemalloc.StatisticDiff],
+                 objects: Counter):
+        self.name = name
+        self.peak = peak  # Highest traced memory above the stage's starting point
+        self.retained = retained  # Traced memory still reachable when the stage ended
+        self.sites = sites  # Allocation sites that grew most during the stage
+        self.objects = objects  # Live Tokens and AST nodes by type when the stage ended
+
+class MemoryProfile:
+    """tracemalloc profile of the lex, parse and execute stages of one run.
+
+    Each stage is run through stage(), which records its peak and retained memory, the
+    top allocation sites of what it kept, and how many Tokens and AST nodes of each type
+    are alive afterwards. attach() also counts the scope dicts an executor creates.
+    """
+    # Allocations made by the profiler itself are not the program's
+    IGNORED = (tracemalloc.__file__, __file__, "<frozen importlib._bootstrap>")
+
+    def __init__(self, top: int = 10, frames: int = 1):
+        self.top = top
+        self.frames = frames
+        self.stages: List[StageMemory] = []
+        self.scopes = {"globals": 0, "calls": 0, "max_depth": 0}
+        self.executor = None
+        self.replaced = None
+
+    def start(self):
+        tracemalloc.start(self.frames)
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def stage(self, name: str, function, *args) -> Any:
+        """Run function(*args) as the stage called name and return its result."""
+        before = self.snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            return function(*args)
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            # Tokens link to each other both ways, so only the cycle collector frees them
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            sites = [diff for diff in self.snapshot().compare_to(before, "lineno") if diff.size_diff > 0]
+            self.stages.append(StageMemory(name, peak - start, current - start, sites[:self.top],
+                                           self.count_objects()))
+            logger.debug("Stage %s: peak %d bytes, retained %d bytes.", name, peak - start, current - start)
+
+    def snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in self.IGNORED])
+
+    @staticmethod
+    def count_objects() -> Counter:
+        counts = Counter()
+        for obj in gc.get_objects():
+            if isinstance(obj, (Token, ASTNode)):
+                counts[type(obj).__name__] += 1
+        return counts
+
+    def attach(self, executor):
+        """Count the scope dicts executor creates: one per function call, plus its globals."""
+        self.replaced = executor.__dict__.get("execute_functioncall")  # e.g. a call depth limit
+        execute_functioncall = executor.execute_functioncall
+        scopes = self.scopes
+
+        def counted_functioncall(stmt, scope: Dict[str, Any]):
+            scopes["calls"] += 1
+            scopes["max_depth"] = max(scopes["max_depth"], len(executor.call_stack) + 1)
+            return execute_functioncall(stmt, scope)
+
+        executor.execute_functioncall = counted_functioncall
+        self.executor = executor
+
+    def detach(self, executor):
+        if self.replaced is None:
+            executor.__dict__.pop("execute_functioncall", None)
+        else:
+            executor.execute_functioncall = self.replaced
+        self.scopes["globals"] = len(executor.global_scope)
+
+    def report(self) -> str:
+        """Return the per-stage memory report as text."""
+        rows = [f"{'stage':<10} {'peak':>12} {'retained':>12}"]
+        for stage in self.stages:
+            rows.append(f"{stage.name:<10} {format_size(stage.peak):>12} {format_size(stage.retained):>12}")
+        for stage in self.stages:
+            rows.append("")
+            rows.append(f"Top allocation sites of {stage.name} (retained):")
+            for diff in stage.sites:
+                frame = diff.traceback[0]
+                rows.append(f"  {format_size(diff.size_diff):>10} {diff.count_diff:>9} blocks  {frame.filename}:{frame.lineno}")
+            counts = ", ".join(f"{name} {count}" for name, count in stage.objects.most_common())
+            rows.append(f"Live objects after {stage.name}: {counts or 'none'}")
+        if self.executor is not None:
+            rows.append("")
+            rows.append(f"Scope dicts: 1 global holding {self.scopes['globals']} variables, "
+                        f"{self.scopes['calls']} created by function calls, "
+                        f"at most {self.scopes['max_depth']} call scopes live at once")
+        return "\n".join(rows)
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
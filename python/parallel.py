@@ -0,0 +1,152 @@
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+from .ast_nodes import Program, Assignment, IfStatement, WhileLoop, RepeatLoop
+from .lexer import Lexer
+from .parser import Parser
+from .errors import SyntaxError
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Just enough of the lexer to track brace depth: string literals and comments are
+# matched whole, so braces and semicolons inside them are skipped
+SPLIT_SCANNER = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|#\*[\s\S]*?\*#|#[^\n]*|[{}();\n]')
+# A closing brace followed by one of these continues the same IF statement
+CONTINUATION = re.compile(r'\s*(?:ELSE|ELSEIF|else|elseif)\b')
+TRAILING_SPACE = re.compile(r'\s*\Z')
+
+def find_split_points(source: str, chunks: int) -> List[Tuple[int, int]]:
+    """Return up to chunks - 1 (offset, line) pairs where source can be cut safely.
+
+    A cut goes just after a ';' or '}' outside any braces and parentheses, i.e. between
+    two top-level statements, taking the first such boundary after each evenly spaced
+    target offset. Parentheses count because a LAMBDA passed as an argument has a
+    block of its own.
+    """
+    if chunks <= 1:
+        return []
+    step = len(source) // chunks
+    points = []
+    depth = 0
+    parens = 0
+    line = 1
+    for match in SPLIT_SCANNER.finditer(source):
+        text = match.group()
+        if text == "\n":
+            line += 1
+            continue
+        if text == "{":
+            depth += 1
+            continue
+        if text == "(":
+            parens += 1
+            continue
+        if text == ")":
+            parens -= 1
+            continue
+        if text == "}":
+            depth -= 1
+        elif text != ";":
+            line += text.count("\n")  # String or comment
+            continue
+        if depth != 0 or parens != 0:
+            continue
+        end = match.end()
+        if end < step * (len(points) + 1):
+            continue
+        if text == "}" and CONTINUATION.match(source, end):
+            continue
+        if TRAILING_SPACE.match(source, end):
+            break  # Nothing but whitespace left to give another chunk
+        points.append((end, line))
+        if len(points) == chunks - 1:
+            break
+    return points
+
+def parse_chunk(source: str, start_line: int):
+    """Lex and parse one chunk in a worker, deferring names that earlier chunks may define."""
+    parser = Parser()
+    parser.unresolved_variables = []
+    parser.unresolved_functions = []
+    error = None
+    statements = []
+    try:
+        statements = parser.parse(Lexer(source, start_line).tokenize()).statements
+    except SyntaxError as e:
+        error = e
+    return statements, parser.defined_functions, parser.unresolved_variables, parser.unresolved_functions, error
+
+def link_globals(statements: List, global_types: Dict[str, Optional[str]]):
+    """Walk the global-scope assignments of a chunk in order.
+
+    Untyped assignments to a variable typed in an earlier chunk get that type, as they
+    would in a sequential parse, and every variable assigned is recorded in global_types.
+    """
+    for stmt in statements:
+        if isinstance(stmt, Assignment):
+            if stmt.var_type:
+                global_types[stmt.variable_name] = stmt.var_type
+            else:
+                stmt.var_type = global_types.get(stmt.variable_name)
+                global_types.setdefault(stmt.variable_name, None)
+        elif isinstance(stmt, IfStatement):
+            for body in [stmt.then_body, *stmt.else_if_bodies, stmt.else_body]:
+                link_globals(body, global_types)
+        elif isinstance(stmt, (WhileLoop, RepeatLoop)):
+            link_globals(stmt.body, global_types)
+
+class ParallelParser:
+    """Lex and parse one large source on a process pool.
+
+    The source is cut between top-level statements, the chunks are parsed in parallel
+    and their statements are merged in order. A chunk cannot see names defined by the
+    chunks before it, so those uses are checked at merge time instead; the result, and
+    any SyntaxError, is the same as a sequential parse.
+    """
+    def __init__(self, jobs: Optional[int] = None, min_chunk_size: int = 256 * 1024):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.min_chunk_size = min_chunk_size
+        self.defined_functions: Set[str] = set()
+        self.global_types: Dict[str, Optional[str]] = {}
+
+    def parse(self, source: str) -> Program:
+        self.defined_functions = set()
+        self.global_types = {}
+        chunks = min(self.jobs, max(1, len(source) // self.min_chunk_size))
+        points = find_split_points(source, chunks)
+        if not points:
+            parser = Parser()
+            program = parser.parse(Lexer(source).tokenize())
+            self.defined_functions = parser.defined_functions
+            link_globals(program.statements, self.global_types)
+            return program
+
+        bounds = [(0, 1)] + points
+        ends = [offset for offset, _ in points] + [len(source)]
+        logger.info("Parsing %d chunks on %d workers.", len(bounds), self.jobs)
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=logging.disable,
+                                 initargs=(logging.root.manager.disable,)) as pool:
+            results = pool.map(parse_chunk, [source[start:end] for (start, _), end in zip(bounds, ends)],
+                               [line for _, line in bounds])
+            statements = []
+            for chunk_statements, functions, variables, calls, error in results:
+                self.check_unresolved(variables, calls)
+                if error is not None:
+                    raise error
+                link_globals(chunk_statements, self.global_types)
+                self.defined_functions |= functions
+                statements.extend(chunk_statements)
+        return Program(statements)
+
+    def check_unresolved(self, variables: List[Tuple[str, int]], calls: List[Tuple[str, int]]):
+        """Raise for the first name that no earlier chunk defined."""
+        missing = [(line, "variable", name) for name, line in variables if name not in self.global_types]
+        missing += [(line, "function", name) for name, line in calls if name not in self.defined_functions]
+        if missing:
+            line, what, name = min(missing)
+            error_msg = f"Undefined {what} '{name}' at line {line}"
+            logger.error(error_msg)
+            raise SyntaxError(error_msg)
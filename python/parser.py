@@ -2,38 +2,50 @@ import logging
 from .ast_nodes import ( Token,
     Program, FunctionDefinition, FunctionCall, Assignment, PrintStatement,
     WaitStatement, MoveMouse, KeyOperation, ButtonOperation,
-    BinaryOperation, Identifier, Integer, Time, String, Boolean, Float,
+    BinaryOperation, UnaryOperation, Identifier, Integer, Time, String, Boolean, Float,
     ASTNode, WhileLoop, RepeatLoop, ControlStatement, IncrementDecrement,
     IfStatement, MoveWindow, FocusWindow, WindowExists, LambdaFunction, Point,
     FunctionComposition, NamedArgument
 )
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from .errors import SyntaxError
+from .symbol_table import SymbolTable
+from .utils.trajectory import PROFILES as MOTION_PROFILES
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+class EndOfInput(Exception):
+    """Raised when error recovery runs out of tokens inside an unclosed block."""
+
 class Parser:
+    precedence = {
+        '|>': 0,  # Function composition binds loosest
+        'OR': 1, 
+        'AND': 2,
+        'NOT': 3,  # Logical NOT applies to a whole comparison
+        '==': 4, '!=': 4, '<': 4, '>': 4, '<=': 4, '>=': 4, '===': 4, '!==': 4,
+        'IS': 4, 'IS NOT': 4, 'IN': 4, 'NOT IN': 4,
+        '|': 5,  # Bitwise OR
+        '^': 6,  # Bitwise XOR
+        '&': 7,  # Bitwise AND
+        '<<': 8, '>>': 8,  # Bit shifts
+        '+': 9, '-': 9,
+        '*': 10, '/': 10, '//': 10, '%': 10,
+        '~': 11,  # Unary bitwise NOT and minus
+        '**': 12,  # Exponentiation
+    }
+    right_associative = {'**'}
+
+    # Dispatch tables keyed on (token kind, token value), where a value of None matches
+    # any token of that kind. They are filled in by the register_* calls after the class.
+    statement_parsers: Dict[Tuple[str, Any], Callable] = {}
+    prefix_parsers: Dict[Tuple[str, Any], Callable] = {}
+    infix_parsers: Dict[Tuple[str, Any], Tuple[int, Callable]] = {}
+
     def __init__(self):
         self.pos = 0
-        self.precedence = {
-            'OR': 1, 
-            'AND': 2,
-            '==': 3, '!=': 3, '<': 3, '>': 3, '<=': 3, '>=': 3, '===': 3,
-            '|': 4,  # Bitwise OR
-            '^': 5,  # Bitwise XOR
-            '&': 6,  # Bitwise AND
-            '<<': 7, '>>': 7,  # Bit shifts
-            '+': 8, '-': 8,
-            '*': 9, '/': 9, '//': 9, '%': 9,
-            '**': 10,  # Exponentiation
-            'NOT': 11, '~': 11,  # Unary operators
-            'IS': 12, 'IN': 12
-        }
-        self.scope_stack = [{
-            'variables': {},
-            'functions': {}
-        }]  # Initialize with global scope
+        self.symbols = SymbolTable()  # Scoped variables, the global scope is depth 0
         self.data_types = {
             'INT': int,
             'FLOAT': float,
@@ -45,6 +57,12 @@ class Parser:
         self.global_scope = dict()
         self.functions = dict()
         self.current_context = []  # Stack to track current context (LOOP, FUNCTION)
+        self.recover = False
+        # Lists of (name, line) when names may be defined outside the tokens being parsed
+        # (see python/parallel.py); None means undefined names are errors right away
+        self.unresolved_variables = None
+        self.unresolved_functions = None
+        self.diagnostics = []  # Errors skipped over by parse(tokens, recover=True)
         self.defined_functions = set()  # Initialize a set to track defined functions
         
 
@@ -55,7 +73,6 @@ class Parser:
             return self.tokens[-1]  # Return EOF token
 
     def advance(self):
-        logger.debug("Advancing from token: %s", self.peek())
         self.pos += 1
 
     def consume(self, expected_kind):
@@ -64,159 +81,267 @@ class Parser:
             logger.error("Unexpected end of input. Expected %s at end of file.", expected_kind)
             raise SyntaxError(f"Unexpected end of input. Expected {expected_kind} at end of file.")
         
-        token = self.peek()
+        token = self.tokens[self.pos]
         if token.kind == expected_kind:
-            self.advance()
-            logger.debug("Consumed token: %s", token)
+            self.pos += 1
             return token
         else:
             error_msg = f"Expected {expected_kind}, got {token.kind} with value '{token.value}' at line {token.line}"
             logger.error(error_msg)
             raise SyntaxError(error_msg)
 
-    def parse(self, tokens: List[Token]) -> Program:
-        """Parse the tokens and return an abstract syntax tree (AST)."""
+    def parse(self, tokens: List[Token], recover: bool = False) -> Program:
+        """Parse the tokens and return an abstract syntax tree (AST).
+
+        With recover=True a syntax error does not end the parse. It is recorded in
+        self.diagnostics, the parser skips to the end of the broken statement and carries
+        on, and the Program holds every statement that did parse.
+        """
         self.tokens = tokens
         self.pos = 0
+        self.recover = recover
+        self.diagnostics = []
         logger.debug("Parser initialized with %d tokens.", len(tokens))
         logger.info("Starting parse process.")
         statements = []
-        while self.peek().kind != "EOF":
-            # Check if the next token is just a TERMINATOR
-            if self.peek().kind == "TERMINATOR":
-                logger.debug("Skipping TERMINATOR token at line %d.", self.peek().line)
-                self.advance()  # Skip the terminator
-                continue  # Avoid adding an EmptyStatement
-            stmt = self.parse_statement()
-            if stmt is not None:  # Only append non-None statements
-                statements.append(stmt)
-        logger.info("Parse process completed successfully.")
+        scope_depth = self.symbols.depth
+        context_depth = len(self.current_context)
+        try:
+            while self.peek().kind != "EOF":
+                # Check if the next token is just a TERMINATOR
+                if self.peek().kind == "TERMINATOR":
+                    logger.debug("Skipping TERMINATOR token at line %d.", self.peek().line)
+                    self.advance()  # Skip the terminator
+                    continue  # Avoid adding an EmptyStatement
+                stmt = self.parse_block_statement(top_level=True)
+                if stmt is not None:  # Only append non-None statements
+                    statements.append(stmt)
+        except EndOfInput:
+            # Recovery reached the end of the tokens inside an open block
+            self.symbols.exit_to(scope_depth)
+            del self.current_context[context_depth:]
+        logger.info("Parse process completed with %d diagnostics.", len(self.diagnostics))
         return Program(statements)
 
-    def parse_statement(self) -> Optional[ASTNode]:
-        """Parse a single statement."""
-        token = self.peek()
-        logger.debug("Parsing statement starting with token: %s", token)
+    def parse_block_statement(self, top_level: bool = False) -> Optional[ASTNode]:
+        """Parse one statement of a program or block, recovering from errors if asked to."""
+        if not self.recover:
+            return self.parse_statement()
 
-        if token.kind == "TERMINATOR":
-            logger.debug("Skipping TERMINATOR token at line %d.", token.line)
-            self.advance()
+        start = self.pos
+        scope_depth = self.symbols.depth
+        context_depth = len(self.current_context)
+        try:
+            return self.parse_statement()
+        except SyntaxError as e:
+            self.diagnostics.append({"line": self.peek().line, "message": str(e)})
+            self.symbols.exit_to(scope_depth)
+            del self.current_context[context_depth:]
+            self.synchronize(start, top_level)
             return None
 
-        elif token.kind == "KEYWORD" and token.value == "IF":
-            return self.parse_if_statement()
+    def synchronize(self, start: int, top_level: bool):
+        """Skip the rest of a broken statement that began at token index start.
+
+        The statement is rescanned from its start so braces opened before the error are
+        counted. It ends at the first TERMINATOR or closing brace at its own nesting level
+        that is not before the error, or just before the R_BRACE that closes the enclosing
+        block. A closing brace followed by ELSE/ELSEIF does not end the statement.
+        """
+        error_pos = self.pos
+        self.pos = start
+        depth = 0
+        while True:
+            kind = self.peek().kind
+            if kind == "EOF":
+                if top_level:
+                    return
+                raise EndOfInput()
+            if kind == "L_BRACE":
+                depth += 1
+            elif kind == "R_BRACE":
+                if depth == 0:
+                    if not top_level:
+                        return  # Leave it for the enclosing block
+                    self.advance()  # A stray brace cannot start a statement
+                    return
+                depth -= 1
+                if depth == 0 and self.pos >= error_pos:
+                    self.advance()
+                    following = self.peek()
+                    if not (following.kind == "KEYWORD" and following.value in ("ELSE", "ELSEIF")):
+                        return
+                    continue
+            elif kind == "TERMINATOR" and depth == 0 and self.pos >= error_pos:
+                self.advance()
+                return
+            self.advance()
+
+    def parse_incremental(self, tokens: List[Token]) -> Program:
+        """Parse one more input against the symbol tables left by earlier inputs.
+
+        If parsing fails, the names the input declared are withdrawn again and any scope
+        or context it opened is closed, so a half-parsed DEFUN cannot leak into later input.
+        """
+        scope_depth = self.symbols.depth
+        context_depth = len(self.current_context)
+        saved_variables = {}
+        new_functions = []
+        # Only names that follow SET or DEFUN in this input can change, so the undo
+        # record is proportional to the input, not to the session
+        for token, next_token in zip(tokens, tokens[1:]):
+            if next_token.kind != "ID":
+                continue
+            if token.value == "SET":
+                saved_variables.setdefault(next_token.value, self.symbols.lookup_global(next_token.value))
+            elif token.value == "DEFUN" and next_token.value not in self.defined_functions:
+                new_functions.append(next_token.value)
 
-        elif token.kind == "KEYWORD" and token.value == "DEFUN":
-            self.current_context.append("FUNCTION")
-            func_def = self.parse_function_definition()
-            self.current_context.pop()
-            return func_def
+        try:
+            return self.parse(tokens)
+        except Exception:
+            self.symbols.exit_to(scope_depth)
+            del self.current_context[context_depth:]
+            self.defined_functions.difference_update(new_functions)
+            for name, symbol in saved_variables.items():
+                self.symbols.restore_global(name, symbol)
+            logger.debug("Rolled back symbol tables after failed input.")
+            raise
+
+    def declare_program(self, program: Program):
+        """Record the top-level functions and variables of an already parsed program.
+
+        Used when a REPL session is restored from its AST journal, so that new input can
+        refer to names defined before the restart.
+        """
+        for stmt in program.statements:
+            if isinstance(stmt, FunctionDefinition):
+                self.defined_functions.add(stmt.name)
+            elif isinstance(stmt, Assignment):
+                self.symbols.declare(stmt.variable_name, stmt.var_type)
+
+    @classmethod
+    def _table(cls, name: str) -> Dict:
+        # A subclass gets its own copy on first registration, so it never changes Parser's
+        if name not in cls.__dict__:
+            setattr(cls, name, dict(getattr(cls, name)))
+        return getattr(cls, name)
+
+    @classmethod
+    def register_statement(cls, kind: str, values, parse_method: Callable):
+        """Parse statements that start with a (kind, value) token with parse_method(parser).
+
+        values is one token value, a list of them, or None for any token of that kind.
+        """
+        table = cls._table('statement_parsers')
+        for value in values if isinstance(values, (list, tuple, set)) else [values]:
+            table[(kind, value)] = parse_method
+
+    @classmethod
+    def register_prefix(cls, kind: str, values, parse_method: Callable):
+        """Parse expressions that start with a (kind, value) token with parse_method(parser)."""
+        table = cls._table('prefix_parsers')
+        for value in values if isinstance(values, (list, tuple, set)) else [values]:
+            table[(kind, value)] = parse_method
+
+    @classmethod
+    def register_infix(cls, kind: str, values, precedence: int, parse_method: Callable):
+        """Continue an expression at a (kind, value) token with parse_method(parser, left, precedence).
+
+        The operator is only taken while its precedence is at least the current minimum.
+        parse_method may return None to leave the token for the enclosing parser.
+        """
+        table = cls._table('infix_parsers')
+        for value in values if isinstance(values, (list, tuple, set)) else [values]:
+            table[(kind, value)] = (precedence, parse_method)
 
-        elif token.kind == "LOOP" and token.value == "WHILE":
-            self.current_context.append("LOOP")
-            while_loop = self.parse_while_loop()
-            self.current_context.pop()
-            return while_loop
+    def parse_statement(self) -> Optional[ASTNode]:
+        """Parse a single statement."""
+        token = self.peek()
+        logger.debug("Parsing statement starting with token: %s", token)
+        table = self.statement_parsers
+        parse_method = table.get((token.kind, token.value)) or table.get((token.kind, None))
+        if parse_method is None:
+            error_msg = f"Unexpected token: {token.kind} with value '{token.value}' at line {token.line}"
+            logger.error(error_msg)
+            raise SyntaxError(error_msg)
+        node = parse_method(self)
+        if node is not None and node.line is None:
+            node.line = token.line
+        return node
+
+    def skip_terminator(self) -> None:
+        """Skip an empty statement."""
+        logger.debug("Skipping TERMINATOR token at line %d.", self.peek().line)
+        self.advance()
+        return None
+
+    def parse_function_statement(self) -> FunctionDefinition:
+        self.current_context.append("FUNCTION")
+        func_def = self.parse_function_definition()
+        self.current_context.pop()
+        return func_def
 
-        elif token.kind == "LOOP" and token.value == "REPEAT":
-            self.current_context.append("LOOP")
-            repeat_loop = self.parse_repeat_loop()
-            self.current_context.pop()
-            return repeat_loop
+    def parse_loop_statement(self) -> ASTNode:
+        self.current_context.append("LOOP")
+        if self.peek().value == "WHILE":
+            loop = self.parse_while_loop()
+        else:
+            loop = self.parse_repeat_loop()
+        self.current_context.pop()
+        return loop
 
-        elif token.kind == "KEYWORD" and token.value in ["BREAK", "CONTINUE"]:
+    def parse_checked_control_statement(self) -> ControlStatement:
+        """Parse BREAK/CONTINUE inside a loop, or RETURN/YIELD inside a function."""
+        token = self.peek()
+        if token.value in ("BREAK", "CONTINUE"):
             if "LOOP" not in self.current_context:
                 error_msg = f"{token.value} statement outside of loop at line {token.line}"
                 logger.error(error_msg)
                 raise SyntaxError(error_msg)
-            return self.parse_control_statement()
-
-        elif token.kind == "KEYWORD" and token.value == "RETURN":
-            if "FUNCTION" not in self.current_context:
-                error_msg = f"RETURN statement outside of function at line {token.line}"
-                logger.error(error_msg)
-                raise SyntaxError(error_msg)
-            return self.parse_control_statement()
-
-        elif token.kind == "KEYWORD" and token.value == "YIELD":
-            if "FUNCTION" not in self.current_context:
-                error_msg = f"YIELD statement outside of function at line {token.line}"
-                logger.error(error_msg)
-                raise SyntaxError(error_msg)
-            return self.parse_control_statement()
-
-        elif token.kind == "KEYWORD" and token.value == "PASS":
-            return self.parse_control_statement()
-
-        elif token.kind == "ID":
-            # Look ahead for increment/decrement operators or function call
-            next_token = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
-            if next_token:
-                if next_token.kind in ["INCREMENT", "DECREMENT"]:
-                    stmt = self.parse_increment_decrement()
-                    if self.peek().kind == "TERMINATOR":
-                        self.consume("TERMINATOR")
-                    return stmt
-                elif next_token.kind == "L_PAREN":
-                    stmt = self.parse_function_call()
-                    if self.peek().kind == "TERMINATOR":
-                        self.consume("TERMINATOR")
-                    return stmt
-
-            error_msg = f"Unexpected ID token '{token.value}' without context at line {token.line}"
+        elif "FUNCTION" not in self.current_context:
+            error_msg = f"{token.value} statement outside of function at line {token.line}"
             logger.error(error_msg)
             raise SyntaxError(error_msg)
+        return self.parse_control_statement()
 
-        elif token.kind in ["INCREMENT", "DECREMENT"]:
-            return self.parse_increment_decrement()
-
-        elif token.kind == "KEYWORD" and token.value == "SET":
-            return self.parse_assignment_statement()
+    def parse_id_statement(self) -> ASTNode:
+        """Parse a statement starting with a name: i++, i-- or a function call."""
+        token = self.peek()
+        # Look ahead for increment/decrement operators or function call
+        next_token = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
+        if next_token:
+            if next_token.kind in ["INCREMENT", "DECREMENT"]:
+                stmt = self.parse_increment_decrement()
+                if self.peek().kind == "TERMINATOR":
+                    self.consume("TERMINATOR")
+                return stmt
+            elif next_token.kind == "L_PAREN":
+                stmt = self.parse_function_call()
+                if self.peek().kind == "TERMINATOR":
+                    self.consume("TERMINATOR")
+                return stmt
+
+        error_msg = f"Unexpected ID token '{token.value}' without context at line {token.line}"
+        logger.error(error_msg)
+        raise SyntaxError(error_msg)
 
-        elif token.kind == "KEYWORD" and token.value in ["PRINTLN", "PRINT"]:
-            return self.parse_print_statement()
+    def parse_wait(self) -> WaitStatement:
+        self.consume("KEYWORD")  # Consume WAIT
+        return self.parse_wait_statement()
 
-        elif token.kind == "KEYWORD" and token.value == "WAIT":
-            self.consume("KEYWORD")
-            return self.parse_wait_statement()
+    def parse_move(self) -> ASTNode:
+        self.consume("KEYWORD")  # Consume MOVE
+        if self.peek().kind == "TYPE_KEYWORD" and self.peek().value == "WINDOW":
+            return self.parse_move_window()
+        return self.parse_move_mouse()
 
-        elif token.kind == "KEYWORD" and token.value == "MOVE":
-            self.consume("KEYWORD")
-            if self.peek().kind == "TYPE_KEYWORD" and self.peek().value == "WINDOW":
-                return self.parse_move_window()
-            else:
-                return self.parse_move_mouse()
-
-        elif token.kind == "KEYWORD" and token.value == "FOCUS":
-            return self.parse_focus_window()
-
-        elif token.kind == "KEYWORD" and token.value in ["HOLD", "RELEASE", "PRESS"]:
-            return self.parse_key_operation()
-
-        elif (
-            token.kind == "KEYWORD"
-            and token.value == "PRESS"
-            and self.pos + 1 < len(self.tokens)
-            and self.tokens[self.pos + 1].value == "BUTTON"
-        ):
-            return self.parse_button_operation()
-
-        elif token.kind == "KEYWORD" and token.value == "LAMBDA":
-            lambda_expr = self.parse_lambda_function()
-            if self.peek().kind == "TERMINATOR":
-                self.consume("TERMINATOR")
-            return lambda_expr
-
-        elif token.kind == "KEYWORD" and token.value == "POINT":
-            point_expr = self.parse_point()
-            if self.peek().kind == "TERMINATOR":
-                self.consume("TERMINATOR")
-            return point_expr
-
-        else:
-            error_msg = f"Unexpected token: {token.kind} with value '{token.value}' at line {token.line}"
-            logger.error(error_msg)
-            raise SyntaxError(error_msg)
+    def parse_expression_statement(self) -> ASTNode:
+        """Parse a LAMBDA or POINT expression used on its own."""
+        expr = self.parse_primary()
+        if self.peek().kind == "TERMINATOR":
+            self.consume("TERMINATOR")
+        return expr
 
     def parse_function_definition(self) -> FunctionDefinition:
         """Parse a function definition statement."""
@@ -247,17 +372,15 @@ class Parser:
 
         # Enter new scope for function body
         # Add parameters as variables in the local scope
-        new_scope = {
-            'variables': {param: {'type': None, 'is_parameter': True} for param in parameters},
-            'functions': {}
-        }
-        self.scope_stack.append(new_scope)
+        self.symbols.enter_scope()
+        for param in parameters:
+            self.symbols.declare(param, is_parameter=True)
         logger.debug("Entered new scope for function '%s' with parameters.", function_name)
 
         # Parse function body
         body = []
         while self.peek().kind != "R_BRACE" and self.peek().kind != "EOF":
-            stmt = self.parse_statement()
+            stmt = self.parse_block_statement()
             if stmt is not None:
                 body.append(stmt)
 
@@ -267,7 +390,7 @@ class Parser:
             self.consume("TERMINATOR")
 
         # Exit function scope
-        self.scope_stack.pop()
+        self.symbols.exit_scope()
         logger.debug("Exited scope for function '%s'.", function_name)
 
         return FunctionDefinition(function_name, parameters, body)
@@ -283,10 +406,7 @@ class Parser:
         # self.consume("TERMINATOR")  # Assuming function calls end with a terminator
 
         # Verify function exists
-        if not self.is_function(function_name):
-            error_msg = f"Undefined function '{function_name}' at line {function_name_token.line}"
-            logger.error(error_msg)
-            raise SyntaxError(error_msg)
+        self.require_function(function_name, function_name_token.line)
 
         logger.debug("Parsed FunctionCall: %s with arguments %s", function_name, arguments)
         return FunctionCall(function_name, arguments)
@@ -341,9 +461,8 @@ class Parser:
         var_name = var_token.value
         
         # Check if variable already exists and is typed
-        current_scope = self.scope_stack[-1]
-        existing_var = current_scope['variables'].get(var_name, {})
-        existing_type = existing_var.get('type') if isinstance(existing_var, dict) else None
+        existing_var = self.symbols.lookup_local(var_name)
+        existing_type = existing_var.type if existing_var else None
         
         # Look ahead for type hint
         var_type = None
@@ -380,10 +499,7 @@ class Parser:
             self.consume("TERMINATOR")
         
         # Register variable in current scope
-        current_scope['variables'][var_name] = {
-            'type': var_type,
-            'initialized': True
-        }
+        self.symbols.declare(var_name, var_type)
         
         logger.debug("Registered variable '%s' with type '%s' in current scope.", 
                     var_name, var_type if var_type else "dynamic")
@@ -460,37 +576,27 @@ class Parser:
             logger.debug("Parsed KeyOperation: %s %s", operation, key)
             return KeyOperation(operation, key)
         elif self.peek().value == "BUTTON":
-            return self.parse_button_operation()
+            return self.parse_button_operation(operation)
         else:
             error_msg = f"Expected 'KEY' or 'BUTTON' after {operation}, got {self.peek().value} at line {self.peek().line}"
             logger.error(error_msg)
             raise SyntaxError(error_msg)
 
-    def parse_button_operation(self) -> ButtonOperation:
+    def parse_button_operation(self, operation: str = "PRESS") -> ButtonOperation:
         """Parse button operations like PRESS BUTTON LEFT"""
         logger.debug("Parsing button operation.")
         self.consume("TYPE_KEYWORD")  # Consume BUTTON
         button = self.consume("MOUSE_KEY").value
         self.consume("TERMINATOR")
 
-        logger.debug("Parsed ButtonOperation: PRESS BUTTON %s", button)
-        return ButtonOperation(button)
+        logger.debug("Parsed ButtonOperation: %s BUTTON %s", operation, button)
+        return ButtonOperation(button, operation)
 
     def parse_expression(self) -> ASTNode:
         """Parse an expression, handling operators based on precedence."""
         logger.debug("Parsing expression.")
         try:
-            # Parse the initial expression
-            left = self.parse_expression_precedence(0)
-            
-            # Handle top-level function composition
-            while self.peek().kind == "COMP_OP" and self.peek().value == "|>":
-                op = self.consume("COMP_OP").value
-                right = self.parse_primary()  # Parse the function reference
-                left = BinaryOperation(op, left, right)
-                logger.debug("Parsed top-level function composition: %s |> %s", left, right)
-            
-            return left
+            return self.parse_expression_precedence(0)
         except SyntaxError as e:
             if "at line" in str(e):
                 error_msg = f"{e}"
@@ -500,160 +606,159 @@ class Parser:
             raise SyntaxError(error_msg) from e
 
     def parse_expression_precedence(self, min_precedence: int) -> ASTNode:
-        """Parse expressions with operator precedence."""
-        logger.debug("Parsing expression with minimum precedence %d.", min_precedence)
-        left = self.parse_primary()
+        """Parse expressions with operator precedence.
 
+        Precedence climbing: operators at the same level are folded into left in this
+        loop, and only a tighter operator recurses, so recursion depth is bounded by the
+        number of precedence levels rather than the length of the expression.
+        """
+        left = self.parse_primary()
+        table = self.infix_parsers
         while True:
-            current = self.peek()
-            # Handle binary operations
-            if current.kind == "OP" and current.value in self.precedence:
-                precedence = self.precedence[current.value]
-                if precedence < min_precedence:
-                    break
-                op = self.consume("OP").value
-                # Handle right-associative operators like '**'
-                next_min_prec = precedence + 1 if op == '**' else precedence
-                right = self.parse_expression_precedence(next_min_prec)
-                left = BinaryOperation(op, left, right)
-                logger.debug("Parsed binary operation: %s %s %s", left, op, right)
-            # Handle comparison operations and function composition
-            elif current.kind == "COMP_OP":
-                op = self.consume("COMP_OP").value
-                if op == "|>":
-                    # Handle function composition
-                    right = self.parse_primary()  # Parse the function reference
-                    left = BinaryOperation(op, left, right)
-                    logger.debug("Parsed function composition: %s |> %s", left, right)
-                else:
-                    right = self.parse_expression()
-                    left = BinaryOperation(op, left, right)
-                    logger.debug("Parsed comparison operation: %s %s %s", left, op, right)
-            # Handle postfix increment/decrement
-            elif current.kind in ["INCREMENT", "DECREMENT"] and isinstance(left, Identifier):
-                op = self.consume(current.kind).value
-                left = IncrementDecrement(left.name, op, is_prefix=False)
-                logger.debug("Parsed postfix increment/decrement: %s%s", left.variable, op)
-            else:
+            token = self.peek()
+            entry = table.get((token.kind, token.value)) or table.get((token.kind, None))
+            if entry is None or entry[0] < min_precedence:
                 break
-
+            node = entry[1](self, left, entry[0])
+            if node is None:
+                break
+            if node.line is None:
+                node.line = token.line
+            left = node
         return left
 
+    def parse_binary_operation(self, left: ASTNode, precedence: int) -> BinaryOperation:
+        op = self.consume(self.peek().kind).value
+        # The right side of a left-associative operator stops at the same level, so
+        # a - b - c is (a - b) - c; '**' is right-associative
+        next_min_prec = precedence if op in self.right_associative else precedence + 1
+        right = self.parse_expression_precedence(next_min_prec)
+        return BinaryOperation(op, left, right)
+
+    def parse_composition(self, left: ASTNode, precedence: int) -> BinaryOperation:
+        self.consume("COMP_OP")
+        right = self.parse_primary()  # Parse the function reference
+        return BinaryOperation("|>", left, right)
+
+    def parse_is(self, left: ASTNode, precedence: int) -> BinaryOperation:
+        """Parse IS and IS NOT."""
+        self.consume("KEYWORD_ASSERTION")
+        op = "IS"
+        if self.peek().kind == "LOGICAL_OP" and self.peek().value == "NOT":
+            self.consume("LOGICAL_OP")
+            op = "IS NOT"
+        right = self.parse_expression_precedence(precedence + 1)
+        return BinaryOperation(op, left, right)
+
+    def parse_not_in(self, left: ASTNode, precedence: int) -> Optional[BinaryOperation]:
+        """Parse NOT IN; any other NOT after an operand is left for the caller to reject."""
+        next_token = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
+        if next_token is None or next_token.kind != "KEYWORD_ASSERTION" or next_token.value != "IN":
+            return None
+        self.pos += 2
+        right = self.parse_expression_precedence(precedence + 1)
+        return BinaryOperation("NOT IN", left, right)
+
+    def parse_postfix_increment(self, left: ASTNode, precedence: int) -> Optional[IncrementDecrement]:
+        if not isinstance(left, Identifier):
+            return None
+        op = self.consume(self.peek().kind).value
+        return IncrementDecrement(left.name, op, is_prefix=False)
+
     def parse_primary(self) -> ASTNode:
         """Parse primary expressions: literals, identifiers, or expressions in parentheses."""
         token = self.peek()
-        logger.debug("Parsing primary expression with token: %s", token)
-
-        if token.kind == "INT":
-            self.consume("INT")
-            logger.debug("Parsed Integer: %d", token.value)
-            return Integer(token.value)
-        elif token.kind == "FLOAT":
-            self.consume("FLOAT")
-            logger.debug("Parsed Float: %f", token.value)
-            return Float(token.value)
-        elif token.kind == "TIME":
-            self.consume("TIME")
+        table = self.prefix_parsers
+        parse_method = table.get((token.kind, token.value)) or table.get((token.kind, None))
+        if parse_method is None:
+            error_msg = f"Unexpected token in expression: {token.kind} with value '{token.value}' at line {token.line}"
+            logger.error(error_msg)
+            raise SyntaxError(error_msg)
+        node = parse_method(self)
+        if node.line is None:
+            node.line = token.line
+        return node
+
+    def parse_literal(self) -> ASTNode:
+        token = self.peek()
+        self.advance()
+        if token.kind == "TIME":
             time_value, unit = token.value
-            logger.debug("Parsed Time: %f %s", time_value, unit)
             return Time(time_value, unit)
-        elif token.kind == "STR":
-            self.consume("STR")
-            logger.debug("Parsed String: %s", token.value)
-            return String(token.value)
-        elif token.kind == "BOOL":
-            self.consume("BOOL")
-            logger.debug("Parsed Boolean: %s", token.value)
-            return Boolean(token.value)
-        elif token.kind == "KEYWORD" and token.value == "POINT":
-            return self.parse_point()
-        elif token.kind == "KEYWORD" and token.value == "LAMBDA":
-            return self.parse_lambda_function()
-        elif token.kind in ["INCREMENT", "DECREMENT"]:
-            # Handle prefix increment/decrement
-            op = self.consume(token.kind).value
-            var_token = self.consume("ID")
-            var_name = var_token.value
+        return LITERAL_NODES[token.kind](token.value)
 
-            # Check if variable exists in any scope
-            if not self.is_variable(var_name):
-                error_msg = f"Undefined variable '{var_name}' at line {token.line}"
-                logger.error(error_msg)
-                raise SyntaxError(error_msg)
+    def parse_unary_operation(self) -> UnaryOperation:
+        """Parse NOT, ~ and unary minus."""
+        op = self.consume(self.peek().kind).value
+        level = self.precedence['NOT'] if op == 'NOT' else self.precedence['~']
+        operand = self.parse_expression_precedence(level)
+        return UnaryOperation(op, operand)
 
-            logger.debug("Parsed prefix increment/decrement: %s%s", op, var_name)
-            return IncrementDecrement(var_name, op, is_prefix=True)
-        elif token.kind == "ID":
-            # Look ahead for the next token
-            next_token = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
-            
-            # Get the identifier
-            identifier = self.consume("ID").value
-            
-            # Check if it's a function call
-            if next_token and next_token.kind == "L_PAREN":
-                self.consume("L_PAREN")
-                arguments = self.parse_function_arguments()
-                self.consume("R_PAREN")
-                return FunctionCall(identifier, arguments)
-            
-            # Otherwise it's just an identifier (could be variable or function reference)
-            return Identifier(identifier)
-            
-        elif token.kind == "L_PAREN":
+    def parse_prefix_increment(self) -> IncrementDecrement:
+        token = self.peek()
+        op = self.consume(token.kind).value
+        var_name = self.consume("ID").value
+
+        # Check if variable exists in any scope
+        self.require_variable(var_name, token.line)
+        return IncrementDecrement(var_name, op, is_prefix=True)
+
+    def parse_identifier_expression(self) -> ASTNode:
+        """Parse a name, which may be a variable, a function reference or a call."""
+        identifier = self.consume("ID").value
+        if self.peek().kind == "L_PAREN":
             self.consume("L_PAREN")
-            expr = self.parse_expression()
+            arguments = self.parse_function_arguments()
             self.consume("R_PAREN")
-            logger.debug("Parsed parenthesized expression: %s", expr)
-            return expr
-        elif token.kind == "TYPE_KEYWORD" and token.value == "WINDOW":
-            return self.parse_window_operation()
-        else:
-            error_msg = f"Unexpected token in expression: {token.kind} with value '{token.value}' at line {token.line}"
-            logger.error(error_msg)
-            raise SyntaxError(error_msg)
+            return FunctionCall(identifier, arguments)
+        return Identifier(identifier)
+
+    def parse_parenthesized(self) -> ASTNode:
+        self.consume("L_PAREN")
+        expr = self.parse_expression()
+        self.consume("R_PAREN")
+        return expr
 
     def is_variable(self, name: str) -> bool:
         """Check if a variable is defined in any accessible scope."""
-        # Check global scope
-        if name in self.global_scope:
-            logger.debug("Variable '%s' found in global scope.", name)
-            return True
-        
-        # Check local scopes in the scope stack
-        for scope in reversed(self.scope_stack):
-            if name in scope['variables']:
-                logger.debug("Variable '%s' found in local scope.", name)
-                return True
-        
-        logger.debug("Variable '%s' not found in any scope.", name)
-        return False
+        return name in self.global_scope or name in self.symbols
 
     def is_function(self, name: str) -> bool:
         """Check if a function name is valid in the current context."""
-        # Check if it's a parameter in the current function scope
-        if len(self.scope_stack) > 1:
-            current_scope = self.scope_stack[-1]
-            if name in current_scope['variables'] and current_scope['variables'][name].get('is_parameter'):
-                logger.debug("Function '%s' found as parameter in current scope.", name)
-                return True
-
-        # Check if it's a function name that's been seen before in defined_functions or externally provided functions
-        if name in self.defined_functions or name in self.functions:
-            logger.debug("Function '%s' found in defined_functions or external functions.", name)
+        # A parameter of the function being parsed may hold a callable
+        symbol = self.symbols.lookup_local(name)
+        if symbol is not None and symbol.is_parameter:
             return True
+        # Otherwise it must be a function seen so far or one provided externally
+        return name in self.defined_functions or name in self.functions
+
+    def require_variable(self, name: str, line: int):
+        """Raise unless name is a known variable, or record it when resolution is deferred."""
+        if self.is_variable(name):
+            return
+        if self.unresolved_variables is not None:
+            self.unresolved_variables.append((name, line))
+            return
+        error_msg = f"Undefined variable '{name}' at line {line}"
+        logger.error(error_msg)
+        raise SyntaxError(error_msg)
 
-        logger.debug("Function '%s' not found in any scope.", name)
-        return False
+    def require_function(self, name: str, line: int):
+        """Raise unless name is a known function, or record it when resolution is deferred."""
+        if self.is_function(name):
+            return
+        if self.unresolved_functions is not None:
+            self.unresolved_functions.append((name, line))
+            return
+        error_msg = f"Undefined function '{name}' at line {line}"
+        logger.error(error_msg)
+        raise SyntaxError(error_msg)
 
     def parse_identifier_usage(self) -> Identifier:
         """Parse an identifier usage and ensure it's defined."""
         token = self.consume("ID")
         var_name = token.value
-        if not self.is_variable(var_name):
-            error_msg = f"Undefined variable '{var_name}' at line {token.line}"
-            logger.error(error_msg)
-            raise SyntaxError(error_msg)
+        self.require_variable(var_name, token.line)
         logger.debug("Parsed Identifier: %s", var_name)
         return Identifier(var_name)
 
@@ -666,7 +771,7 @@ class Parser:
         self.consume("L_BRACE")
         body = []
         while self.peek().kind != "R_BRACE":
-            stmt = self.parse_statement()
+            stmt = self.parse_block_statement()
             if stmt:
                 body.append(stmt)
         self.consume("R_BRACE")
@@ -680,7 +785,7 @@ class Parser:
         self.consume("L_BRACE")
         body = []
         while self.peek().kind != "R_BRACE":
-            stmt = self.parse_statement()
+            stmt = self.parse_block_statement()
             if stmt:
                 body.append(stmt)
         self.consume("R_BRACE")
@@ -722,10 +827,7 @@ class Parser:
             var_name = var_token.value
 
             # Check if variable exists in any scope
-            if not self.is_variable(var_name):
-                error_msg = f"Undefined variable '{var_name}' at line {token.line}"
-                logger.error(error_msg)
-                raise SyntaxError(error_msg)
+            self.require_variable(var_name, token.line)
 
             logger.debug("Parsed prefix increment/decrement: %s%s", op, var_name)
             return IncrementDecrement(var_name, op, is_prefix)
@@ -735,10 +837,7 @@ class Parser:
             var_name = self.consume("ID").value
 
             # Check if variable exists in any scope
-            if not self.is_variable(var_name):
-                error_msg = f"Undefined variable '{var_name}' at line {token.line}"
-                logger.error(error_msg)
-                raise SyntaxError(error_msg)
+            self.require_variable(var_name, token.line)
 
             op_token = self.peek()
             if op_token.kind not in ["INCREMENT", "DECREMENT"]:
@@ -770,7 +869,7 @@ class Parser:
         self.consume("L_BRACE")
         then_body = []
         while self.peek().kind != "R_BRACE":
-            stmt = self.parse_statement()
+            stmt = self.parse_block_statement()
             if stmt:
                 then_body.append(stmt)
         self.consume("R_BRACE")
@@ -788,7 +887,7 @@ class Parser:
             
             else_if_body = []
             while self.peek().kind != "R_BRACE":
-                stmt = self.parse_statement()
+                stmt = self.parse_block_statement()
                 if stmt:
                     else_if_body.append(stmt)
             self.consume("R_BRACE")
@@ -800,7 +899,7 @@ class Parser:
             self.consume("KEYWORD")  # Consume ELSE
             self.consume("L_BRACE")
             while self.peek().kind != "R_BRACE":
-                stmt = self.parse_statement()
+                stmt = self.parse_block_statement()
                 if stmt:
                     else_body.append(stmt)
             self.consume("R_BRACE")
@@ -861,23 +960,21 @@ class Parser:
         self.consume("L_BRACE")
 
         # Enter new scope for lambda body
-        new_scope = {
-            'variables': {param: {'type': None, 'is_parameter': True} for param in parameters},
-            'functions': {}
-        }
-        self.scope_stack.append(new_scope)
+        self.symbols.enter_scope()
+        for param in parameters:
+            self.symbols.declare(param, is_parameter=True)
         self.current_context.append("FUNCTION")  # Mark that we're in a function context
 
         body = []
         while self.peek().kind != "R_BRACE" and self.peek().kind != "EOF":
-            stmt = self.parse_statement()
+            stmt = self.parse_block_statement()
             if stmt is not None:
                 body.append(stmt)
 
         self.consume("R_BRACE")
 
         # Exit lambda scope and function context
-        self.scope_stack.pop()
+        self.symbols.exit_scope()
         self.current_context.pop()
 
         return LambdaFunction(parameters, body)
@@ -927,14 +1024,12 @@ class Parser:
         if self.peek().kind == "ID":
             # Handle point variable
             point_var = self.parse_expression()  # This will return an Identifier node
-            self.consume("TERMINATOR")
-            return MoveMouse(variable = point_var)  # Pass the identifier directly
+            return MoveMouse(point_var, None, None, *self.parse_move_timing())  # Pass the identifier directly
 
         if self.peek().kind == "KEYWORD" and self.peek().value == "POINT":
             # Handle direct point constructor
             point = self.parse_point()
-            self.consume("TERMINATOR")
-            return MoveMouse(variable = point)  # Pass the point directly
+            return MoveMouse(point, None, None, *self.parse_move_timing())  # Pass the point directly
         else:
             # Parse regular coordinates
             self.consume("L_PAREN")
@@ -942,6 +1037,69 @@ class Parser:
             self.consume("COMMA")
             y = self.parse_expression()
             self.consume("R_PAREN")
-            self.consume("TERMINATOR")
-            return MoveMouse(x=x, y=y)
-
+            return MoveMouse(None, x, y, *self.parse_move_timing())
+
+    def parse_move_timing(self):
+        """Parse the rest of a MOVE MOUSE: an optional 'TIME duration [profile]', then ';'.
+
+        TIME and the profile names are only keywords here, so they lex as identifiers.
+        Returns the (duration, profile) arguments of MoveMouse.
+        """
+        duration, profile = None, "LINEAR"
+        if self.peek().kind == "ID" and self.peek().value == "TIME":
+            self.consume("ID")
+            duration = self.parse_expression()
+            if self.peek().kind == "ID" and self.peek().value in MOTION_PROFILES:
+                profile = self.consume("ID").value
+        self.consume("TERMINATOR")
+        return duration, profile
+
+LITERAL_NODES = {"INT": Integer, "FLOAT": Float, "STR": String, "BOOL": Boolean}
+
+Parser.register_statement("TERMINATOR", None, Parser.skip_terminator)
+Parser.register_statement("KEYWORD", "IF", Parser.parse_if_statement)
+Parser.register_statement("KEYWORD", "DEFUN", Parser.parse_function_statement)
+Parser.register_statement("LOOP", ["WHILE", "REPEAT"], Parser.parse_loop_statement)
+Parser.register_statement("KEYWORD", ["BREAK", "CONTINUE", "RETURN", "YIELD"], Parser.parse_checked_control_statement)
+Parser.register_statement("KEYWORD", "PASS", Parser.parse_control_statement)
+Parser.register_statement("ID", None, Parser.parse_id_statement)
+Parser.register_statement("INCREMENT", None, Parser.parse_increment_decrement)
+Parser.register_statement("DECREMENT", None, Parser.parse_increment_decrement)
+Parser.register_statement("KEYWORD", "SET", Parser.parse_assignment_statement)
+Parser.register_statement("KEYWORD", ["PRINTLN", "PRINT"], Parser.parse_print_statement)
+Parser.register_statement("KEYWORD", "WAIT", Parser.parse_wait)
+Parser.register_statement("KEYWORD", "MOVE", Parser.parse_move)
+Parser.register_statement("KEYWORD", "FOCUS", Parser.parse_focus_window)
+Parser.register_statement("KEYWORD", ["HOLD", "RELEASE", "PRESS"], Parser.parse_key_operation)
+Parser.register_statement("KEYWORD", ["LAMBDA", "POINT"], Parser.parse_expression_statement)
+
+for literal_kind in ["INT", "FLOAT", "TIME", "STR", "BOOL"]:
+    Parser.register_prefix(literal_kind, None, Parser.parse_literal)
+Parser.register_prefix("KEYWORD", "POINT", Parser.parse_point)
+Parser.register_prefix("KEYWORD", "LAMBDA", Parser.parse_lambda_function)
+Parser.register_prefix("INCREMENT", None, Parser.parse_prefix_increment)
+Parser.register_prefix("DECREMENT", None, Parser.parse_prefix_increment)
+Parser.register_prefix("ID", None, Parser.parse_identifier_expression)
+Parser.register_prefix("L_PAREN", None, Parser.parse_parenthesized)
+Parser.register_prefix("TYPE_KEYWORD", "WINDOW", Parser.parse_window_operation)
+Parser.register_prefix("LOGICAL_OP", "NOT", Parser.parse_unary_operation)
+Parser.register_prefix("BITWISE_OP", "~", Parser.parse_unary_operation)
+Parser.register_prefix("OP", "-", Parser.parse_unary_operation)
+
+BINARY_OPERATORS = {
+    "OP": ['+', '-', '*', '/', '//', '%', '**'],
+    "BITWISE_OP": ['|', '^', '&', '<<', '>>'],
+    "COMP_OP": ['==', '!=', '<', '>', '<=', '>=', '===', '!=='],
+    "LOGICAL_OP": ['AND', 'OR'],
+    "KEYWORD_ASSERTION": ['IN'],
+}
+for token_kind, operators in BINARY_OPERATORS.items():
+    for operator in operators:
+        Parser.register_infix(token_kind, operator, Parser.precedence[operator], Parser.parse_binary_operation)
+Parser.register_infix("COMP_OP", "|>", Parser.precedence['|>'], Parser.parse_composition)
+Parser.register_infix("KEYWORD_ASSERTION", "IS", Parser.precedence['IS'], Parser.parse_is)
+Parser.register_infix("LOGICAL_OP", "NOT", Parser.precedence['NOT IN'], Parser.parse_not_in)
+# Postfix ++/-- bind tighter than any operator
+TIGHTEST = max(Parser.precedence.values()) + 1
+Parser.register_infix("INCREMENT", None, TIGHTEST, Parser.parse_postfix_increment)
+Parser.register_infix("DECREMENT", None, TIGHTEST, Parser.parse_postfix_increment)
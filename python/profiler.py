@@ -0,0 +1,126 @@
+import time
+import logging
+from typing import Any, Dict, List, Optional, TextIO
+from .ast_nodes import ASTNode, FunctionDefinition
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+class Profiler:
+    """Per-node and per-line execution profile of one Executor.
+
+    attach() wraps the executor's statement, expression and function-call dispatch
+    on that instance only, so executors that are not profiled run the unwrapped class
+    methods at no cost. Each executed node is a frame labelled with its type and line,
+    and every call of a DEFUN adds a frame of its own. A frame's self time is its
+    elapsed time minus that of the frames it ran; cumulative time is only counted for
+    the outermost of recursive frames, so recursion is not counted twice.
+    """
+    WRAPPED = ("execute_statement", "evaluate_expression", "execute_functioncall")
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.nodes: Dict[str, List] = {}  # Label -> [calls, cumulative, self]
+        self.lines: Dict[int, List] = {}  # Source line -> [calls, cumulative, self]
+        self.stacks: Dict[str, float] = {}  # Collapsed stack -> self time
+        self.frames: List[List] = []  # Running frames: [path, child time]
+        self.active: Dict[Any, int] = {}  # Label or line -> frames of it running
+        self.total = 0.0
+        self.replaced: Dict[str, Any] = {}
+
+    def attach(self, executor):
+        """Start profiling executor."""
+        # Wrappers already on the instance, such as limit checks, are kept and restored
+        self.replaced = {name: executor.__dict__.get(name) for name in self.WRAPPED}
+        execute_statement = executor.execute_statement
+        evaluate_expression = executor.evaluate_expression
+        execute_functioncall = executor.execute_functioncall
+
+        def profiled_statement(stmt: ASTNode, scope: Dict[str, Any]):
+            return self.measure(self.node_label(stmt), stmt.line, execute_statement, stmt, scope)
+
+        def profiled_expression(expr: ASTNode, scope: Dict[str, Any]):
+            return self.measure(self.node_label(expr), expr.line, evaluate_expression, expr, scope)
+
+        def profiled_functioncall(stmt, scope: Dict[str, Any]):
+            function = executor.functions.get(stmt.function_name)
+            if not isinstance(function, FunctionDefinition):
+                return execute_functioncall(stmt, scope)  # Lambdas and callables run inside their caller's frame
+            label = f"DEFUN {function.name} (line {function.line})"
+            return self.measure(label, function.line, execute_functioncall, stmt, scope)
+
+        executor.execute_statement = profiled_statement
+        executor.evaluate_expression = profiled_expression
+        executor.execute_functioncall = profiled_functioncall
+
+    def detach(self, executor):
+        """Stop profiling executor, restoring the methods it had before."""
+        for name, method in self.replaced.items():
+            if method is None:
+                executor.__dict__.pop(name, None)
+            else:
+                setattr(executor, name, method)
+
+    @staticmethod
+    def node_label(node: ASTNode) -> str:
+        return f"{type(node).__name__} (line {node.line})"
+
+    def measure(self, label: str, line: Optional[int], method, *args):
+        """Run method(*args) as a frame called label."""
+        parent = self.frames[-1] if self.frames else None
+        frame = [f"{parent[0]};{label}" if parent else label, 0.0]
+        self.frames.append(frame)
+        active = self.active
+        active[label] = active.get(label, 0) + 1
+        if line is not None:
+            active[line] = active.get(line, 0) + 1
+        start = self.clock()
+        try:
+            return method(*args)
+        finally:
+            elapsed = self.clock() - start
+            self.frames.pop()
+            own = elapsed - frame[1]
+            if parent:
+                parent[1] += elapsed
+            else:
+                self.total += elapsed
+            self.stacks[frame[0]] = self.stacks.get(frame[0], 0.0) + own
+            active[label] -= 1
+            self.record(self.nodes, label, elapsed, own, active[label] == 0)
+            if line is not None:
+                active[line] -= 1
+                self.record(self.lines, line, elapsed, own, active[line] == 0)
+
+    @staticmethod
+    def record(table: Dict, key, elapsed: float, own: float, outermost: bool):
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        if outermost:
+            entry[1] += elapsed
+        entry[2] += own
+
+    def report(self, limit: int = 20) -> str:
+        """Return the hottest nodes and lines by self time as a text table."""
+        total = self.total or 1.0
+        rows = []
+        for title, table in (("node", self.nodes), ("line", self.lines)):
+            hottest = sorted(table.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+            rows.append(f"{'calls':>10} {'cumul s':>10} {'self s':>10} {'self %':>7}  {title}")
+            for key, (calls, cumulative, own) in hottest:
+                rows.append(f"{calls:>10} {cumulative:>10.4f} {own:>10.4f} {100 * own / total:>6.1f}%  {key}")
+            rows.append("")
+        rows.append(f"Total {self.total:.4f}s")
+        return "\n".join(rows)
+
+    def write_collapsed(self, out: TextIO):
+        """Write self time per stack in the collapsed format flamegraph tools read.
+
+        One 'frame;frame;frame microseconds' line per distinct stack.
+        """
+        for path, own in sorted(self.stacks.items()):
+            micros = round(own * 1e6)
+            if micros > 0:
+                out.write(f"{path} {micros}\n")
@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import signal
+import socketserver
+import time
+from typing import Any, Dict, Optional
+from .ast_nodes import node_from_dict
+from .limits import ExecutionLimits
+from .session import CompiledProgram, ParseCache, Session
+from .utils import MemorySink
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+class InterpreterServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Warm interpreter behind a Unix domain socket.
+
+    The protocol is one JSON object per line in each direction. A request carries either
+    "code" (source text) or "ast" (a Program.to_dict() tree), plus an optional "id" that is
+    echoed back. Each request runs in a fresh Session, so requests never see each other's
+    variables, while lexer, parser and compiled programs stay warm in the process.
+    limits, if given, applies to every request, each counting its own run.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, cache_size: int = 256, verbose: bool = False,
+                 limits: Optional[ExecutionLimits] = None):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.socket_path = socket_path
+        self.cache = ParseCache(cache_size)
+        self.verbose = verbose
+        self.limits = limits
+        super().__init__(socket_path, RequestHandler)
+
+    def handle_request_data(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Compile (or fetch from cache) and run a single request."""
+        if not isinstance(request, dict):
+            return {"id": None, "status": "error", "stage": "request",
+                    "error": f"Request must be a JSON object, got {type(request).__name__}"}
+        response = {"id": request.get("id"), "status": "ok", "stage": None, "output": "",
+                    "error": None, "cached": False, "elapsed": 0.0}
+        start = time.perf_counter()
+        try:
+            if "code" in request:
+                compiled, response["cached"] = self.cache.get(request["code"])
+            elif "ast" in request:
+                compiled = CompiledProgram(node_from_dict(request["ast"]))
+            else:
+                raise ValueError("Request must contain 'code' or 'ast'")
+        except Exception as e:
+            response.update(status="error", stage="parse", error=f"{type(e).__name__}: {e}")
+            response["elapsed"] = time.perf_counter() - start
+            return response
+
+        output = MemorySink()
+        outcome = Session(compiled, request.get("verbose", self.verbose), output, self.limits).run()
+        response["output"] = output.getvalue()
+        if not outcome.ok:
+            response.update(status="error", stage="execute", error=outcome.error)
+        response["elapsed"] = time.perf_counter() - start
+        return response
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                response = {"id": None, "status": "error", "stage": "request", "error": f"Invalid JSON: {e}"}
+            else:
+                response = self.server.handle_request_data(request)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+def serve(socket_path: str, cache_size: int = 256, verbose: bool = False,
+          limits: Optional[ExecutionLimits] = None):
+    """Serve requests on socket_path until interrupted."""
+    # Treat SIGTERM like Ctrl-C so the socket file is always cleaned up
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with InterpreterServer(socket_path, cache_size, verbose, limits) as server:
+        logger.info("Serving CommandPro on %s.", socket_path)
+        print(f"Serving CommandPro on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Server interrupted, shutting down.")
@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+from itertools import repeat
+from collections import ChainMap, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional
+from .ast_nodes import Program, FunctionDefinition
+from .lexer import Lexer
+from .parser import Parser
+from .executor import Executor
+from .limits import ExecutionLimits
+from .errors import RuntimeError
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+class CompiledProgram:
+    """A parsed program with its top-level DEFUNs resolved ahead of execution.
+
+    A compiled program is never mutated after construction, so one instance can be
+    shared by any number of sessions (or pickled once to each worker process).
+    """
+    def __init__(self, program: Program, name: Optional[str] = None):
+        self.name = name
+        self.functions: Dict[str, FunctionDefinition] = {}
+        statements = []
+        for stmt in program.statements:
+            if isinstance(stmt, FunctionDefinition):
+                if stmt.name in self.functions:
+                    raise RuntimeError(f"Function '{stmt.name}' is already defined.")
+                self.functions[stmt.name] = stmt
+            else:
+                statements.append(stmt)
+        self.program = Program(statements)
+
+    def __repr__(self):
+        return f"CompiledProgram(name={self.name!r}, functions={list(self.functions)}, statements={len(self.program.statements)})"
+
+def compile_source(source_code: str, name: Optional[str] = None) -> CompiledProgram:
+    """Lex, parse and resolve a source string into a CompiledProgram."""
+    tokens = Lexer(source_code).tokenize()
+    return CompiledProgram(Parser().parse(tokens), name)
+
+class ParseCache:
+    """Thread-safe LRU cache of compiled programs keyed by source text."""
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source_code: str):
+        """Return (compiled, cached) for source_code, compiling it on a miss."""
+        with self.lock:
+            compiled = self.entries.get(source_code)
+            if compiled is not None:
+                self.entries.move_to_end(source_code)
+                self.hits += 1
+                return compiled, True
+        compiled = compile_source(source_code)
+        with self.lock:
+            self.misses += 1
+            self.entries[source_code] = compiled
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return compiled, False
+
+class SessionResult:
+    def __init__(self, name: Optional[str], status: str, error: Optional[str] = None, elapsed: float = 0.0):
+        self.name = name
+        self.status = status  # "ok" or "error"
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def __repr__(self):
+        return f"SessionResult(name={self.name!r}, status='{self.status}', error={self.error!r}, elapsed={self.elapsed:.6f})"
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "status": self.status,
+            "error": self.error,
+            "elapsed": self.elapsed
+        }
+
+class Session:
+    """Cheap per-run interpreter state on top of a shared CompiledProgram.
+
+    Each session owns its scopes, call stack and device managers. Its function table is a
+    ChainMap whose first map receives any functions defined at run time, so the compiled
+    program's table is only ever read.
+    """
+    def __init__(self, compiled: CompiledProgram, verbose: bool = False, output=None,
+                 limits: Optional[ExecutionLimits] = None):
+        self.compiled = compiled
+        self.executor = Executor(verbose=verbose, functions=ChainMap({}, compiled.functions), output=output,
+                                 limits=limits)
+
+    def run(self) -> SessionResult:
+        start = time.perf_counter()
+        try:
+            self.executor.execute(self.compiled.program)
+        except Exception as e:
+            logger.error("Session '%s' failed: %s", self.compiled.name, e)
+            return SessionResult(self.compiled.name, "error", f"{type(e).__name__}: {e}", time.perf_counter() - start)
+        return SessionResult(self.compiled.name, "ok", elapsed=time.perf_counter() - start)
+
+class CompilationUnit:
+    """Incremental compilation state for an interactive session.
+
+    The parser's symbol tables and the executor's function table live as long as the
+    session. Each input is parsed against them, its DEFUNs are linked straight into the
+    function table and only its other statements are executed, so the cost of an input
+    does not grow with the number of inputs before it.
+    """
+    def __init__(self, executor: Optional[Executor] = None):
+        self.parser = Parser()
+        self.executor = executor if executor is not None else Executor()
+        self.inputs = 0
+
+    def compile(self, tokens) -> Program:
+        """Parse one input. After a syntax error the symbol tables are as they were before it."""
+        program = self.parser.parse_incremental(tokens)
+        self.inputs += 1
+        return program
+
+    def declare(self, program: Program):
+        """Make the names of an input parsed elsewhere (e.g. a restored journal) known to the parser."""
+        self.parser.declare_program(program)
+        self.inputs += 1
+
+    def link(self, program: Program) -> CompiledProgram:
+        """Add the input's functions to the executor's table in place.
+
+        Either every new function is linked or, if one of them is already defined,
+        none is.
+        """
+        compiled = CompiledProgram(program, f"<input {self.inputs}>")
+        functions = self.executor.functions
+        for name in compiled.functions:
+            if name in functions:
+                raise RuntimeError(f"Function '{name}' is already defined.")
+        functions.update(compiled.functions)
+        return compiled
+
+    def execute(self, program: Program):
+        """Link the input's functions, then run its remaining statements."""
+        self.executor.execute(self.link(program).program)
+
+def run_session(compiled: CompiledProgram, verbose: bool = False,
+                limits: Optional[ExecutionLimits] = None) -> SessionResult:
+    """Run a compiled program in a fresh session. Module level so process pools can pickle it."""
+    return Session(compiled, verbose, limits=limits).run()
+
+class SessionPool:
+    """Schedule sessions on a thread or process pool.
+
+    Threads share the compiled programs directly but are serialised by the GIL, so they
+    mainly help when sessions block on devices; processes give real parallelism at the
+    cost of pickling each compiled program to the worker.
+    """
+    def __init__(self, workers: Optional[int] = None, kind: str = "thread", verbose: bool = False,
+                 limits: Optional[ExecutionLimits] = None):
+        if kind == "thread":
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+        elif kind == "process":
+            self.pool = ProcessPoolExecutor(max_workers=workers)
+        else:
+            raise ValueError(f"Unknown pool kind '{kind}', expected 'thread' or 'process'")
+        self.kind = kind
+        self.verbose = verbose
+        self.limits = limits  # Applied to every session, each counting its own run
+
+    def submit(self, compiled: CompiledProgram):
+        return self.pool.submit(run_session, compiled, self.verbose, self.limits)
+
+    def map(self, programs: Iterable[CompiledProgram]) -> Iterator[SessionResult]:
+        """Run every program and yield the results in submission order."""
+        return self.pool.map(run_session, programs, repeat(self.verbose), repeat(self.limits))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
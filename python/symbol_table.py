@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional
+
+class Symbol:
+    """A name bound in one scope, remembering which scope declared it."""
+    __slots__ = ('name', 'scope', 'type', 'is_parameter')
+
+    def __init__(self, name: str, scope: int, type: Optional[str] = None, is_parameter: bool = False):
+        self.name = name
+        self.scope = scope  # Depth of the declaring scope, 0 is global
+        self.type = type
+        self.is_parameter = is_parameter
+
+    def __repr__(self):
+        return f"Symbol(name='{self.name}', scope={self.scope}, type={self.type!r}, is_parameter={self.is_parameter})"
+
+class SymbolTable:
+    """Scoped symbol table with O(1) lookups.
+
+    Every name maps to a stack of its bindings, innermost last, so a lookup only looks
+    at the top of one stack however deeply scopes are nested. Each scope keeps the
+    symbols it declared, so leaving a scope pops exactly those bindings.
+    """
+    def __init__(self):
+        self.bindings: Dict[str, List[Symbol]] = {}
+        self.scopes: List[Dict[str, Symbol]] = [{}]
+
+    @property
+    def depth(self) -> int:
+        return len(self.scopes) - 1
+
+    def enter_scope(self):
+        self.scopes.append({})
+
+    def exit_scope(self):
+        if len(self.scopes) == 1:
+            raise ValueError("Cannot exit the global scope")
+        for name in self.scopes.pop():
+            stack = self.bindings[name]
+            stack.pop()
+            if not stack:
+                del self.bindings[name]
+
+    def exit_to(self, depth: int):
+        """Close every scope opened above depth."""
+        while len(self.scopes) - 1 > depth:
+            self.exit_scope()
+
+    def declare(self, name: str, type: Optional[str] = None, is_parameter: bool = False) -> Symbol:
+        """Bind name in the current scope, replacing its binding there if it has one."""
+        scope = self.scopes[-1]
+        symbol = Symbol(name, len(self.scopes) - 1, type, is_parameter)
+        if name in scope:
+            self.bindings[name][-1] = symbol
+        else:
+            self.bindings.setdefault(name, []).append(symbol)
+        scope[name] = symbol
+        return symbol
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        """Return the innermost binding of name, or None."""
+        stack = self.bindings.get(name)
+        return stack[-1] if stack else None
+
+    def lookup_local(self, name: str) -> Optional[Symbol]:
+        """Return name's binding in the current scope only, or None."""
+        return self.scopes[-1].get(name)
+
+    def lookup_global(self, name: str) -> Optional[Symbol]:
+        return self.scopes[0].get(name)
+
+    def restore_global(self, name: str, symbol: Optional[Symbol]):
+        """Put a global binding back as it was, or drop it if symbol is None.
+
+        Used to undo a failed parse, so it must be called with only the global scope open.
+        """
+        if symbol is None:
+            if self.scopes[0].pop(name, None) is not None:
+                del self.bindings[name]
+        else:
+            self.scopes[0][name] = symbol
+            self.bindings[name] = [symbol]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.bindings
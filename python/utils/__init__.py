@@ -1,4 +1,8 @@
 from .window_manager import WindowManager
+from .spatial_index import GridIndex
 from .mouse_manager import MouseManager
+from .input_queue import InputEventQueue
+from .input_backend import InputBackend, MemoryBackend, RecordingBackend
+from .output_sink import OutputSink, MemorySink
 
-__all__ = ['WindowManager', 'MouseManager']
\ No newline at end of file
+__all__ = ['WindowManager', 'GridIndex', 'MouseManager', 'InputEventQueue', 'InputBackend', 'MemoryBackend', 'RecordingBackend', 'OutputSink', 'MemorySink']
\ No newline at end of file
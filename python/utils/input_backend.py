@@ -0,0 +1,207 @@
+import time
+from array import array
+
+class InputBackend:
+    """Where input events end up: the OS, a remote display, or memory.
+
+    A backend implements one method per event kind. send() delivers a batch from an
+    InputEventQueue by calling them in order, and backends that can deliver a whole
+    batch in one go, e.g. in one system call, override it. Timed mouse moves are
+    sampled sample_rate times per second and delivered to move_path().
+    """
+    sample_rate = 120  # Points per second of a timed mouse move
+
+    def move(self, x, y):
+        raise NotImplementedError
+
+    def button_down(self, button):
+        raise NotImplementedError
+
+    def button_up(self, button):
+        raise NotImplementedError
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def scroll(self, amount):
+        """Turn the wheel by amount notches, up if positive."""
+        raise NotImplementedError
+
+    def type_text(self, text):
+        raise NotImplementedError
+
+    def wait(self, seconds):
+        time.sleep(seconds)
+
+    def move_path(self, xs, ys, interval):
+        """Move through the points of xs and ys, one every interval seconds."""
+        for x, y in zip(xs, ys):
+            self.move(x, y)
+            self.wait(interval)
+
+    def send(self, batch):
+        for name, *args in batch:
+            getattr(self, name)(*args)
+
+class MemoryBackend(InputBackend):
+    """Input backend that keeps every batch it is sent, for tests.
+
+    Waits are recorded like any other event rather than slept through.
+    """
+    def __init__(self):
+        self.batches = []
+
+    def send(self, batch):
+        self.batches.append(list(batch))
+
+    def events(self):
+        """Return every event sent, in order."""
+        return [event for batch in self.batches for event in batch]
+
+    def clear(self):
+        self.batches = []
+
+class RecordingBackend(InputBackend):
+    """Input backend that records events in a typed array, to benchmark and check
+    millions of synthetic events without a display.
+
+    Each event takes three 64-bit slots, kind, a and b, in an array allocated for
+    capacity events up front and doubled when full, so recording allocates no
+    per-event objects. Button and key names and typed text are stored as indexes
+    into names, waits as whole microseconds. A timed move is recorded as its moves,
+    copied into the array in one slice per coordinate; nothing sleeps. events()
+    decodes the record back into the tuples InputEventQueue uses.
+    """
+    KINDS = ("move", "button_down", "button_up", "key_down", "key_up", "scroll", "type_text", "wait")
+    MOVE, BUTTON_DOWN, BUTTON_UP, KEY_DOWN, KEY_UP, SCROLL, TYPE_TEXT, WAIT = range(8)
+    KIND_IDS = {name: kind for kind, name in enumerate(KINDS)}
+
+    def __init__(self, capacity=65536):
+        self.data = array("q", bytes(24 * max(capacity, 1)))
+        self.size = 0  # Events recorded
+        self.names = []
+        self.name_ids = {}
+
+    def __len__(self):
+        return self.size
+
+    def name_id(self, name):
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def reserve(self, events):
+        """Make room for events more events, at least doubling the array when it grows."""
+        data = self.data
+        needed = 3 * (self.size + events)
+        if needed > len(data):
+            data.extend(array("q", bytes(8 * max(needed - len(data), len(data)))))
+
+    def record(self, kind, a, b=0):
+        slot = 3 * self.size
+        data = self.data
+        if slot == len(data):
+            self.reserve(1)
+        data[slot] = kind
+        data[slot + 1] = a
+        data[slot + 2] = b
+        self.size += 1
+
+    def move(self, x, y):
+        self.record(self.MOVE, int(x), int(y))
+
+    def button_down(self, button):
+        self.record(self.BUTTON_DOWN, self.name_id(button))
+
+    def button_up(self, button):
+        self.record(self.BUTTON_UP, self.name_id(button))
+
+    def key_down(self, key):
+        self.record(self.KEY_DOWN, self.name_id(key))
+
+    def key_up(self, key):
+        self.record(self.KEY_UP, self.name_id(key))
+
+    def scroll(self, amount):
+        self.record(self.SCROLL, int(amount))
+
+    def type_text(self, text):
+        self.record(self.TYPE_TEXT, self.name_id(text))
+
+    def wait(self, seconds):
+        self.record(self.WAIT, round(seconds * 1e6))
+
+    def move_path(self, xs, ys, interval):
+        count = len(xs)
+        self.reserve(count)
+        slot = 3 * self.size
+        end = slot + 3 * count
+        data = self.data
+        data[slot:end:3] = array("q", bytes(8 * count))  # MOVE is kind 0
+        data[slot + 1:end:3] = xs if isinstance(xs, array) else array("q", xs)
+        data[slot + 2:end:3] = ys if isinstance(ys, array) else array("q", ys)
+        self.size += count
+
+    def send(self, batch):
+        """Record a whole batch, without a method call per event."""
+        self.reserve(len(batch))
+        data = self.data
+        slot = 3 * self.size
+        kinds = self.KIND_IDS
+        name_id = self.name_id
+        MOVE, WAIT, SCROLL = self.MOVE, self.WAIT, self.SCROLL
+        for index, event in enumerate(batch):
+            kind = kinds.get(event[0])
+            if kind is None:  # move_path
+                self.size = slot // 3
+                self.move_path(*event[1:])
+                self.reserve(len(batch) - index - 1)
+                data = self.data
+                slot = 3 * self.size
+                continue
+            data[slot] = kind
+            if kind == MOVE:
+                data[slot + 1] = int(event[1])
+                data[slot + 2] = int(event[2])
+            elif kind == WAIT:
+                data[slot + 1] = round(event[1] * 1e6)
+                data[slot + 2] = 0
+            elif kind == SCROLL:
+                data[slot + 1] = int(event[1])
+                data[slot + 2] = 0
+            else:
+                data[slot + 1] = name_id(event[1])
+                data[slot + 2] = 0
+            slot += 3
+        self.size = slot // 3
+
+    def events(self):
+        """Yield the recorded events as InputEventQueue tuples."""
+        data = self.data
+        kinds = self.KINDS
+        for slot in range(0, 3 * self.size, 3):
+            kind = data[slot]
+            if kind == self.MOVE:
+                yield ("move", data[slot + 1], data[slot + 2])
+            elif kind == self.WAIT:
+                yield ("wait", data[slot + 1] / 1e6)
+            elif kind == self.SCROLL:
+                yield ("scroll", data[slot + 1])
+            else:
+                yield (kinds[kind], self.names[data[slot + 1]])
+
+    def counts(self):
+        """Return how many events of each kind were recorded."""
+        totals = [0] * len(self.KINDS)
+        for kind in self.data[0:3 * self.size:3]:
+            totals[kind] += 1
+        return {name: total for name, total in zip(self.KINDS, totals) if total}
+
+    def clear(self):
+        """Forget the recorded events but keep the allocated array."""
+        self.size = 0
@@ -0,0 +1,79 @@
+class InputEventQueue:
+    """Batches input events on their way to a device backend.
+
+    Events are tuples: ("move", x, y), ("button_down", button), ("button_up", button),
+    ("key_down", key), ("key_up", key), ("scroll", amount), ("type_text", text),
+    ("wait", seconds) and ("move_path", xs, ys, interval), named after the
+    InputBackend method that handles them. They are handed to backend.send() a batch
+    at a time, when max_batch events are pending, at a wait and on flush(). The
+    executor flushes at the end of every execute(), so no event is left behind when
+    control returns to the caller.
+
+    A move replaces a move queued right before it, since only the last position of a
+    run of moves is observable; any other event ends the run, so a drag still goes
+    button down, move, button up. A wait is a barrier: it ends the batch it is queued
+    in, so everything before it is delivered before the backend pauses and nothing
+    after it is delivered early.
+    """
+    def __init__(self, backend, max_batch=1024, coalesce=True):
+        self.backend = backend
+        self.max_batch = max_batch
+        self.coalesce = coalesce
+        self.pending = []
+        self.events = 0  # Events queued
+        self.coalesced = 0  # Moves dropped because a later move replaced them
+        self.batches = 0  # Batches sent to the backend
+
+    def push(self, event):
+        self.events += 1
+        self.pending.append(event)
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+
+    def move(self, x, y):
+        pending = self.pending
+        if self.coalesce and pending and pending[-1][0] == "move":
+            self.events += 1
+            self.coalesced += 1
+            pending[-1] = ("move", x, y)
+        else:
+            self.push(("move", x, y))
+
+    def button_down(self, button):
+        self.push(("button_down", button))
+
+    def button_up(self, button):
+        self.push(("button_up", button))
+
+    def key_down(self, key):
+        self.push(("key_down", key))
+
+    def key_up(self, key):
+        self.push(("key_up", key))
+
+    def scroll(self, amount):
+        self.push(("scroll", amount))
+
+    def type_text(self, text):
+        self.push(("type_text", text))
+
+    def move_path(self, xs, ys, interval):
+        """Queue a timed move as one event, however many points it has."""
+        self.push(("move_path", xs, ys, interval))
+
+    def wait(self, seconds):
+        self.events += 1
+        self.pending.append(("wait", seconds))
+        self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch = self.pending
+        self.pending = []
+        self.batches += 1
+        self.backend.send(batch)
+
+    def clear(self):
+        """Drop pending events without sending them."""
+        self.pending = []
@@ -10,5 +10,21 @@ class MouseManager:
         self.y = y
         self.current_position = (x, y)
 
+    def button_down(self, button):
+        if button in self.buttons:
+            self.buttons[button] = True
+
+    def button_up(self, button):
+        if button in self.buttons:
+            self.buttons[button] = False
+
     def get_position(self):
         return (self.x, self.y)
+
+    def copy(self):
+        """Return an independent copy, e.g. to restore an executor snapshot from."""
+        mouse = MouseManager()
+        mouse.x, mouse.y = self.x, self.y
+        mouse.current_position = self.current_position
+        mouse.buttons = dict(self.buttons)
+        return mouse
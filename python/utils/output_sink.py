@@ -0,0 +1,57 @@
+import io
+import sys
+
+class OutputSink:
+    """Buffered destination for PRINT/PRINTLN output.
+
+    Flush policies:
+        always   - write through on every call (the old print() behaviour)
+        line     - flush whenever a newline is written
+        buffered - flush once buffer_size characters are pending
+        manual   - only flush when flush() is called
+
+    The executor flushes at the end of every execute(), so output always reaches the
+    stream before control returns to the caller, whatever the policy.
+    """
+    POLICIES = ("always", "line", "buffered", "manual")
+
+    def __init__(self, stream=None, flush_policy="buffered", buffer_size=65536):
+        if flush_policy not in self.POLICIES:
+            raise ValueError(f"Unknown flush policy '{flush_policy}', expected one of {', '.join(self.POLICIES)}")
+        self.stream = stream  # None means whatever sys.stdout is at flush time
+        self.flush_policy = flush_policy
+        self.buffer_size = buffer_size
+        self.pending = []
+        self.pending_size = 0
+
+    def write(self, text):
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.flush_policy == "buffered":
+            if self.pending_size >= self.buffer_size:
+                self.flush()
+        elif self.flush_policy == "always" or (self.flush_policy == "line" and "\n" in text):
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        stream = self.stream or sys.stdout
+        stream.write("".join(self.pending))
+        stream.flush()
+        self.pending = []
+        self.pending_size = 0
+
+class MemorySink(OutputSink):
+    """Output sink that keeps everything in memory, for tests and batch runners."""
+    def __init__(self):
+        super().__init__(io.StringIO(), flush_policy="manual")
+
+    def getvalue(self):
+        self.flush()
+        return self.stream.getvalue()
+
+    def clear(self):
+        self.pending = []
+        self.pending_size = 0
+        self.stream = io.StringIO()
@@ -0,0 +1,92 @@
+class GridIndex:
+    """Uniform grid over axis-aligned rectangles, for point and rectangle queries.
+
+    Every rectangle is filed under each cell_size x cell_size cell it overlaps, so a
+    point query only looks at the rectangles in one cell, and moving a rectangle only
+    touches the cells it leaves and enters. Rectangles are half-open, [x, x + width)
+    by [y, y + height), so an empty rectangle contains no point.
+    """
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> set of keys
+        self.rects = {}  # key -> (x, y, width, height)
+        self.spans = {}  # key -> (first column, first row, last column, last row)
+
+    def copy(self):
+        index = GridIndex(self.cell_size)
+        index.cells = {cell: set(keys) for cell, keys in self.cells.items()}
+        index.rects = dict(self.rects)
+        index.spans = dict(self.spans)
+        return index
+
+    def span(self, x, y, width, height):
+        size = self.cell_size
+        # An empty rectangle is still filed under the cell of its corner
+        return (int(x // size), int(y // size),
+                int((x + max(width, 1) - 1) // size), int((y + max(height, 1) - 1) // size))
+
+    def insert(self, key, x, y, width, height):
+        """Add a rectangle, or move it if key is already indexed."""
+        span = self.span(x, y, width, height)
+        old = self.spans.get(key)
+        self.rects[key] = (x, y, width, height)
+        if old == span:
+            return
+        if old is not None:
+            self.unfile(key, old)
+        self.spans[key] = span
+        cells = self.cells
+        for column in range(span[0], span[2] + 1):
+            for row in range(span[1], span[3] + 1):
+                keys = cells.get((column, row))
+                if keys is None:
+                    cells[(column, row)] = {key}
+                else:
+                    keys.add(key)
+
+    def remove(self, key):
+        span = self.spans.pop(key, None)
+        if span is not None:
+            del self.rects[key]
+            self.unfile(key, span)
+
+    def unfile(self, key, span):
+        cells = self.cells
+        for column in range(span[0], span[2] + 1):
+            for row in range(span[1], span[3] + 1):
+                keys = cells[(column, row)]
+                keys.discard(key)
+                if not keys:
+                    del cells[(column, row)]
+
+    def query_point(self, x, y):
+        """Return the keys of every rectangle containing (x, y)."""
+        size = self.cell_size
+        keys = self.cells.get((int(x // size), int(y // size)))
+        if not keys:
+            return []
+        rects = self.rects
+        hits = []
+        for key in keys:
+            rx, ry, width, height = rects[key]
+            if rx <= x < rx + width and ry <= y < ry + height:
+                hits.append(key)
+        return hits
+
+    def query_rect(self, x, y, width, height):
+        """Return the keys of every rectangle overlapping the given one."""
+        first_column, first_row, last_column, last_row = self.span(x, y, width, height)
+        cells = self.cells
+        candidates = set()
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                keys = cells.get((column, row))
+                if keys:
+                    candidates |= keys
+        rects = self.rects
+        hits = []
+        for key in candidates:
+            rx, ry, rw, rh = rects[key]
+            if rx < x + width and x < rx + rw and ry < y + height and y < ry + rh:
+                hits.append(key)
+        return hits
@@ -0,0 +1,85 @@
+from array import array
+
+# Motion profiles of a timed MOVE MOUSE
+PROFILES = ("LINEAR", "EASED", "BEZIER")
+
+# numpy is imported by the first trajectory, so scripts without timed moves never load it
+numpy = None
+numpy_loaded = False
+
+def load_numpy():
+    """Return the numpy module, or None if it is not installed."""
+    global numpy, numpy_loaded
+    if not numpy_loaded:
+        numpy_loaded = True
+        try:
+            import numpy as module
+        except ImportError:  # Trajectories are then computed with plain Python lists
+            module = None
+        numpy = module
+    return numpy
+
+def sample_count(duration, rate):
+    """Return how many points a move lasting duration seconds takes at rate per second."""
+    return max(1, round(duration * rate))
+
+def control_points(start, end):
+    """Return the inner control points of the BEZIER curve from start to end.
+
+    Both sit a fifth of the distance to the left of the straight line, at one and two
+    thirds of the way, so the path bows to one side like a hand-moved pointer does.
+    """
+    (x0, y0), (x3, y3) = start, end
+    dx, dy = x3 - x0, y3 - y0
+    bow_x, bow_y = -dy / 5, dx / 5
+    return (x0 + dx / 3 + bow_x, y0 + dy / 3 + bow_y), (x0 + 2 * dx / 3 + bow_x, y0 + 2 * dy / 3 + bow_y)
+
+def trajectory(start, end, duration, rate, profile="LINEAR"):
+    """Return the positions of a move from start to end as two int64 arrays, xs and ys.
+
+    The move is sampled rate times per second for duration seconds. The first sample
+    is one interval after the start, and the last is end itself. LINEAR moves at
+    constant speed, EASED speeds up and then slows down (smoothstep), and BEZIER
+    follows an eased cubic Bezier curve. With numpy the whole path is computed as
+    array operations; without it, one list comprehension per coordinate is used.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile '{profile}', expected one of {', '.join(PROFILES)}")
+    count = sample_count(duration, rate)
+    if load_numpy() is not None:
+        return numpy_trajectory(start, end, count, profile)
+    return python_trajectory(start, end, count, profile)
+
+def numpy_trajectory(start, end, count, profile):
+    t = numpy.arange(1, count + 1, dtype=numpy.float64) / count
+    if profile != "LINEAR":
+        t = t * t * (3 - 2 * t)
+    (x0, y0), (x3, y3) = start, end
+    if profile == "BEZIER":
+        (x1, y1), (x2, y2) = control_points(start, end)
+        u = 1 - t
+        b0, b1, b2, b3 = u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t
+        xs = b0 * x0 + b1 * x1 + b2 * x2 + b3 * x3
+        ys = b0 * y0 + b1 * y1 + b2 * y2 + b3 * y3
+    else:
+        xs = x0 + (x3 - x0) * t
+        ys = y0 + (y3 - y0) * t
+    return (array("q", numpy.rint(xs).astype(numpy.int64).tobytes()),
+            array("q", numpy.rint(ys).astype(numpy.int64).tobytes()))
+
+def python_trajectory(start, end, count, profile):
+    ts = [i / count for i in range(1, count + 1)]
+    if profile != "LINEAR":
+        ts = [t * t * (3 - 2 * t) for t in ts]
+    (x0, y0), (x3, y3) = start, end
+    if profile == "BEZIER":
+        (x1, y1), (x2, y2) = control_points(start, end)
+        # Bezier weights of the two end points and the two control points
+        weights = [((1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t * t, t * t * t) for t in ts]
+        xs = [round(b0 * x0 + b1 * x1 + b2 * x2 + b3 * x3) for b0, b1, b2, b3 in weights]
+        ys = [round(b0 * y0 + b1 * y1 + b2 * y2 + b3 * y3) for b0, b1, b2, b3 in weights]
+    else:
+        dx, dy = x3 - x0, y3 - y0
+        xs = [round(x0 + dx * t) for t in ts]
+        ys = [round(y0 + dy * t) for t in ts]
+    return array("q", xs), array("q", ys)
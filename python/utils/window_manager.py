@@ -1,3 +1,6 @@
+from collections import OrderedDict
+from .spatial_index import GridIndex
+
 class Window:
     def __init__(self, name, x=0, y=0, width=0, height=0):
         self.name = name
@@ -7,29 +10,174 @@ class Window:
         self.height = height
         self.focused = False
 
+    def copy(self):
+        window = Window(self.name, self.x, self.y, self.width, self.height)
+        window.focused = self.focused
+        return window
+
+    def __repr__(self):
+        return f"Window(name={self.name!r}, x={self.x}, y={self.y}, width={self.width}, height={self.height})"
+
 class WindowManager:
-    def __init__(self):
-        self.windows = {}
-        
+    """Tracks windows, their stacking order and which one has focus.
+
+    windows is ordered bottom to top, so it doubles as the z-order: raising a window
+    moves it to the end in O(1). focused_window names the one focused window, so
+    focusing touches only the old and the new window however many are open.
+    Listeners added with add_listener are called as listener(event, window) after
+    every change, with event one of "created", "closed", "moved", "resized",
+    "raised", "lowered", "focused" and "blurred".
+
+    Window rectangles are kept in a GridIndex, updated as windows open, close, move
+    and resize, so window_at and windows_in only test the windows near the query.
+    ranks gives every window a number that grows toward the top of the stack, so the
+    topmost of those windows is found without walking the z-order.
+    """
+    def __init__(self, cell_size=256):
+        self.windows = OrderedDict()  # Bottom to top
+        self.focused_window = None  # Name of the focused window
+        self.listeners = []
+        self.index = GridIndex(cell_size)
+        self.ranks = {}  # Name -> stacking rank, higher is nearer the top
+        self.top_rank = 0
+        self.bottom_rank = 0
+
+    def copy(self):
+        """Return an independent copy, e.g. to restore an executor snapshot from.
+
+        Listeners are not copied.
+        """
+        manager = WindowManager(self.index.cell_size)
+        manager.windows = OrderedDict((name, window.copy()) for name, window in self.windows.items())
+        manager.focused_window = self.focused_window
+        manager.index = self.index.copy()
+        manager.ranks = dict(self.ranks)
+        manager.top_rank = self.top_rank
+        manager.bottom_rank = self.bottom_rank
+        return manager
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def emit(self, event, window):
+        for listener in self.listeners:
+            listener(event, window)
+
     def create_window(self, name, x=0, y=0, width=0, height=0):
-        self.windows[name] = Window(name, x, y, width, height)
-        
+        """Open a window on top of the others, replacing any window of the same name."""
+        if name in self.windows:
+            self.close_window(name)
+        window = self.windows[name] = Window(name, x, y, width, height)
+        self.index.insert(name, x, y, width, height)
+        self.top_rank += 1
+        self.ranks[name] = self.top_rank
+        if self.listeners:
+            self.emit("created", window)
+
+    def close_window(self, name):
+        window = self.windows.pop(name, None)
+        if window is None:
+            return False
+        self.index.remove(name)
+        del self.ranks[name]
+        if self.focused_window == name:
+            self.focused_window = None
+            window.focused = False
+            if self.listeners:
+                self.emit("blurred", window)
+        if self.listeners:
+            self.emit("closed", window)
+        return True
+
     def exists(self, name):
         return name in self.windows
-        
+
     def focus(self, name):
-        if not self.exists(name):
+        """Focus a window and raise it to the top."""
+        window = self.windows.get(name)
+        if window is None:
             return False
-        # Unfocus all windows
-        for window in self.windows.values():
-            window.focused = False
-        # Focus requested window
-        self.windows[name].focused = True
+        previous = self.focused_window
+        if previous is not None and previous != name:
+            old = self.windows[previous]
+            old.focused = False
+            if self.listeners:
+                self.emit("blurred", old)
+        self.focused_window = name
+        window.focused = True
+        self.raise_window(name)
+        if self.listeners and previous != name:
+            self.emit("focused", window)
+        return True
+
+    def get_focused(self):
+        """Return the focused Window, or None."""
+        return self.windows.get(self.focused_window) if self.focused_window is not None else None
+
+    def raise_window(self, name):
+        if name not in self.windows:
+            return False
+        if next(reversed(self.windows)) != name:
+            self.windows.move_to_end(name)
+            self.top_rank += 1
+            self.ranks[name] = self.top_rank
+            if self.listeners:
+                self.emit("raised", self.windows[name])
+        return True
+
+    def lower_window(self, name):
+        if name not in self.windows:
+            return False
+        if next(iter(self.windows)) != name:
+            self.windows.move_to_end(name, last=False)
+            self.bottom_rank -= 1
+            self.ranks[name] = self.bottom_rank
+            if self.listeners:
+                self.emit("lowered", self.windows[name])
         return True
-        
+
+    def top(self):
+        """Return the topmost Window, or None."""
+        return self.windows[next(reversed(self.windows))] if self.windows else None
+
+    def z_order(self):
+        """Return the window names from bottom to top."""
+        return list(self.windows)
+
+    def window_at(self, x, y):
+        """Return the topmost Window containing the point (x, y), or None."""
+        hits = self.index.query_point(x, y)
+        if not hits:
+            return None
+        return self.windows[max(hits, key=self.ranks.__getitem__)]
+
+    def windows_in(self, x, y, width, height):
+        """Return the Windows overlapping the rectangle, topmost first."""
+        hits = self.index.query_rect(x, y, width, height)
+        hits.sort(key=self.ranks.__getitem__, reverse=True)
+        return [self.windows[name] for name in hits]
+
     def move(self, name, x, y):
-        if not self.exists(name):
+        window = self.windows.get(name)
+        if window is None:
+            return False
+        window.x = x
+        window.y = y
+        self.index.insert(name, x, y, window.width, window.height)
+        if self.listeners:
+            self.emit("moved", window)
+        return True
+
+    def resize(self, name, width, height):
+        window = self.windows.get(name)
+        if window is None:
             return False
-        self.windows[name].x = x
-        self.windows[name].y = y
+        window.width = width
+        window.height = height
+        self.index.insert(name, window.x, window.y, width, height)
+        if self.listeners:
+            self.emit("resized", window)
         return True
@@ -1,3 +1,5 @@
+import os
+import sys
 import json
 import logging
 from python import Lexer
@@ -5,6 +7,16 @@ from python import Parser
 from python import Executor
 from argparse import ArgumentParser
 from python import Program
+from python import CompilationUnit
+from python.batch import run_batch, run_check, run_jsonl
+from python.parallel import ParallelParser
+from python.lexer import tokenize_file
+from python.profiler import Profiler
+from python.memprofile import MemoryProfile
+from python.limits import ExecutionLimits
+from python.server import serve
+from python.ast_nodes import node_from_dict
+from python.utils import OutputSink, MemorySink
 from python.errors import *
 
 def setup_logging(enable_logging=False, log_level=logging.DEBUG, log_file="app.log"):
@@ -40,88 +52,188 @@ def save_ast_to_json(ast, save_path):
     except Exception as e:
         raise Exception(f"Failed to save AST to {save_path}: {str(e)}")
 
-def execute_from_file(file_path, save_ast_path=None, verbose=False):
-    """Execute code from a file."""
-    try:
-        with open(file_path, 'r') as file:
-            code = file.read()
+def append_ast_journal(program, journal):
+    """Append one REPL input to an open AST journal as a single compact JSON line."""
+    journal.write(json.dumps(program.to_dict()) + "\n")
+    journal.flush()
 
-        lexer = Lexer(code)
-        tokens = lexer.tokenize()
-        executor = Executor(verbose=verbose)
-        parser = Parser()
-        ast = parser.parse(tokens)
+def read_ast_journal(journal_path):
+    """Yield the Program recorded on each line of an AST journal."""
+    with open(journal_path, 'r') as journal:
+        for line_number, line in enumerate(journal, 1):
+            if not line.strip():
+                continue
+            try:
+                yield node_from_dict(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn final line is what an interrupted append leaves behind
+                if not journal.readline():
+                    logging.getLogger(__name__).warning("Ignoring truncated last line of %s", journal_path)
+                    return
+                raise ValueError(f"Invalid JSON on line {line_number} of AST journal: {journal_path}")
+
+def is_ast_journal(ast_path):
+    """True if ast_path holds an AST journal rather than one indented AST document.
+
+    The file name does not matter: a journal's first non-blank line is a complete
+    Program on its own, while a document saved by -f/-c -s starts with a lone '{'.
+    """
+    with open(ast_path, 'r') as file:
+        for line in file:
+            if line.strip():
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    return False
+                return isinstance(data, dict) and data.get("type") == "Program"
+    return True  # An empty file is an empty journal
+
+def read_ast_inputs(ast_path):
+    """Yield the Programs saved in ast_path, whether it is a journal or a single document."""
+    if is_ast_journal(ast_path):
+        yield from read_ast_journal(ast_path)
+    else:
+        yield node_from_dict(load_ast_from_json(ast_path))
+
+def load_ast_journal(journal_path):
+    """Load every input recorded in an AST journal or document as one Program."""
+    statements = []
+    for program in read_ast_inputs(journal_path):
+        statements.extend(program.statements)
+    return Program(statements)
+
+def run_program(executor, ast, profile_path=None):
+    """Execute ast, profiling it if profile_path is given.
+
+    The hot-spot table goes to stderr, so it never mixes with the script's own output,
+    and the collapsed stacks are written to profile_path for flamegraph tools.
+    """
+    if not profile_path:
+        executor.execute(ast)
+        return
+    profiler = Profiler()
+    profiler.attach(executor)
+    try:
+        executor.execute(ast)
+    finally:
+        profiler.detach(executor)
+        print(profiler.report(), file=sys.stderr)
+        with open(profile_path, 'w') as stacks:
+            profiler.write_collapsed(stacks)
+        print(f"Collapsed stacks written to {profile_path}", file=sys.stderr)
+
+def run_memprofiled(executor, tokenize, *args):
+    """Lex, parse and execute under tracemalloc, printing a per-stage memory report to stderr."""
+    profile = MemoryProfile()
+    profile.attach(executor)
+    profile.start()
+    try:
+        tokens = profile.stage("tokenize", tokenize, *args)
+        ast = profile.stage("parse", Parser().parse, tokens)
+        del tokens  # Reachable from the parser's result only through what the AST kept
+        profile.stage("execute", executor.execute, ast)
+    finally:
+        profile.stop()
+        profile.detach(executor)
+        print(profile.report(), file=sys.stderr)
+
+def execute_from_file(file_path, save_ast_path=None, verbose=False, flush_policy="buffered", parse_jobs=1,
+                      profile_path=None, memprofile=False, limits=None):
+    """Execute code from a file, parsing it on parse_jobs processes if it is large enough."""
+    try:
+        executor = Executor(verbose=verbose, output=OutputSink(flush_policy=flush_policy), limits=limits)
+        if memprofile:
+            run_memprofiled(executor, tokenize_file, file_path)
+            return
+        if parse_jobs > 1:
+            with open(file_path, 'r') as file:
+                code = file.read()
+            ast = ParallelParser(parse_jobs).parse(code)
+        else:
+            # Lexed from a memory map, so the source is never held as one big str
+            tokens = tokenize_file(file_path)
+            parser = Parser()
+            ast = parser.parse(tokens)
 
         if save_ast_path:
-            save_ast_to_json(ast, save_ast_path)
+            save_ast_to_json(ast.to_dict(), save_ast_path)
 
-        executor.execute(ast)
+        run_program(executor, ast, profile_path)
     except FileNotFoundError:
         raise FileNotFoundError(f"Code file not found: {file_path}")
     except Exception as e:
         raise Exception(f"Failed to execute file {file_path}: {str(e)}")
 
-def execute_from_ast(ast_path, verbose=False):
-    """Execute code from an AST file."""
-    ast = load_ast_from_json(ast_path)
-    executor = Executor(verbose=verbose)
-    executor.execute(ast)
+def execute_from_ast(ast_path, verbose=False, flush_policy="buffered", profile_path=None, limits=None):
+    """Execute code from an AST file or an interactive session's AST journal."""
+    if not os.path.exists(ast_path):
+        raise FileNotFoundError(f"AST file not found: {ast_path}")
+    ast = load_ast_journal(ast_path)
+    executor = Executor(verbose=verbose, output=OutputSink(flush_policy=flush_policy), limits=limits)
+    run_program(executor, ast, profile_path)
+
+def replay_ast_journal(journal_path, unit):
+    """Re-run a saved REPL session so its functions and variables are defined again.
 
-def interactive_mode(save_ast_path=None, verbose=False):
-    """Run the REPL in interactive mode."""
+    Output from the replay is discarded, and inputs that failed in the original
+    session are allowed to fail again, just as they did at the prompt.
+    """
+    logger = logging.getLogger(__name__)
+    executor = unit.executor
+    output, executor.output = executor.output, MemorySink()
+    inputs = 0
+    try:
+        for program in read_ast_inputs(journal_path):
+            inputs += 1
+            unit.declare(program)
+            try:
+                unit.execute(program)
+            except Exception as e:
+                logger.debug("Replayed input %d failed again: %s", inputs, e)
+    finally:
+        executor.output = output
+    print(f"Restored {inputs} inputs from {journal_path}")
+
+def interactive_mode(save_ast_path=None, verbose=False, flush_policy="buffered"):
+    """Run the REPL in interactive mode.
+
+    If save_ast_path is given, every input's AST is appended to it as one JSON line.
+    When the journal already exists it is replayed first, so the session picks up
+    where it left off.
+    """
     logger = logging.getLogger(__name__)
     logger.info("Starting the REPL application.")
 
-    executor = Executor(verbose=verbose)
+    executor = Executor(verbose=verbose, output=OutputSink(flush_policy=flush_policy))
     print("Welcome to the CommandPro REPL. Type 'exit;' to quit.")
-    buffer = ""
     prompt = ">>> "
-    
-    # Track different types of brackets for better balance checking
-    brackets = {
-        'curly': 0,    # {}
-        'round': 0,    # ()
-        'square': 0    # []
-    }
-    
-    # Initialize cumulative program for AST
-    cumulative_program = Program([])
-    parser = Parser()
-
-    def update_bracket_count(line):
-        """Update bracket counts for a line of code."""
-        brackets['curly'] += line.count('{') - line.count('}')
-        brackets['round'] += line.count('(') - line.count(')')
-        brackets['square'] += line.count('[') - line.count(']')
-        
-    def is_complete_statement(buffer):
-        """Check if the current buffer contains a complete statement."""
-        if not buffer.strip():
-            return True
-            
-        if buffer.strip().endswith(';'):
-            return all(count == 0 for count in brackets.values())
-            
-        if buffer.strip().endswith('}'):
-            return all(count == 0 for count in brackets.values())
-            
-        return False
 
-    def update_ast(new_ast):
-        """Update the cumulative AST and save it if needed."""
-        nonlocal cumulative_program
-        
-        # Add new statements to cumulative program
-        if isinstance(new_ast, Program):
-            cumulative_program.statements.extend(new_ast.statements)
-        else:
-            cumulative_program.statements.append(new_ast)
+    # One lexer for the whole session; it carries open brackets, strings and
+    # block comments from line to line, so every line is lexed once
+    lexer = Lexer("")
+    # Symbol and function tables persist across inputs; each input only adds to them
+    unit = CompilationUnit(executor)
+    journal = None
+    if save_ast_path:
+        try:
+            if os.path.exists(save_ast_path):
+                replay_ast_journal(save_ast_path, unit)
+                if not is_ast_journal(save_ast_path):
+                    # An AST saved by -f/-c: rewrite it as a one-line journal before appending
+                    program = node_from_dict(load_ast_from_json(save_ast_path))
+                    with open(save_ast_path, 'w') as file:
+                        append_ast_journal(program, file)
+            journal = open(save_ast_path, 'a')
+        except Exception as e:
+            logger.error(f"Failed to open AST journal: {e}")
+            print(f"Warning: Failed to open AST journal, the session will not be saved: {e}")
 
-        # Save updated AST immediately if path is provided
-        if save_ast_path:
+    def update_ast(new_ast):
+        """Append the new input to the AST journal if one is open."""
+        if journal:
             try:
-                save_ast_to_json(cumulative_program.to_dict(), save_ast_path)
-                logger.debug(f"Updated AST saved to {save_ast_path}")
+                append_ast_journal(new_ast, journal)
+                logger.debug(f"Appended AST to {save_ast_path}")
             except Exception as e:
                 logger.error(f"Failed to save AST: {e}")
                 print(f"Warning: Failed to save AST: {e}")
@@ -131,50 +243,49 @@ def interactive_mode(save_ast_path=None, verbose=False):
             print(prompt, end="")
             line = input()
             
-            if not line.strip():
+            # Blank lines only matter inside an open string literal
+            if not line.strip() and not lexer.in_literal:
                 continue
 
-            if line.strip().lower() == 'exit;':
+            if not lexer.tokens and not lexer.in_literal and line.strip().lower() == 'exit;':
                 logger.info("Exit command received. Terminating REPL.")
                 print("Goodbye!")
                 break
 
-            buffer += line + "\n"
-            update_bracket_count(line)
+            try:
+                lexer.feed(line)
+            except SyntaxError as e:
+                logger.error("Lexing failed with error: %s", e)
+                print(f"Parsing Error: {e}")
+                lexer.reset_feed()
+                prompt = ">>> "
+                continue
 
-            if any(count < 0 for count in brackets.values()):
+            # Once a close goes below zero, no later input can balance it
+            if lexer.unbalanced:
                 logger.error("Unmatched closing bracket detected.")
                 print("Syntax Error: Unmatched closing bracket.")
-                buffer = ""
-                brackets = dict.fromkeys(brackets, 0)
+                lexer.reset_feed()
                 prompt = ">>> "
                 continue
 
-            if not is_complete_statement(buffer):
-                prompt = "... "
+            if not lexer.at_statement_end():
+                # Nothing but comments so far needs no continuation prompt
+                prompt = "... " if lexer.tokens or lexer.in_literal else ">>> "
                 continue
 
             prompt = ">>> "
 
             try:
-                code_to_execute = buffer.rstrip()
-                
-                if not code_to_execute:
-                    buffer = ""
-                    continue
-
-                # First try to parse without executing to ensure it's valid
-                lexer = Lexer(code_to_execute)
-                tokens = lexer.tokenize()
-                new_ast = parser.parse(tokens)
-                # print("Tokens:", tokens)
-                # print("AST:", new_ast)
+                # Parse the tokens collected by the lexer before executing anything
+                tokens = lexer.take_tokens()
+                new_ast = unit.compile(tokens)
                 
-                # If parsing succeeds, update the cumulative AST immediately
+                # If parsing succeeds, journal the new statements immediately
                 update_ast(new_ast)
                 
                 # Then execute the code
-                executor.execute(new_ast)
+                unit.execute(new_ast)
                 logger.info("Execution completed successfully.")
 
             except SyntaxError as e:
@@ -184,32 +295,55 @@ def interactive_mode(save_ast_path=None, verbose=False):
                 logger.exception("Execution failed with error: %s", f"{type(e).__name__}: {e}")
                 print(f"{type(e).__name__}: {e}")
 
-            buffer = ""
-            brackets = dict.fromkeys(brackets, 0)
-
         except (EOFError, KeyboardInterrupt):
             print("\nGoodbye!")
             break
 
-def execute_code_string(code_string, save_ast_path=None, verbose=False):
+    if journal:
+        journal.close()
+
+def execute_code_string(code_string, save_ast_path=None, verbose=False, flush_policy="buffered", profile_path=None,
+                        memprofile=False, limits=None):
     """Execute code passed as a string."""
     try:
+        if memprofile:
+            executor = Executor(verbose=verbose, output=OutputSink(flush_policy=flush_policy), limits=limits)
+            run_memprofiled(executor, lambda code: Lexer(code).tokenize(), code_string)
+            return 0
         lexer = Lexer(code_string)
         tokens = lexer.tokenize()
-        executor = Executor(verbose=verbose)
+        executor = Executor(verbose=verbose, output=OutputSink(flush_policy=flush_policy), limits=limits)
         parser = Parser()
         ast = parser.parse(tokens)
 
         if save_ast_path:
             save_ast_to_json(ast.to_dict(), save_ast_path)
 
-        executor.execute(ast)
+        run_program(executor, ast, profile_path)
     except Exception as e:
         print(f"Error: {str(e)}")
         return 1
 
     return 0
 
+def execute_batch(directory, jobs=None, fail_fast=False, verbose=False, limits=None):
+    """Execute every script in a directory on a process pool."""
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"Batch directory not found: {directory}")
+    return run_batch(directory, jobs, fail_fast, verbose, limits=limits)
+
+def execute_check(directory, jobs=None):
+    """Parse every script in a directory with error recovery, without executing anything."""
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"Check directory not found: {directory}")
+    return run_check(directory, jobs)
+
+def execute_jsonl(path, jobs=None, verbose=False, limits=None):
+    """Execute every request in a JSON-lines file, writing JSON-line results in order."""
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Request file not found: {path}")
+    return run_jsonl(path, jobs, verbose, limits=limits)
+
 def main():
     parser = ArgumentParser(description="CommandPro Interpreter")
     parser.add_argument("-f", "--file", help="File to run")
@@ -221,28 +355,60 @@ def main():
     parser.add_argument("-log_file", "--log_file", default="app.log", help="Log file path")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose mode")
     parser.add_argument("-c", "--code", help="Code string to execute directly")
+    parser.add_argument("--flush", choices=OutputSink.POLICIES, default="buffered", help="When PRINT output is flushed to stdout")
+    parser.add_argument("--batch", metavar="DIR", help="Run every .csc script under DIR and stream JSON-line results")
+    parser.add_argument("--jsonl", metavar="FILE", help="Run JSON-line requests from FILE and write JSON-line results")
+    parser.add_argument("--check", metavar="DIR", help="Report every syntax error in the .csc scripts under DIR without running them")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for --batch/--jsonl/--check (default: all cores)")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop --batch at the first failing script (default: keep going)")
+    parser.add_argument("--parse-jobs", type=int, default=1, help="Processes to lex and parse a large --file with (default: 1)")
+    parser.add_argument("--profile", nargs="?", const="profile.folded", metavar="FILE",
+                        help="Profile --file/--code/--ast_path: print hot nodes and lines to stderr and write collapsed stacks to FILE (default: profile.folded)")
+    parser.add_argument("--memprofile", action="store_true",
+                        help="Report peak and retained memory of lexing, parsing and executing --file/--code to stderr")
+    parser.add_argument("--max-steps", type=int, help="Stop a script after this many statements and loop iterations")
+    parser.add_argument("--timeout", type=float, help="Stop a script after this many seconds")
+    parser.add_argument("--max-memory", type=int, metavar="MB", help="Stop a script once the process has grown by this many MB since it started; with --serve this is shared by concurrent requests")
+    parser.add_argument("--max-depth", type=int, help="Stop a script that nests function calls deeper than this")
+    parser.add_argument("--serve", metavar="SOCKET", help="Serve requests on a Unix domain socket (see client.py)")
 
     args = parser.parse_args()
 
     # Setup logging based on arguments
     setup_logging(args.log, args.log_level, args.log_file)
+    max_memory = args.max_memory * 1024 * 1024 if args.max_memory is not None else None
+    limits = ExecutionLimits(args.max_steps, args.timeout, max_memory, args.max_depth)
 
     try:
-        if args.code:
+        if args.serve:
+            # Keep a warm interpreter behind a local socket
+            serve(args.serve, verbose=args.verbose, limits=limits)
+        elif args.jsonl:
+            # Stream JSON-line requests through a bounded process pool
+            return execute_jsonl(args.jsonl, args.jobs, args.verbose, limits)
+        elif args.check:
+            # Validate a directory of scripts without executing them
+            return execute_check(args.check, args.jobs)
+        elif args.batch:
+            # Run a directory of scripts on a process pool
+            return execute_batch(args.batch, args.jobs, args.fail_fast, args.verbose, limits)
+        elif args.code:
             # Execute code passed as a string
-            execute_code_string(args.code, args.save_ast_path, args.verbose)
+            execute_code_string(args.code, args.save_ast_path, args.verbose, args.flush, args.profile,
+                                args.memprofile, limits)
         elif args.ast_path:
             # Execute from AST file
-            execute_from_ast(args.ast_path, args.verbose)
+            execute_from_ast(args.ast_path, args.verbose, args.flush, args.profile, limits)
         elif args.file:
             # Execute from code file
-            execute_from_file(args.file, args.save_ast_path, args.verbose)
+            execute_from_file(args.file, args.save_ast_path, args.verbose, args.flush, args.parse_jobs,
+                              args.profile, args.memprofile, limits)
         elif args.interactive:
             # Run in interactive mode with AST saving if path is provided
-            interactive_mode(args.save_ast_path, args.verbose)
+            interactive_mode(args.save_ast_path, args.verbose, args.flush)
         else:
             # Default to interactive mode
-            interactive_mode(args.save_ast_path, args.verbose)
+            interactive_mode(args.save_ast_path, args.verbose, args.flush)
     except Exception as e:
         print(f"Error: {str(e)}")
         return 1
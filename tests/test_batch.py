@@ -0,0 +1,82 @@
+# test_batch.py
+import io
+import json
+import pytest
+from python.batch import check_script, collect_scripts, run_batch, run_check, run_jsonl, run_script
+
+@pytest.fixture
+def script_dir(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "a_ok.csc").write_text("SET x = 2;\nPRINTLN x * 21;\n")
+    (tmp_path / "b_runtime.csc").write_text("SET x = 1 / 0;\n")
+    (tmp_path / "nested" / "c_syntax.csc").write_text("SET = ;\n")
+    (tmp_path / "notes.txt").write_text("not a script")
+    return tmp_path
+
+def test_collect_scripts_is_recursive_and_sorted(script_dir):
+    scripts = collect_scripts(str(script_dir))
+    assert [path.rsplit("/", 1)[-1] for path in scripts] == ["a_ok.csc", "b_runtime.csc", "c_syntax.csc"]
+
+def test_run_script_captures_output_and_errors(script_dir):
+    ok = run_script(str(script_dir / "a_ok.csc"))
+    assert ok["status"] == "ok" and ok["stdout"] == "42\n"
+    runtime = run_script(str(script_dir / "b_runtime.csc"))
+    assert runtime["status"] == "error" and runtime["stage"] == "execute"
+    syntax = run_script(str(script_dir / "nested" / "c_syntax.csc"))
+    assert syntax["status"] == "error" and syntax["stage"] == "parse"
+
+def test_run_batch_keeps_going(script_dir):
+    out = io.StringIO()
+    assert run_batch(str(script_dir), jobs=2, out=out) == 1
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(result["status"] for result in results) == ["error", "error", "ok"]
+
+def test_run_batch_fail_fast_stops_early(tmp_path, capsys):
+    (tmp_path / "a_fail.csc").write_text("SET x = 1 / 0;\n")
+    for i in range(10):
+        (tmp_path / f"b_ok_{i}.csc").write_text(f"PRINTLN {i};\n")
+    out = io.StringIO()
+    assert run_batch(str(tmp_path), jobs=1, fail_fast=True, out=out) == 1
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(results) < 11
+    assert results[0]["script"].endswith("a_fail.csc") and results[0]["status"] == "error"
+    assert "0 passed, 1 failed, 10 skipped" in capsys.readouterr().err
+
+def test_run_jsonl_writes_results_in_order(tmp_path, script_dir):
+    requests = tmp_path / "requests.jsonl"
+    lines = [json.dumps({"id": i, "code": "PRINTLN n + 1;", "params": {"n": i}}) for i in range(20)]
+    lines.append(json.dumps({"id": "file", "path": str(script_dir / "a_ok.csc")}))
+    lines.append("{broken")
+    requests.write_text("\n".join(lines) + "\n")
+    out = io.StringIO()
+    assert run_jsonl(str(requests), jobs=2, out=out) == 1
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [result["stdout"] for result in results[:20]] == [f"{i + 1}\n" for i in range(20)]
+    assert results[20]["id"] == "file" and results[20]["stdout"] == "42\n"
+    assert results[21]["status"] == "error" and results[21]["line"] == 22
+
+def test_run_jsonl_reports_bad_params_per_line(tmp_path):
+    requests = tmp_path / "requests.jsonl"
+    lines = [json.dumps({"id": 1, "code": "PRINTLN x;", "params": [1]}),
+             json.dumps({"id": 2, "code": "PRINTLN x;", "params": {"x": 5}})]
+    requests.write_text("\n".join(lines) + "\n")
+    out = io.StringIO()
+    assert run_jsonl(str(requests), jobs=1, out=out) == 1
+    first, second = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert first["status"] == "error" and first["stage"] == "request" and "params" in first["error"]
+    assert second["status"] == "ok" and second["stdout"] == "5\n"
+
+def test_check_script_reports_every_error(tmp_path):
+    path = tmp_path / "broken.csc"
+    path.write_text("SET = 1;\nSET x = 2;\nDEFUN f(a) {\n    SET b = ;\n    RETURN a;\n}\nPRINTLN x +;\nPRINTLN f(x);\n")
+    result = check_script(str(path))
+    assert result["status"] == "error"
+    assert [d["line"] for d in result["diagnostics"]] == [1, 4, 7]
+    assert result["statements"] == 3
+
+def test_run_check_does_not_execute(script_dir):
+    out = io.StringIO()
+    assert run_check(str(script_dir), jobs=2, out=out) == 1
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    # Division by zero is a runtime error, so only the syntax error is reported
+    assert [result["status"] for result in results] == ["ok", "ok", "error"]
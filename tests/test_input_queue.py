@@ -0,0 +1,107 @@
+# test_input_queue.py
+import pytest
+from python import Lexer, Parser, Executor
+from python.utils import InputEventQueue, InputBackend, MemoryBackend, RecordingBackend
+
+def run(code, executor):
+    executor.execute(Parser().parse(Lexer(code).tokenize()))
+
+def test_consecutive_moves_are_coalesced():
+    backend = MemoryBackend()
+    queue = InputEventQueue(backend)
+    for i in range(5):
+        queue.move(i, i)
+    queue.button_down("LEFT")
+    queue.move(10, 10)
+    queue.move(20, 20)
+    queue.button_up("LEFT")
+    assert backend.batches == []
+    queue.flush()
+    assert backend.batches == [[("move", 4, 4), ("button_down", "LEFT"), ("move", 20, 20), ("button_up", "LEFT")]]
+    assert (queue.events, queue.coalesced, queue.batches) == (9, 5, 1)
+    queue.flush()
+    assert queue.batches == 1
+
+def test_wait_ends_a_batch_and_full_batches_flush():
+    backend = MemoryBackend()
+    queue = InputEventQueue(backend, max_batch=3)
+    queue.key_down("A")
+    queue.wait(0.5)
+    queue.move(1, 1)
+    queue.wait(0.25)
+    queue.move(2, 2)
+    assert backend.batches == [[("key_down", "A"), ("wait", 0.5)], [("move", 1, 1), ("wait", 0.25)]]
+    for key in "BCD":
+        queue.key_down(key)
+    assert backend.batches[-1] == [("move", 2, 2), ("key_down", "B"), ("key_down", "C")]
+    assert queue.pending == [("key_down", "D")]
+
+def test_executor_sends_device_statements_through_the_queue():
+    backend = MemoryBackend()
+    executor = Executor(input_queue=InputEventQueue(backend))
+    run("""
+        SET i = 0;
+        WHILE (i < 100) {
+            MOVE MOUSE TO (i, i * 2);
+            i++;
+        }
+        PRESS KEY ENTER;
+        WAIT 20ms;
+        HOLD KEY SHIFT;
+        PRESS BUTTON LEFT;
+        RELEASE KEY SHIFT;
+    """, executor)
+    assert backend.batches == [
+        [("move", 99, 198), ("key_down", "ENTER"), ("key_up", "ENTER"), ("wait", 0.02)],
+        [("key_down", "SHIFT"), ("button_down", "LEFT"), ("button_up", "LEFT"), ("key_up", "SHIFT")],
+    ]
+    assert executor.mouse_manager.get_position() == (99, 198)
+
+def test_recording_backend_grows_and_decodes():
+    backend = RecordingBackend(capacity=4)
+    queue = InputEventQueue(backend, max_batch=3, coalesce=False)
+    for i in range(10):
+        queue.move(i, -i)
+    queue.key_down("A")
+    queue.type_text("hello")
+    queue.scroll(-3)
+    queue.wait(0.005)
+    backend.button_down("LEFT")
+    assert len(backend) == 15
+    events = list(backend.events())
+    assert events[:2] == [("move", 0, 0), ("move", 1, -1)]
+    assert events[10:] == [("key_down", "A"), ("type_text", "hello"), ("scroll", -3), ("wait", 0.005),
+                           ("button_down", "LEFT")]
+    assert backend.counts() == {"move": 10, "key_down": 1, "type_text": 1, "scroll": 1, "wait": 1, "button_down": 1}
+    backend.clear()
+    assert len(backend) == 0 and list(backend.events()) == []
+
+def test_backend_send_dispatches_to_event_methods():
+    class Calls(InputBackend):
+        def __init__(self):
+            self.calls = []
+        def move(self, x, y):
+            self.calls.append(("move", x, y))
+        def key_down(self, key):
+            self.calls.append(("key_down", key))
+        def wait(self, seconds):
+            self.calls.append(("wait", seconds))
+    backend = Calls()
+    backend.send([("move", 1, 2), ("key_down", "A"), ("wait", 0.5)])
+    assert backend.calls == [("move", 1, 2), ("key_down", "A"), ("wait", 0.5)]
+
+def test_button_operations_hold_release_and_scroll():
+    backend = RecordingBackend()
+    executor = Executor(backend=backend)
+    run("HOLD BUTTON LEFT;", executor)
+    assert executor.mouse_manager.buttons["LEFT"]
+    run("""
+        MOVE MOUSE TO (5, 6);
+        RELEASE BUTTON LEFT;
+        PRESS BUTTON RIGHT;
+        PRESS BUTTON WHEEL_UP;
+        PRESS BUTTON SCROLL_DOWN;
+    """, executor)
+    assert not executor.mouse_manager.buttons["LEFT"]
+    assert list(backend.events()) == [("button_down", "LEFT"), ("move", 5, 6), ("button_up", "LEFT"),
+                                      ("button_down", "RIGHT"), ("button_up", "RIGHT"), ("scroll", 1), ("scroll", -1)]
@@ -0,0 +1,60 @@
+# test_lexer_feed.py
+import pytest
+import repl
+from python.lexer import Lexer
+
+def feed_lines(lines):
+    lexer = Lexer("")
+    for line in lines:
+        lexer.feed(line)
+    return lexer
+
+def test_brace_inside_string_does_not_open_a_block():
+    lexer = feed_lines(['PRINTLN "{";'])
+    assert lexer.depth == 0 and lexer.at_statement_end()
+
+def test_multiline_string_is_continued():
+    lexer = feed_lines(['PRINTLN "first'])
+    assert lexer.in_literal and not lexer.at_statement_end()
+    lexer.feed('second";')
+    assert lexer.at_statement_end()
+    strings = [token for token in lexer.take_tokens() if token.kind == "STR"]
+    assert len(strings) == 1 and "\n" in strings[0].value
+
+def test_block_comment_spans_lines_and_keeps_line_numbers():
+    lexer = feed_lines(["#* a { comment", "still } inside *#", "SET x = 1;"])
+    assert lexer.at_statement_end()
+    tokens = lexer.take_tokens()
+    assert tokens[0].value == "SET" and tokens[0].line == 3
+
+def test_open_block_waits_for_closing_brace():
+    lexer = feed_lines(["DEFUN f() {", "RETURN 1;"])
+    assert lexer.depth == 1 and not lexer.at_statement_end()
+    lexer.feed("}")
+    assert lexer.at_statement_end()
+
+def test_repl_continues_until_statement_is_complete(monkeypatch, capsys):
+    feed = iter(['PRINTLN "a {', 'b";', "PRINTLN (1 +", "2);", "}", "exit;"])
+    monkeypatch.setattr("builtins.input", lambda: next(feed))
+    repl.interactive_mode()
+    out = capsys.readouterr().out
+    assert "a {\nb" in out
+    assert "3\n" in out
+    assert "Unmatched closing bracket" in out
+
+def test_parentheses_and_braces_are_balanced_separately():
+    lexer = feed_lines(["PRINTLN ) {"])
+    assert lexer.unbalanced and not lexer.at_statement_end()
+    lexer = feed_lines(["IF (1 > 0) THEN {", "PRINTLN (1"])
+    assert (lexer.paren_depth, lexer.brace_depth) == (1, 1)
+    lexer.feed(");")
+    lexer.feed("}")
+    assert lexer.at_statement_end() and not lexer.unbalanced
+
+def test_repl_reports_unbalanced_input_instead_of_waiting(monkeypatch, capsys):
+    feed = iter([") {", "PRINTLN 5;", "exit;"])
+    monkeypatch.setattr("builtins.input", lambda: next(feed))
+    repl.interactive_mode()
+    out = capsys.readouterr().out
+    assert "Unmatched closing bracket" in out
+    assert "5\n" in out
@@ -0,0 +1,49 @@
+# test_lexer_mmap.py
+import os
+import threading
+import pytest
+from python.lexer import Lexer, tokenize_file
+
+SOURCE = '''#* header
+   comment *#
+SET greeting: STR = "héllo {world}";
+SET t = 250ms;
+IF (NOT 1 < 2 && TRUE) THEN {
+    PRINTLN greeting + 'x';
+}
+'''
+
+def token_tuples(tokens):
+    return [(t.kind, t.value, t.line) for t in tokens]
+
+def test_bytes_buffer_matches_str_tokens():
+    expected = token_tuples(Lexer(SOURCE).tokenize())
+    assert token_tuples(Lexer(SOURCE.encode("utf-8")).tokenize()) == expected
+    assert token_tuples(Lexer(memoryview(SOURCE.encode("utf-8"))).tokenize()) == expected
+
+def test_tokenize_file_maps_the_file(tmp_path):
+    path = tmp_path / "script.csc"
+    path.write_bytes(SOURCE.replace("\n", "\r\n").encode("utf-8"))
+    tokens = tokenize_file(str(path))
+    assert token_tuples(tokens) == token_tuples(Lexer(SOURCE).tokenize())
+    assert ("STR", '"héllo {world}"', 3) in token_tuples(tokens)
+
+def test_tokenize_empty_file(tmp_path):
+    path = tmp_path / "empty.csc"
+    path.write_bytes(b"")
+    assert [t.kind for t in tokenize_file(str(path))] == ["EOF"]
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_tokenize_file_reads_a_pipe(tmp_path):
+    path = tmp_path / "script.fifo"
+    os.mkfifo(path)
+    def write():
+        with open(path, "wb") as pipe:
+            pipe.write(SOURCE.encode("utf-8"))
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        tokens = tokenize_file(str(path))
+    finally:
+        writer.join()
+    assert token_tuples(tokens) == token_tuples(Lexer(SOURCE).tokenize())
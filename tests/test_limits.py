@@ -0,0 +1,61 @@
+# test_limits.py
+import threading
+import pytest
+from client import send_request
+from python.errors import LimitExceededError
+from python.executor import Executor
+from python.lexer import Lexer
+from python.limits import ExecutionLimits, current_memory
+from python.parser import Parser
+from python.server import InterpreterServer
+from python.session import SessionPool, compile_source
+from python.utils import MemorySink
+
+def test_execution_limits_stop_runaway_scripts():
+    def run(source, **limits):
+        executor = Executor(output=MemorySink(), limits=ExecutionLimits(**limits))
+        with pytest.raises(LimitExceededError) as error:
+            executor.execute(Parser().parse(Lexer(source).tokenize()))
+        return error.value
+
+    assert run("WHILE (TRUE) { }", max_steps=500).limit == "steps"
+    assert run("SET x = 0; WHILE (TRUE) { x++; }", timeout=0.05, check_interval=10).limit == "time"
+    assert run("DEFUN f(n) { RETURN f(n + 1); } SET y = f(1);", max_depth=20).limit == "depth"
+    assert run("DEFUN f(n) { RETURN f(n + 1); } SET y = f(1);", max_steps=10 ** 9).limit == "depth"
+    # The budget is per run, and a script within it is unaffected
+    executor = Executor(output=MemorySink(), limits=ExecutionLimits(max_steps=20))
+    program = Parser().parse(Lexer("REPEAT 5 TIMES { SET z = 1; }").tokenize())
+    executor.execute(program)
+    executor.execute(program)
+    assert executor.steps == 11
+
+@pytest.mark.skipif(current_memory() is None, reason="resident memory cannot be read here")
+def test_memory_limit_stops_a_growing_script():
+    executor = Executor(output=MemorySink(), limits=ExecutionLimits(max_memory=8 * 1024 * 1024, check_interval=1))
+    program = Parser().parse(Lexer('SET s = "x"; WHILE (TRUE) { SET s = s + s; }').tokenize())
+    with pytest.raises(LimitExceededError) as error:
+        executor.execute(program)
+    assert error.value.limit == "memory"
+
+def test_session_pool_applies_limits_to_each_session():
+    runaway = compile_source("WHILE (TRUE) { }", "runaway")
+    quick = compile_source("SET a = 1;", "quick")
+    with SessionPool(workers=2, limits=ExecutionLimits(max_steps=1000)) as pool:
+        results = list(pool.map([runaway, quick]))
+    assert results[0].error == "LimitExceededError: Step limit of 1000 exceeded"
+    assert results[1].ok
+    assert "execute_statement" not in vars(Executor())
+
+def test_server_applies_limits_to_each_request(tmp_path):
+    path = str(tmp_path / "commandpro.sock")
+    server = InterpreterServer(path, limits=ExecutionLimits(max_steps=100))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        response = send_request(path, {"id": 1, "code": "SET i = 0; WHILE (TRUE) { i++; }"})
+        assert response["status"] == "error" and response["stage"] == "execute"
+        assert response["error"] == "LimitExceededError: Step limit of 100 exceeded"
+        assert send_request(path, {"code": "PRINTLN 1;"})["output"] == "1\n"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,40 @@
+# test_memprofile.py
+import pytest
+from python.lexer import Lexer
+from python.parser import Parser
+from python.executor import Executor
+from python.memprofile import MemoryProfile
+from python.utils import MemorySink
+
+SOURCE = '''DEFUN double(n) {
+    RETURN n * 2;
+}
+SET total = 0;
+REPEAT 5 TIMES {
+    SET total = double(total) + 1;
+}
+'''
+
+def test_stages_report_memory_and_object_counts():
+    executor = Executor(output=MemorySink())
+    profile = MemoryProfile(top=5)
+    profile.attach(executor)
+    profile.start()
+    try:
+        tokens = profile.stage("tokenize", lambda: Lexer(SOURCE).tokenize())
+        ast = profile.stage("parse", Parser().parse, tokens)
+        profile.stage("execute", executor.execute, ast)
+    finally:
+        profile.stop()
+        profile.detach(executor)
+
+    assert executor.global_scope["total"] == 31
+    tokenize, parse, execute = profile.stages
+    assert tokenize.objects["Token"] == len(tokens)
+    assert tokenize.peak >= tokenize.retained > 0
+    assert parse.objects["FunctionCall"] == 1 and parse.objects["FunctionDefinition"] == 1
+    assert len(tokenize.sites) <= 5
+    assert profile.scopes == {"globals": 1, "calls": 5, "max_depth": 1}
+    report = profile.report()
+    assert "tokenize" in report and "Scope dicts: 1 global holding 1 variables, 5 created" in report
+    assert "execute_functioncall" not in vars(executor)
@@ -0,0 +1,61 @@
+# test_output_sink.py
+import io
+import pytest
+from python import Lexer, Parser, Executor
+from python.utils import OutputSink, MemorySink
+
+def run(code, executor):
+    executor.execute(Parser().parse(Lexer(code).tokenize()))
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+def test_buffered_policy_batches_writes():
+    stream = CountingStream()
+    executor = Executor(output=OutputSink(stream, flush_policy="buffered"))
+    run("REPEAT 100 TIMES { PRINTLN 1; }", executor)
+    assert stream.getvalue() == "1\n" * 100
+    assert stream.writes == 1
+
+def test_buffered_policy_flushes_when_full():
+    stream = CountingStream()
+    sink = OutputSink(stream, flush_policy="buffered", buffer_size=10)
+    for _ in range(10):
+        sink.write("ab\n")
+    assert stream.writes == 2
+    sink.flush()
+    assert stream.getvalue() == "ab\n" * 10
+
+@pytest.mark.parametrize("policy, expected_writes", [("always", 3), ("line", 1), ("manual", 0)])
+def test_flush_policies(policy, expected_writes):
+    stream = CountingStream()
+    sink = OutputSink(stream, flush_policy=policy)
+    sink.write("a")
+    sink.write("b")
+    sink.write("c\n")
+    assert stream.writes == expected_writes
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        OutputSink(flush_policy="sometimes")
+
+def test_memory_sink_captures_print_and_verbose_in_order():
+    sink = MemorySink()
+    executor = Executor(verbose=True, output=sink)
+    run("PRINT 1; PRINTLN 2;", executor)
+    assert sink.getvalue() == "1Executed PrintStatement: 1\n2\nExecuted PrintStatement: 2\n"
+    sink.clear()
+    assert sink.getvalue() == ""
+
+def test_output_is_flushed_before_errors_propagate():
+    stream = io.StringIO()
+    executor = Executor(output=OutputSink(stream, flush_policy="manual"))
+    with pytest.raises(Exception):
+        run("PRINTLN 1; SET x = 1 / 0;", executor)
+    assert stream.getvalue() == "1\n"
@@ -0,0 +1,49 @@
+# test_parallel.py
+import pytest
+from python.errors import SyntaxError
+from python.lexer import Lexer
+from python.parser import Parser
+from python.parallel import ParallelParser, find_split_points, parse_chunk
+
+SOURCE = """SET limit: INT = 3;
+DEFUN twice(v) {
+    RETURN v * 2;
+}
+IF (limit > 1) THEN {
+    PRINTLN "{ not a block; }";
+} ELSE {
+    PRINTLN 0;
+}
+SET limit = twice(limit);
+limit++;
+#* a comment with ; and } in it *#
+PRINTLN twice(limit);
+"""
+
+def test_split_points_fall_between_top_level_statements():
+    points = find_split_points(SOURCE, 20)
+    assert len(points) > 3
+    bounds = [(0, 1)] + points + [(len(SOURCE), None)]
+    for (start, line), (end, _) in zip(bounds, bounds[1:]):
+        assert line == SOURCE[:start].count("\n") + 1
+        statements, _, _, _, error = parse_chunk(SOURCE[start:end], line)
+        assert error is None and statements
+
+def test_parallel_parse_matches_sequential_parse():
+    sequential = Parser().parse(Lexer(SOURCE).tokenize())
+    parser = ParallelParser(jobs=3, min_chunk_size=16)
+    program = parser.parse(SOURCE)
+    assert program.to_dict() == sequential.to_dict()
+    assert parser.defined_functions == {"twice"}
+    # The untyped reassignment inherits the type declared in an earlier chunk
+    assert program.statements[3].var_type == "INT"
+    # A LAMBDA argument's braces sit inside parentheses, and neither may be cut
+    source = ("DEFUN ap(f, v) {\n    RETURN f(v);\n}\n" + "SET a = 1;\n" * 20
+              + "PRINTLN ap(LAMBDA (z) { RETURN z * 2; }, 21);\n" + "SET b = 2;\n" * 20)
+    sequential = Parser().parse(Lexer(source).tokenize())
+    assert ParallelParser(jobs=4, min_chunk_size=100).parse(source).to_dict() == sequential.to_dict()
+
+def test_parallel_parse_reports_names_defined_only_later():
+    source = "SET a = 1;\nlater(a);\nSET b = 2;\nDEFUN later(v) { RETURN v; }\n"
+    with pytest.raises(SyntaxError, match="Undefined function 'later' at line 2"):
+        ParallelParser(jobs=2, min_chunk_size=8).parse(source)
@@ -0,0 +1,75 @@
+# test_parser_dispatch.py
+import pytest
+from python.ast_nodes import ControlStatement, Integer, PrintStatement
+from python.errors import SyntaxError
+from python.lexer import Lexer
+from python.parser import Parser
+
+def parse(source, parser=None):
+    return (parser or Parser()).parse(Lexer(source).tokenize())
+
+def test_registered_statement_is_dispatched_in_subclass_only():
+    class ScrollParser(Parser):
+        def parse_scroll(self):
+            self.consume("KEYWORD")
+            amount = self.parse_expression()
+            self.consume("TERMINATOR")
+            return ControlStatement("SCROLL", amount)
+
+    ScrollParser.register_statement("KEYWORD", "SCROLL", ScrollParser.parse_scroll)
+    program = parse("SCROLL 3; PRINTLN 1;", ScrollParser())
+    assert isinstance(program.statements[0], ControlStatement)
+    assert isinstance(program.statements[1], PrintStatement)
+    with pytest.raises(SyntaxError):
+        parse("SCROLL 3;")
+
+def test_prefix_table_covers_literals_and_calls():
+    program = parse("DEFUN f(a) { RETURN a; } SET x = f(2) * (1 + 2); PRINTLN x;")
+    assignment = program.statements[1]
+    assert assignment.value.operator == "*"
+    assert isinstance(assignment.value.right.left, Integer)
+
+def test_unknown_statement_start_is_reported():
+    with pytest.raises(SyntaxError, match="Unexpected token"):
+        parse(") ;")
+
+def evaluate(source):
+    from python.executor import Executor
+    from python.utils import MemorySink
+    output = MemorySink()
+    Executor(output=output).execute(parse(source))
+    return output.getvalue().splitlines()
+
+def test_operators_follow_precedence_and_associativity():
+    assert evaluate("PRINTLN 1 - 2 - 3; PRINTLN 2 ** 3 ** 2; PRINTLN -2 ** 2; PRINTLN 2 + 3 * 4 == 14;") == ["-4", "512", "-4", "True"]
+    assert evaluate("PRINTLN 1 | 6 & 3; PRINTLN 1 << 4 >> 2; PRINTLN ~ 5; PRINTLN 17 % 5;") == ["3", "4", "-6", "2"]
+
+def test_logical_and_membership_operators():
+    source = """SET a = 200; SET b = 300;
+    PRINTLN NOT a > b; PRINTLN a < b AND b < 250 OR a == 200;
+    PRINTLN a IS 200; PRINTLN a IS NOT 200.0; PRINTLN "i" IN "string"; PRINTLN "x" NOT IN "string";
+    PRINTLN 0 AND 1 / 0;"""
+    assert evaluate(source) == ["True", "True", "True", "True", "True", "True", "0"]
+
+def test_operand_type_errors_are_interpreter_errors():
+    from python.errors import TypeError as ScriptTypeError
+    for source in ('PRINTLN -"abc";', "PRINTLN ~1.5;", "PRINTLN 1 IN 5;", 'PRINTLN 2 - "a";', "PRINTLN 1 NOT IN 5;"):
+        with pytest.raises(ScriptTypeError):
+            evaluate(source)
+
+def test_long_conditions_parse_flat_and_evaluate_without_recursion():
+    terms = " AND ".join(f"x < {i + 1}" for i in range(5000))
+    program = parse(f"SET x = 0; SET ok = {terms}; PRINTLN ok;")
+    node, depth = program.statements[1].value, 0
+    while node.operator == "AND":
+        node, depth = node.left, depth + 1
+    assert depth == 4999
+    assert evaluate(f"SET x = 0; PRINTLN {terms};") == ["True"]
+
+def test_recover_mode_skips_broken_statements_and_blocks():
+    parser = Parser()
+    source = "IF (1 > 0) THEN {\n PRINTLN 1 +;\n} ELSE {\n PRINTLN 2;\n}\nWHILE (1 < ) {\n PASS;\n}\n}\nPRINTLN 3;\nDEFUN g() {\n SET z = 1 +"
+    program = parser.parse(Lexer(source).tokenize(), recover=True)
+    assert [d["line"] for d in parser.diagnostics] == [2, 6, 9, 12]
+    assert [type(stmt).__name__ for stmt in program.statements] == ["IfStatement", "PrintStatement"]
+    assert parser.symbols.depth == 0 and parser.current_context == []
@@ -0,0 +1,49 @@
+# test_profiler.py
+import io
+import pytest
+from python.lexer import Lexer
+from python.parser import Parser
+from python.executor import Executor
+from python.profiler import Profiler
+from python.utils import MemorySink
+
+SOURCE = '''DEFUN square(n) {
+    RETURN n * n;
+}
+SET total = 0;
+REPEAT 4 TIMES {
+    SET total = total + square(3);
+}
+'''
+
+def profile(source):
+    executor = Executor(output=MemorySink())
+    profiler = Profiler()
+    profiler.attach(executor)
+    executor.execute(Parser().parse(Lexer(source).tokenize()))
+    profiler.detach(executor)
+    return executor, profiler
+
+def test_counts_per_node_line_and_function():
+    executor, profiler = profile(SOURCE)
+    assert executor.global_scope["total"] == 36
+    assert profiler.nodes["DEFUN square (line 1)"][0] == 4
+    assert profiler.nodes["BinaryOperation (line 2)"][0] == 4
+    assert profiler.nodes["Assignment (line 6)"][0] == 4
+    assert profiler.nodes["RepeatLoop (line 5)"][0] == 1
+    assert set(profiler.lines) == {1, 2, 4, 5, 6}
+    # The loop's cumulative time covers everything it ran
+    loop = profiler.nodes["RepeatLoop (line 5)"]
+    assert loop[1] >= sum(entry[2] for label, entry in profiler.nodes.items() if "line 6" in label)
+    assert "execute_statement" not in vars(executor)
+
+def test_collapsed_stacks_nest_functions_under_callers():
+    _, profiler = profile(SOURCE)
+    assert any(stack.startswith("RepeatLoop (line 5);Assignment (line 6);") and "DEFUN square (line 1);ControlStatement (line 2)" in stack
+               for stack in profiler.stacks)
+    out = io.StringIO()
+    profiler.write_collapsed(out)
+    for line in out.getvalue().splitlines():
+        stack, micros = line.rsplit(" ", 1)
+        assert stack in profiler.stacks and int(micros) > 0
+    assert "self %" in profiler.report() and "line" in profiler.report()
@@ -0,0 +1,74 @@
+# test_repl_journal.py
+import json
+import pytest
+import repl
+
+def run_repl(monkeypatch, lines, journal_path):
+    feed = iter(lines + ["exit;"])
+    monkeypatch.setattr("builtins.input", lambda: next(feed))
+    repl.interactive_mode(str(journal_path))
+
+def test_journal_appends_one_line_per_input(monkeypatch, capsys, tmp_path):
+    journal_path = tmp_path / "session.jsonl"
+    run_repl(monkeypatch, ["SET x = 1;", "DEFUN inc(v) {", "RETURN v + 1;", "}", "PRINTLN inc(x);"], journal_path)
+    lines = journal_path.read_text().splitlines()
+    assert len(lines) == 3
+    assert [json.loads(line)["statements"][0]["type"] for line in lines] == ["Assignment", "FunctionDefinition", "PrintStatement"]
+    assert "2\n" in capsys.readouterr().out
+
+def test_journal_is_replayed_on_restart(monkeypatch, capsys, tmp_path):
+    journal_path = tmp_path / "session.jsonl"
+    run_repl(monkeypatch, ["SET x = 41;", "DEFUN inc(v) { RETURN v + 1; }", "PRINTLN 0;"], journal_path)
+    capsys.readouterr()
+    run_repl(monkeypatch, ["x++;", "PRINTLN inc(x);"], journal_path)
+    out = capsys.readouterr().out
+    assert "Restored 3 inputs" in out
+    assert "43\n" in out
+    assert "0\n" not in out  # replayed output is discarded
+
+def test_load_ast_journal_ignores_torn_last_line(tmp_path):
+    journal_path = tmp_path / "session.jsonl"
+    journal_path.write_text(
+        json.dumps({"type": "Program", "statements": [{"type": "Assignment", "variable": "x",
+                    "expression": {"type": "Integer", "value": 1}, "var_type": None}]}) + "\n"
+        + '{"type": "Prog'
+    )
+    program = repl.load_ast_journal(str(journal_path))
+    assert [stmt.variable_name for stmt in program.statements] == ["x"]
+
+def test_load_ast_journal_rejects_corrupt_lines(tmp_path):
+    journal_path = tmp_path / "session.jsonl"
+    journal_path.write_text('{"type": "Prog\n{"type": "Program", "statements": []}\n')
+    with pytest.raises(ValueError):
+        repl.load_ast_journal(str(journal_path))
+
+def test_file_mode_saves_an_ast_that_reloads(capsys, tmp_path):
+    script = tmp_path / "script.csc"
+    script.write_text("SET x = 20;\nPRINTLN x + 22;\n")
+    ast_path = tmp_path / "script.json"
+    repl.execute_from_file(str(script), str(ast_path))
+    assert capsys.readouterr().out == "42\n"
+    with open(ast_path) as file:
+        assert json.load(file)["statements"][1]["type"] == "PrintStatement"
+    repl.execute_from_ast(str(ast_path))
+    assert capsys.readouterr().out == "42\n"
+
+def test_session_saved_under_any_name_replays_from_ast(monkeypatch, capsys, tmp_path):
+    journal_path = tmp_path / "session.json"
+    run_repl(monkeypatch, ["SET x = 20;", "DEFUN add(a, b) { RETURN a + b; }", "PRINTLN add(x, 22);"], journal_path)
+    assert "42\n" in capsys.readouterr().out
+    repl.execute_from_ast(str(journal_path))
+    assert capsys.readouterr().out == "42\n"
+
+def test_interactive_mode_continues_a_saved_ast_file(monkeypatch, capsys, tmp_path):
+    script = tmp_path / "script.csc"
+    script.write_text("SET x = 41;\n")
+    ast_path = tmp_path / "session.json"
+    repl.execute_from_file(str(script), str(ast_path))
+    run_repl(monkeypatch, ["x++;", "PRINTLN x;"], ast_path)
+    out = capsys.readouterr().out
+    assert "Restored 1 inputs" in out
+    assert "42\n" in out
+    assert len(ast_path.read_text().splitlines()) == 3  # converted to a journal, then appended to
+    repl.execute_from_ast(str(ast_path))
+    assert capsys.readouterr().out == "42\n"
@@ -0,0 +1,54 @@
+# test_server.py
+import threading
+import pytest
+from client import send_request
+from python import Lexer, Parser, node_from_dict
+from python.server import InterpreterServer
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / "commandpro.sock")
+    server = InterpreterServer(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+def test_code_request_uses_parse_cache(socket_path):
+    first = send_request(socket_path, {"id": 1, "code": "SET x = 20; PRINTLN x + 1;"})
+    second = send_request(socket_path, {"id": 2, "code": "SET x = 20; PRINTLN x + 1;"})
+    assert first["status"] == "ok" and first["output"] == "21\n" and not first["cached"]
+    assert second["id"] == 2 and second["output"] == "21\n" and second["cached"]
+
+def test_ast_request(socket_path):
+    ast = Parser().parse(Lexer("PRINTLN 6 * 7;").tokenize())
+    response = send_request(socket_path, {"ast": ast.to_dict()})
+    assert response["status"] == "ok" and response["output"] == "42\n"
+
+def test_requests_do_not_share_variables(socket_path):
+    send_request(socket_path, {"code": "SET leaked = 1;"})
+    response = send_request(socket_path, {"code": "PRINTLN leaked;"})
+    assert response["status"] == "error" and response["stage"] == "execute"
+
+def test_parse_errors_are_reported(socket_path):
+    response = send_request(socket_path, {"code": "SET = ;"})
+    assert response["status"] == "error" and response["stage"] == "parse"
+
+def test_non_object_requests_are_rejected(socket_path):
+    response = send_request(socket_path, [1, 2])
+    assert response["status"] == "error" and response["stage"] == "request" and "list" in response["error"]
+    assert send_request(socket_path, {"code": "PRINTLN 1;"})["output"] == "1\n"
+
+def test_ast_round_trips_through_dict():
+    code = """
+    DEFUN pick(a, b) { IF (a > b) { RETURN a; } ELSE { RETURN b; } }
+    SET p: INT = 3;
+    SET q = POINT(1, p);
+    MOVE MOUSE TO q;
+    SET twice = LAMBDA (x) { RETURN x * 2; };
+    REPEAT 2 TIMES { PRINTLN pick(1, b=2) |> twice; }
+    WAIT 2s;
+    """
+    ast = Parser().parse(Lexer(code).tokenize())
+    assert node_from_dict(ast.to_dict()).to_dict() == ast.to_dict()
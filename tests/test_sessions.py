@@ -0,0 +1,98 @@
+# test_sessions.py
+import pytest
+from python.errors import RuntimeError, SyntaxError
+from python.executor import Executor
+from python.lexer import Lexer
+from python.session import CompilationUnit, CompiledProgram, Session, SessionPool, compile_source
+from python.utils import MemorySink
+
+SCRIPT = """
+DEFUN add(a, b) {
+    RETURN a + b;
+}
+SET total = 0;
+REPEAT 5 TIMES {
+    SET total = add(total, 2);
+}
+PRINTLN total;
+"""
+
+def test_compiled_program_resolves_functions():
+    compiled = compile_source(SCRIPT, "add.csc")
+    assert list(compiled.functions) == ["add"]
+    assert all(type(stmt).__name__ != "FunctionDefinition" for stmt in compiled.program.statements)
+
+def test_sessions_have_isolated_state(capsys):
+    compiled = compile_source(SCRIPT)
+    first = Session(compiled)
+    second = Session(compiled)
+    assert first.run().ok
+    assert second.run().ok
+    assert first.executor.global_scope is not second.executor.global_scope
+    assert first.executor.mouse_manager is not second.executor.mouse_manager
+    assert capsys.readouterr().out == "10\n10\n"
+
+def test_runtime_definitions_do_not_leak_into_compiled_program():
+    compiled = compile_source("""
+    DEFUN outer() {
+        DEFUN inner() {
+            RETURN 1;
+        }
+        RETURN inner();
+    }
+    SET x = outer();
+    """)
+    session = Session(compiled)
+    assert session.run().ok
+    assert "inner" in session.executor.functions
+    assert "inner" not in compiled.functions
+
+def test_session_reports_errors():
+    result = Session(compile_source("SET x = 1 / 0;", "div.csc")).run()
+    assert result.status == "error"
+    assert "ZeroDivisionError" in result.error
+    assert result.to_dict()["name"] == "div.csc"
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_session_pool_preserves_order(kind):
+    programs = [compile_source(f"SET x = {i};", f"script{i}") for i in range(8)]
+    with SessionPool(workers=2, kind=kind) as pool:
+        results = list(pool.map(programs))
+    assert [result.name for result in results] == [f"script{i}" for i in range(8)]
+    assert all(result.ok for result in results)
+
+def feed_unit(unit, source):
+    program = unit.compile(Lexer(source).tokenize())
+    unit.execute(program)
+    return program
+
+def test_compilation_unit_links_functions_in_place():
+    output = MemorySink()
+    unit = CompilationUnit(Executor(output=output))
+    functions = unit.executor.functions
+    feed_unit(unit, "DEFUN inc(v) { RETURN v + 1; }")
+    feed_unit(unit, "SET x = inc(1);")
+    feed_unit(unit, "PRINTLN inc(x);")
+    assert unit.executor.functions is functions and list(functions) == ["inc"]
+    assert output.getvalue() == "3\n"
+
+def test_compilation_unit_rolls_back_failed_input():
+    unit = CompilationUnit(Executor(output=MemorySink()))
+    feed_unit(unit, "SET x = 1;")
+    with pytest.raises(SyntaxError):
+        unit.compile(Lexer("DEFUN broken(a) { SET y = a; SET = ; }").tokenize())
+    assert unit.parser.symbols.depth == 0 and unit.parser.current_context == []
+    assert "broken" not in unit.parser.defined_functions
+    with pytest.raises(SyntaxError):
+        unit.compile(Lexer("SET y: INT = 1; SET x: STR = 2; SET = ;").tokenize())
+    assert "y" not in unit.parser.symbols
+    assert unit.parser.symbols.lookup("x").type is None
+    feed_unit(unit, "DEFUN broken(a) { RETURN a; }")
+    assert "broken" in unit.executor.functions
+
+def test_compilation_unit_rejects_redefinition_atomically():
+    unit = CompilationUnit(Executor(output=MemorySink()))
+    feed_unit(unit, "DEFUN f() { RETURN 1; }")
+    with pytest.raises(RuntimeError):
+        feed_unit(unit, "DEFUN g() { RETURN 2; } DEFUN f() { RETURN 3; }")
+    assert "g" not in unit.executor.functions
@@ -0,0 +1,73 @@
+# test_snapshot.py
+import pytest
+from python.executor import Executor
+from python.lexer import Lexer
+from python.parser import Parser
+from python.utils import MemorySink
+
+PRELUDE = '''DEFUN offset(x) {
+    RETURN x + 100;
+}
+SET base: INT = 5;
+SET label = "prelude";
+MOVE MOUSE TO (10, 20);
+'''
+
+def parse(source):
+    return Parser().parse(Lexer(source).tokenize())
+
+def prelude_snapshot():
+    executor = Executor(output=MemorySink())
+    executor.window_manager.create_window("Editor", 0, 0, 800, 600)
+    executor.execute(parse(PRELUDE))
+    return executor.snapshot()
+
+def test_scenarios_start_from_the_snapshot_independently():
+    snapshot = prelude_snapshot()
+    first = Executor.from_snapshot(snapshot, output=MemorySink())
+    first.execute(parse('''DEFUN extra(x) { RETURN x; }
+SET base = offset(base);
+MOVE MOUSE TO (1, 2);
+MOVE WINDOW "Editor" TO (50, 60);
+FOCUS WINDOW "Editor";'''))
+    assert first.global_scope["base"] == 105
+    assert first.mouse_manager.get_position() == (1, 2)
+    assert first.window_manager.windows["Editor"].x == 50
+
+    second = Executor.from_snapshot(snapshot, output=MemorySink())
+    assert second.global_scope["base"] == {"value": 5, "type": "INT"}
+    assert second.global_scope["label"] == "prelude"
+    assert "offset" in second.functions and "extra" not in second.functions
+    assert second.mouse_manager.get_position() == (10, 20)
+    editor = second.window_manager.windows["Editor"]
+    assert (editor.x, editor.y, editor.focused) == (0, 0, False)
+
+def test_restore_resets_an_executor_in_place():
+    snapshot = prelude_snapshot()
+    executor = Executor(output=MemorySink())
+    executor.restore(snapshot)
+    executor.execute(parse("SET label = offset(1); DEFUN later(x) { RETURN x; }"))
+    assert executor.global_scope["label"] == 101
+    executor.restore(snapshot)
+    assert executor.global_scope["label"] == "prelude"
+    assert "later" not in executor.functions
+    assert "later" not in snapshot.functions
+
+def test_prelude_lambdas_run_on_the_restoring_executor():
+    prelude = Executor(output=MemorySink())
+    prelude.execute(parse('''SET say = LAMBDA (x) { PRINTLN x; MOVE MOUSE TO (x, x); RETURN x; };
+SET twice = LAMBDA (x) { RETURN say(x) * 2; };
+DEFUN offset(x) { RETURN x + 100; }
+SET ref = offset;
+'''))
+    snapshot = prelude.snapshot()
+    scenarios = []
+    for value in (7, 9):
+        executor = Executor.from_snapshot(snapshot, output=MemorySink())
+        executor.execute(parse(f"SET r = twice({value}); PRINTLN r; PRINTLN ref(r);"))
+        scenarios.append(executor)
+    assert [s.output.getvalue() for s in scenarios] == ["7\n14\n114\n", "9\n18\n118\n"]
+    assert [s.mouse_manager.get_position() for s in scenarios] == [(7, 7), (9, 9)]
+    assert prelude.output.getvalue() == "" and prelude.mouse_manager.get_position() == (0, 0)
+    assert scenarios[0].global_scope["say"].executor is scenarios[0]
+    assert scenarios[1].global_scope["ref"].executor is scenarios[1]
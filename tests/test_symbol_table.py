@@ -0,0 +1,31 @@
+# test_symbol_table.py
+import pytest
+from python.lexer import Lexer
+from python.parser import Parser
+from python.symbol_table import SymbolTable
+
+def test_inner_bindings_shadow_and_unwind():
+    symbols = SymbolTable()
+    symbols.declare("x", "INT")
+    symbols.enter_scope()
+    symbols.declare("x", is_parameter=True)
+    symbols.declare("y")
+    assert symbols.lookup("x").scope == 1 and symbols.lookup("x").is_parameter
+    assert symbols.lookup_local("y").scope == 1
+    symbols.exit_scope()
+    assert symbols.lookup("x").type == "INT" and symbols.lookup("x").scope == 0
+    assert "y" not in symbols
+
+def test_redeclaring_in_same_scope_replaces_binding():
+    symbols = SymbolTable()
+    symbols.declare("x", "INT")
+    symbols.declare("x", "STR")
+    assert symbols.bindings["x"] == [symbols.lookup("x")] and symbols.lookup("x").type == "STR"
+    with pytest.raises(ValueError):
+        symbols.exit_scope()
+
+def test_parser_pops_function_scope():
+    parser = Parser()
+    parser.parse(Lexer("SET x = 1; DEFUN f(a) { SET b = a; RETURN b; }").tokenize())
+    assert parser.symbols.depth == 0
+    assert "x" in parser.symbols and "a" not in parser.symbols and "b" not in parser.symbols
@@ -0,0 +1,91 @@
+# test_trajectory.py
+import pytest
+from python import Lexer, Parser, Executor
+from python.errors import TypeError
+from python.utils import InputBackend, MemoryBackend, RecordingBackend
+from python.utils.trajectory import trajectory, python_trajectory, numpy_trajectory
+
+def run(code, executor):
+    executor.execute(Parser().parse(Lexer(code).tokenize()))
+
+def test_profiles_end_at_the_target():
+    for profile in ("LINEAR", "EASED", "BEZIER"):
+        xs, ys = trajectory((0, 0), (300, -150), 2, 60, profile)
+        assert len(xs) == len(ys) == 120
+        assert (xs[-1], ys[-1]) == (300, -150)
+    xs, ys = trajectory((0, 0), (100, 0), 1, 10)
+    assert list(xs) == list(range(10, 101, 10)) and set(ys) == {0}
+    eased, _ = trajectory((0, 0), (100, 0), 1, 10, "EASED")
+    assert list(eased) == sorted(eased) and eased[0] < 10 and eased[4] == 50
+    _, bow = trajectory((0, 0), (100, 0), 1, 10, "BEZIER")
+    assert max(bow) > 10 and bow[-1] == 0
+    with pytest.raises(ValueError):
+        trajectory((0, 0), (1, 1), 1, 10, "WOBBLY")
+
+def test_numpy_and_python_paths_agree():
+    pytest.importorskip("numpy")
+    for profile in ("LINEAR", "EASED", "BEZIER"):
+        assert numpy_trajectory((5, 7), (640, 480), 500, profile) == python_trajectory((5, 7), (640, 480), 500, profile)
+
+def test_timed_move_streams_one_path_to_the_backend():
+    backend = MemoryBackend()
+    backend.sample_rate = 100
+    executor = Executor(backend=backend)
+    run("""
+        MOVE MOUSE TO (10, 10);
+        SET target = POINT(110, 60);
+        MOVE MOUSE TO target TIME 500ms EASED;
+        MOVE MOUSE TO (0, 0) TIME 0s;
+    """, executor)
+    [batch] = backend.batches
+    assert batch[0] == ("move", 10, 10) and batch[-1] == ("move", 0, 0)
+    name, xs, ys, interval = batch[1]
+    assert (name, len(xs), interval) == ("move_path", 50, 0.01)
+    assert (xs[-1], ys[-1]) == (110, 60)
+    assert executor.mouse_manager.get_position() == (0, 0)
+    with pytest.raises(TypeError):
+        run('MOVE MOUSE TO (1, 1) TIME "soon";', executor)
+
+def test_backends_replay_paths():
+    recorder = RecordingBackend(capacity=8)
+    executor = Executor(backend=recorder)
+    run("PRESS KEY A; MOVE MOUSE TO (120, 0) TIME 1s; PRESS KEY B;", executor)
+    events = list(recorder.events())
+    assert len(events) == 2 + recorder.sample_rate + 2
+    assert events[2] == ("move", 1, 0) and events[-3] == ("move", 120, 0) and events[-1] == ("key_up", "B")
+
+    class Calls(InputBackend):
+        def __init__(self):
+            self.calls = []
+        def move(self, x, y):
+            self.calls.append(("move", x, y))
+        def wait(self, seconds):
+            self.calls.append(("wait", seconds))
+    backend = Calls()
+    backend.move_path([1, 2], [3, 4], 0.5)
+    assert backend.calls == [("move", 1, 3), ("wait", 0.5), ("move", 2, 4), ("wait", 0.5)]
+
+def test_timed_move_round_trips_through_json():
+    from python.ast_nodes import node_from_dict
+    [stmt] = Parser().parse(Lexer("MOVE MOUSE TO (1, 2) TIME 3s BEZIER;").tokenize()).statements
+    copy = node_from_dict(stmt.to_dict())
+    assert (copy.profile, copy.duration.value) == ("BEZIER", 3.0)
+    [plain] = Parser().parse(Lexer("MOVE MOUSE TO (1, 2);").tokenize()).statements
+    assert "duration" not in plain.to_dict()
+
+def test_timed_moves_record_their_path_and_end_position():
+    recorder = RecordingBackend()
+    recorder.sample_rate = 10
+    executor = Executor(backend=recorder)
+    run("""
+        MOVE MOUSE TO (20, 10);
+        MOVE MOUSE TO (120, 60) TIME 1s;
+        MOVE MOUSE TO (20, 10) TIME 500ms;
+    """, executor)
+    moves = [(x, y) for _, x, y in recorder.events()]
+    assert moves[0] == (20, 10)
+    assert moves[1:11] == [(20 + 10 * i, 10 + 5 * i) for i in range(1, 11)]
+    # The second move starts where the first one ended
+    assert moves[11:] == [(100, 50), (80, 40), (60, 30), (40, 20), (20, 10)]
+    assert recorder.counts() == {"move": 16}
+    assert executor.mouse_manager.get_position() == (20, 10)
@@ -0,0 +1,96 @@
+# test_window_manager.py
+import pytest
+from python.utils import WindowManager
+
+def make_manager(*names):
+    manager = WindowManager()
+    for name in names:
+        manager.create_window(name, 0, 0, 100, 100)
+    return manager
+
+def test_focus_keeps_one_focused_window_and_raises_it():
+    manager = make_manager("a", "b", "c")
+    assert manager.z_order() == ["a", "b", "c"] and manager.focused_window is None
+    assert manager.focus("a")
+    assert manager.focus("b")
+    assert manager.focused_window == "b" and manager.get_focused().name == "b"
+    assert [name for name, window in manager.windows.items() if window.focused] == ["b"]
+    assert manager.z_order() == ["c", "a", "b"] and manager.top().name == "b"
+    assert manager.lower_window("b") and manager.z_order() == ["b", "c", "a"]
+    assert not manager.focus("missing")
+
+def test_listeners_see_every_change():
+    manager = make_manager("a", "b")
+    events = []
+    manager.add_listener(lambda event, window: events.append((event, window.name)))
+    manager.focus("a")
+    manager.focus("b")
+    manager.move("a", 5, 6)
+    manager.resize("a", 10, 20)
+    manager.close_window("b")
+    assert events == [("raised", "a"), ("focused", "a"), ("blurred", "a"), ("raised", "b"), ("focused", "b"),
+                      ("moved", "a"), ("resized", "a"), ("blurred", "b"), ("closed", "b")]
+    assert manager.focused_window is None and manager.z_order() == ["a"]
+    assert (manager.windows["a"].x, manager.windows["a"].height) == (5, 20)
+
+def test_copy_keeps_order_and_focus():
+    manager = make_manager("a", "b", "c")
+    manager.focus("a")
+    copy = manager.copy()
+    copy.focus("c")
+    copy.move("b", 1, 1)
+    assert copy.z_order() == ["b", "a", "c"] and copy.focused_window == "c"
+    assert manager.z_order() == ["b", "c", "a"] and manager.focused_window == "a"
+    assert manager.windows["a"].focused and manager.windows["b"].x == 0
+
+def test_window_at_returns_topmost_window():
+    manager = WindowManager(cell_size=64)
+    manager.create_window("back", 0, 0, 500, 500)
+    manager.create_window("front", 100, 100, 200, 200)
+    manager.create_window("empty", 150, 150, 0, 0)
+    assert manager.window_at(150, 150).name == "front"
+    assert manager.window_at(50, 50).name == "back"
+    assert manager.window_at(300, 300).name == "back"  # Right and bottom edges are outside
+    assert manager.window_at(600, 50) is None
+    manager.lower_window("front")
+    assert manager.window_at(150, 150).name == "back"
+    manager.focus("front")
+    assert manager.window_at(150, 150).name == "front"
+    manager.close_window("front")
+    assert manager.window_at(150, 150).name == "back"
+
+def test_index_follows_moves_and_resizes():
+    manager = make_manager("a", "b")
+    manager.move("b", 1000, 1000)
+    assert manager.window_at(1050, 1050).name == "b" and manager.window_at(50, 50).name == "a"
+    manager.resize("a", 2000, 2000)
+    assert manager.window_at(1050, 1050).name == "b"
+    manager.lower_window("b")
+    assert manager.window_at(1050, 1050).name == "a"
+    assert [window.name for window in manager.windows_in(900, 900, 200, 200)] == ["a", "b"]
+    assert [window.name for window in manager.windows_in(-50, -50, 10, 10)] == []
+    copy = manager.copy()
+    copy.move("a", 5000, 5000)
+    assert copy.window_at(50, 50) is None and manager.window_at(50, 50).name == "a"
+
+def test_index_matches_linear_scan():
+    import random
+    rng = random.Random(7)
+    manager = WindowManager(cell_size=100)
+    for i in range(200):
+        manager.create_window(f"w{i}", rng.randrange(1000), rng.randrange(1000), rng.randrange(300), rng.randrange(300))
+    for _ in range(300):
+        name = f"w{rng.randrange(200)}"
+        action = rng.randrange(4)
+        if action == 0:
+            manager.move(name, rng.randrange(-100, 1000), rng.randrange(-100, 1000))
+        elif action == 1:
+            manager.resize(name, rng.randrange(300), rng.randrange(300))
+        elif action == 2:
+            manager.focus(name)
+        else:
+            manager.lower_window(name)
+        x, y = rng.randrange(-100, 1200), rng.randrange(-100, 1200)
+        expected = next((window for window in reversed(manager.windows.values())
+                         if window.x <= x < window.x + window.width and window.y <= y < window.y + window.height), None)
+        assert manager.window_at(x, y) is expected